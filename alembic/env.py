@@ -16,7 +16,17 @@ from app.database import Base
 from app.config import settings
 
 # Import all models to register them with Base.metadata
-from app.models import Transaction, PaymentLink, Receipt  # noqa
+from app.models import (  # noqa
+    Transaction,
+    PaymentLink,
+    Receipt,
+    User,
+    SMSOutbox,
+    TransactionRollup,
+    WebhookEvent,
+    ProcessedEvent,
+    SyncCursor,
+)
 
 
 # Alembic Config object
@@ -0,0 +1,114 @@
+"""baseline schema
+
+Tables as they were before the webhook inbox, SMS outbox and rollups.
+Databases created earlier with init_db() already have them: mark them
+as migrated with `alembic stamp d4ac34b949d1`, then `alembic upgrade head`.
+
+Revision ID: d4ac34b949d1
+Revises: 
+Create Date: 2026-10-17 05:21:29.332390+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4ac34b949d1'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('stripe_payment_intent_id', sa.String(length=255), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('payment_method', sa.String(length=50), nullable=True),
+    sa.Column('card_last4', sa.String(length=4), nullable=True),
+    sa.Column('card_brand', sa.String(length=50), nullable=True),
+    sa.Column('customer_email', sa.String(length=255), nullable=True),
+    sa.Column('customer_phone', sa.String(length=20), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transactions_created_at'), 'transactions', ['created_at'], unique=False)
+    op.create_index(op.f('ix_transactions_status'), 'transactions', ['status'], unique=False)
+    op.create_index('ix_transactions_status_created', 'transactions', ['status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_transactions_stripe_payment_intent_id'), 'transactions', ['stripe_payment_intent_id'], unique=True)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('payment_links',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('stripe_link_id', sa.String(length=255), nullable=True),
+    sa.Column('stripe_price_id', sa.String(length=255), nullable=True),
+    sa.Column('stripe_session_id', sa.String(length=255), nullable=True),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('customer_phone', sa.String(length=20), nullable=False),
+    sa.Column('customer_name', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('sms_sent', sa.Boolean(), nullable=True),
+    sa.Column('sms_sent_at', sa.DateTime(), nullable=True),
+    sa.Column('sms_message_id', sa.String(length=255), nullable=True),
+    sa.Column('paid', sa.Boolean(), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.Column('transaction_id', sa.Integer(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payment_links_paid'), 'payment_links', ['paid'], unique=False)
+    op.create_index(op.f('ix_payment_links_stripe_link_id'), 'payment_links', ['stripe_link_id'], unique=True)
+    op.create_table('receipts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('receipt_number', sa.String(length=50), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=False),
+    sa.Column('delivery_method', sa.String(length=20), nullable=False),
+    sa.Column('recipient', sa.String(length=255), nullable=True),
+    sa.Column('delivered', sa.Boolean(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.Column('delivery_error', sa.Text(), nullable=True),
+    sa.Column('pdf_path', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_receipts_receipt_number'), 'receipts', ['receipt_number'], unique=True)
+    op.create_index(op.f('ix_receipts_transaction_id'), 'receipts', ['transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_receipts_transaction_id'), table_name='receipts')
+    op.drop_index(op.f('ix_receipts_receipt_number'), table_name='receipts')
+    op.drop_table('receipts')
+    op.drop_index(op.f('ix_payment_links_stripe_link_id'), table_name='payment_links')
+    op.drop_index(op.f('ix_payment_links_paid'), table_name='payment_links')
+    op.drop_table('payment_links')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_transactions_stripe_payment_intent_id'), table_name='transactions')
+    op.drop_index('ix_transactions_status_created', table_name='transactions')
+    op.drop_index(op.f('ix_transactions_status'), table_name='transactions')
+    op.drop_index(op.f('ix_transactions_created_at'), table_name='transactions')
+    op.drop_table('transactions')
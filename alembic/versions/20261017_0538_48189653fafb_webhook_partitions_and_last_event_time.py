@@ -0,0 +1,47 @@
+"""webhook partitions and last event time
+
+Adds webhook_events.partition_key / event_created, which order
+processing per payment intent, and transactions.last_event_at.
+
+Events already in the inbox get their own partition (their event ID)
+and their receipt time as creation time, so they are still claimed
+and processed, just not ordered against each other.
+
+Revision ID: 48189653fafb
+Revises: 828c45cc52a7
+Create Date: 2026-10-17 05:38:16.318607+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '48189653fafb'
+down_revision: Union[str, None] = '828c45cc52a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('webhook_events') as batch_op:
+        batch_op.add_column(sa.Column('partition_key', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('event_created', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE webhook_events SET partition_key = event_id, event_created = received_at"
+    )
+    with op.batch_alter_table('webhook_events') as batch_op:
+        batch_op.alter_column('partition_key', existing_type=sa.String(length=255), nullable=False)
+        batch_op.alter_column('event_created', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_webhook_events_partition', 'webhook_events', ['partition_key', 'status', 'event_created'], unique=False)
+    op.add_column('transactions', sa.Column('last_event_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transactions', 'last_event_at')
+    op.drop_index('ix_webhook_events_partition', table_name='webhook_events')
+    with op.batch_alter_table('webhook_events') as batch_op:
+        batch_op.drop_column('event_created')
+        batch_op.drop_column('partition_key')
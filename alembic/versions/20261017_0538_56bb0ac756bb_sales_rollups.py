@@ -0,0 +1,40 @@
+"""sales rollups
+
+Adds transaction_rollups. The table starts empty: run
+`python -m app.cli rebuild-rollups` once after upgrading.
+
+Revision ID: 56bb0ac756bb
+Revises: 39c6045572bc
+Create Date: 2026-10-17 05:38:14.657667+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '56bb0ac756bb'
+down_revision: Union[str, None] = '39c6045572bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('transaction_rollups',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('granularity', 'bucket_start', 'currency', 'status', name='uq_transaction_rollups_bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('transaction_rollups')
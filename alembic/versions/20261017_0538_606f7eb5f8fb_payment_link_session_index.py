@@ -0,0 +1,29 @@
+"""payment link session index
+
+Indexes payment_links.stripe_session_id, which checkout webhooks look
+links up by.
+
+Revision ID: 606f7eb5f8fb
+Revises: f6600f59a216
+Create Date: 2026-10-17 05:38:17.531382+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '606f7eb5f8fb'
+down_revision: Union[str, None] = 'f6600f59a216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_payment_links_stripe_session_id'), 'payment_links', ['stripe_session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payment_links_stripe_session_id'), table_name='payment_links')
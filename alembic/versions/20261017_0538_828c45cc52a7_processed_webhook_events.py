@@ -0,0 +1,38 @@
+"""processed webhook events
+
+Adds processed_events, the de-duplication record of handled Stripe
+events.
+
+Revision ID: 828c45cc52a7
+Revises: 98a0bfa4bb13
+Create Date: 2026-10-17 05:38:15.748537+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '828c45cc52a7'
+down_revision: Union[str, None] = '98a0bfa4bb13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('processed_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('event_id', sa.String(length=255), nullable=False),
+    sa.Column('event_type', sa.String(length=100), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id')
+    )
+    op.create_index(op.f('ix_processed_events_processed_at'), 'processed_events', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_processed_events_processed_at'), table_name='processed_events')
+    op.drop_table('processed_events')
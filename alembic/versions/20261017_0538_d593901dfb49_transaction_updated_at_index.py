@@ -0,0 +1,31 @@
+"""transaction updated_at index
+
+Indexes transactions.updated_at for the change feed's seeks. Existing
+rows get updated_at = created_at where it was never set, so the feed
+sees them.
+
+Revision ID: d593901dfb49
+Revises: 606f7eb5f8fb
+Create Date: 2026-10-17 05:38:18.151770+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd593901dfb49'
+down_revision: Union[str, None] = '606f7eb5f8fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE transactions SET updated_at = created_at WHERE updated_at IS NULL")
+    op.create_index(op.f('ix_transactions_updated_at'), 'transactions', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_transactions_updated_at'), table_name='transactions')
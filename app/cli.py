@@ -0,0 +1,155 @@
+"""
+Command Line Tasks
+
+Operational commands that run outside the API server.
+Run with: python -m app.cli <command>
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from app.database import SessionLocal
+from app.utils import logger, setup_logging
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    """Recompute transaction rollups from raw transaction rows."""
+    from app.services.rollup_service import RollupService
+    
+    db = SessionLocal()
+    try:
+        written = RollupService(db).rebuild()
+    finally:
+        db.close()
+    
+    print(f"Rebuilt {written} rollup rows")
+    return 0
+
+
+def sweep_webhooks(args: argparse.Namespace) -> int:
+    """Delete webhook dedup records past retention."""
+    from app.services.webhook_service import WebhookService
+    
+    db = SessionLocal()
+    try:
+        deleted = WebhookService(db).sweep(retention_days=args.days)
+    finally:
+        db.close()
+    
+    print(
+        f"Deleted {deleted['processed_events']} processed events and "
+        f"{deleted['webhook_events']} inbox rows"
+    )
+    return 0
+
+
+def replay_events(args: argparse.Namespace) -> int:
+    """Fetch missed Stripe events into the webhook inbox."""
+    from app.services.replay_service import ReplayService
+    from app.services.stripe_client import stripe_client
+    from app.services.webhook_service import WebhookService
+    
+    async def run() -> dict:
+        db = SessionLocal()
+        try:
+            result = await ReplayService(db).replay(args.start, args.end)
+            if args.process:
+                result["processed"] = await WebhookService(db).drain("cli-replay")
+            return result
+        finally:
+            db.close()
+            await stripe_client.close()
+    
+    result = asyncio.run(run())
+    
+    print(
+        f"Fetched {result['fetched']} events: {result['queued']} queued, "
+        f"{result['duplicates']} duplicates, {result['failed_windows']} failed windows"
+    )
+    if "processed" in result:
+        print(f"Processed {result['processed']} events")
+    return 1 if result["failed_windows"] else 0
+
+
+def reconcile(args: argparse.Namespace) -> int:
+    """Re-sync stale pending transactions with Stripe."""
+    from app.services.reconciliation_service import ReconciliationService
+    from app.services.stripe_client import stripe_client
+    
+    async def run() -> dict:
+        db = SessionLocal()
+        try:
+            return await ReconciliationService(db).reconcile(limit=args.limit)
+        finally:
+            db.close()
+            await stripe_client.close()
+    
+    report = asyncio.run(run())
+    
+    print(
+        f"Checked {report['checked']} pending transactions: "
+        f"updated {report['updated']}, {report['unchanged']} unchanged, "
+        f"{report['errors']} errors in {report['duration_ms']}ms"
+    )
+    return 1 if report["errors"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run a command."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    rebuild = commands.add_parser(
+        "rebuild-rollups",
+        help="Recompute sales rollups from the transactions table",
+    )
+    rebuild.set_defaults(func=rebuild_rollups)
+    
+    sweep = commands.add_parser(
+        "sweep-webhooks",
+        help="Delete webhook dedup records past retention",
+    )
+    sweep.add_argument("--days", type=int, default=None, help="Retention in days")
+    sweep.set_defaults(func=sweep_webhooks)
+    
+    replay = commands.add_parser(
+        "replay-events",
+        help="Recover missed Stripe webhooks from the events list",
+    )
+    replay.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Range start, UTC ISO time (default: saved cursor)",
+    )
+    replay.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Range end, UTC ISO time (default: now)",
+    )
+    replay.add_argument(
+        "--process",
+        action="store_true",
+        help="Process queued events here instead of leaving them to the API workers",
+    )
+    replay.set_defaults(func=replay_events)
+    
+    reconcile_parser = commands.add_parser(
+        "reconcile",
+        help="Re-sync stale pending transactions with Stripe",
+    )
+    reconcile_parser.add_argument("--limit", type=int, default=None, help="Maximum rows to check")
+    reconcile_parser.set_defaults(func=reconcile)
+    
+    args = parser.parse_args(argv)
+    setup_logging()
+    logger.info("Running command", command=args.command)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,25 +32,113 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./pos.db"
+    database_async: bool = False  # Request sessions use asyncpg / aiosqlite
+    database_pool_size: int = 10  # Persistent connections per engine, per worker
+    database_max_overflow: int = 20  # Extra connections opened under load
+    database_pool_timeout: float = 30.0  # Seconds to wait for a connection
+    database_pool_recycle: int = 1800  # Reconnect connections older than this (-1 disables)
+    database_replica_urls: str = ""  # Comma-separated read replicas (optional)
+    database_replica_retry_seconds: int = 30  # Skip a failed replica for this long
+    
+    # SQLite file databases (single-terminal deployments)
+    sqlite_wal: bool = False  # WAL journal, reader pool and a single writer connection
+    sqlite_reader_pool_size: int = 4  # Connections serving GET requests
+    sqlite_busy_timeout_ms: int = 5000  # Wait for a lock held by another process
+    sqlite_cache_size_mb: int = 64  # Page cache per connection
+    sqlite_mmap_size_mb: int = 256  # Memory-mapped I/O per connection
     
     # Security
     jwt_secret_key: str = "your-jwt-secret-key-change-this"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440  # 24 hours
+    principal_cache_ttl: int = 60  # Seconds an authenticated user is cached
+    password_hash_workers: int = 4  # Threads for password hashing
+    password_hash_max_queue: int = 64  # Queued + running hashes before 503
+    login_max_failures: int = 5  # Per username within the window
+    login_max_failures_per_ip: int = 20
+    login_failure_window_seconds: int = 300
+    login_lockout_seconds: int = 300
     
     # Stripe
     stripe_secret_key: str = ""
     stripe_publishable_key: str = ""
     stripe_webhook_secret: str = ""
     stripe_terminal_location: str = ""
+    stripe_max_connections: int = 50  # Pooled connections per worker
+    stripe_max_keepalive_connections: int = 20
+    stripe_timeout_seconds: float = 30.0
+    stripe_max_network_retries: int = 2
     
     # Africa's Talking SMS
     at_username: str = "sandbox"
     at_api_key: str = ""
     at_sender_id: str = "POS"
+    sms_batch_window_ms: int = 50  # Coalesce identical messages (0 disables)
+    sms_batch_max_size: int = 100
+    
+    # SMS outbox worker
+    sms_outbox_workers: int = 4  # Concurrent senders per process (0 disables)
+    sms_outbox_batch_size: int = 50
+    sms_outbox_poll_seconds: float = 2.0
+    sms_outbox_lease_seconds: int = 300  # Reclaim messages from crashed workers
+    sms_outbox_max_attempts: int = 5
+    sms_outbox_backoff_seconds: float = 5.0
+    sms_outbox_backoff_max_seconds: float = 600.0
+    
+    # Stripe webhook inbox
+    webhook_workers: int = 4  # Concurrent processors per process (0 disables)
+    webhook_batch_size: int = 50
+    webhook_poll_seconds: float = 1.0
+    webhook_lease_seconds: int = 120  # Reclaim events from crashed workers
+    webhook_max_attempts: int = 8
+    webhook_backoff_seconds: float = 2.0
+    webhook_backoff_max_seconds: float = 300.0
+    webhook_dedup_cache_size: int = 10000  # Recently processed event IDs kept in memory
+    webhook_dedup_retention_days: int = 30  # Stripe retries for up to 3 days
+    webhook_sweep_interval_seconds: int = 3600
+    
+    # Stripe event replay (recovering missed webhooks)
+    stripe_replay_window_minutes: int = 30  # Time range fetched per concurrent window
+    stripe_replay_concurrency: int = 8  # Windows fetched at once
+    stripe_replay_lookback_hours: int = 24  # Default start when no cursor is saved
+    
+    # Pending transaction reconciliation
+    reconcile_interval_seconds: int = 300  # Between scheduled runs (0 disables)
+    reconcile_stale_minutes: int = 15  # Only pending rows older than this
+    reconcile_batch_size: int = 100
+    reconcile_max_per_run: int = 2000
+    reconcile_concurrency: int = 10  # PaymentIntent fetches in flight
+    reconcile_rate_per_second: float = 20.0  # Stripe request budget for the reconciler
+    
+    # Transaction list totals
+    transaction_count_cache_ttl: int = 30  # Seconds for count=cached
+    export_batch_size: int = 1000  # Rows fetched per round trip when exporting
+    
+    # PDF receipt rendering
+    pdf_render_workers: int = 2  # Worker processes
+    pdf_render_max_queue: int = 20  # Queued + running renders before 503
     
     # Redis
     redis_url: str = "redis://localhost:6379/0"
+    redis_enabled: bool = True  # In-process fallbacks are used while unreachable
+    redis_timeout_seconds: float = 0.5
+    redis_retry_seconds: int = 30  # Use the fallback this long after an error
+    lookup_cache_ttl: int = 30  # Seconds a transaction / payment link lookup is cached
+    
+    # Long-poll status endpoints
+    status_wait_timeout_seconds: int = 25  # Default wait before returning unchanged
+    status_wait_max_seconds: int = 60  # Longest wait a client may ask for
+    status_wait_recheck_seconds: int = 5  # Re-read while waiting, in case a notification is lost
+    
+    # Live transaction feed (server-sent events)
+    transaction_feed_heartbeat_seconds: int = 15  # Keepalive (and re-check) interval
+    transaction_feed_lookback_seconds: int = 5  # Re-scan window for rows committed out of order
+    transaction_feed_resume_seconds: int = 3600  # Older Last-Event-IDs get a fresh snapshot
+    transaction_feed_max_changes: int = 500  # Rows per delta read; more on resume means a snapshot
+    
+    # Prometheus metrics (GET /metrics)
+    metrics_token: str = ""  # Bearer token required to scrape (empty: development only)
+    metrics_publish_seconds: int = 15  # How often each worker shares its metrics via Redis
     
     # CORS
     cors_origins: str = "http://localhost:5173,http://localhost:5174,http://localhost:3000"
@@ -63,6 +151,11 @@ class Settings(BaseSettings):
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
     
+    @property
+    def database_replica_urls_list(self) -> List[str]:
+        """Parse replica URLs from comma-separated string."""
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+    
     @property
     def is_production(self) -> bool:
         """Check if running in production mode."""
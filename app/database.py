@@ -3,45 +3,351 @@ Database Connection & Session Management
 
 Handles SQLAlchemy engine, session factory, and dependency injection.
 Supports both SQLite (dev) and PostgreSQL (production).
+
+Read-only work run through run_db_read() can be served by read
+engines: the DATABASE_REPLICA_URLS replicas, or - with SQLITE_WAL=true -
+a pool of reader connections on the SQLite file. In WAL mode writes go
+through a single writer connection (callers queue for it on the pool),
+so reads proceed concurrently with a write in progress.
+
+With DATABASE_ASYNC=true, request sessions are AsyncSessions on an
+async driver (asyncpg / aiosqlite) so queries never block the event
+loop. Services keep their synchronous ORM code and are called through
+run_db(); run_db_read() routes to async engines on the same replicas. Background workers and the CLI use the synchronous engine;
+workers open sessions from WorkerSessionLocal, never sharing a
+connection with request sessions.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import StaticPool
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.config import settings
+from app.utils import logger
+from app.utils.metrics import metrics
+from app.utils.pool_monitor import (
+    MonitoredAsyncQueuePool,
+    MonitoredQueuePool,
+    PoolMonitor,
+)
+from app.utils.query_monitor import query_monitor
+
+
+T = TypeVar("T")
 
 
 # Engine Configuration
 
+def pool_options() -> dict:
+    """Connection pool arguments from settings (non-SQLite engines)."""
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": True,  # Verify connections are alive
+    }
+
+
+def sqlite_wal_enabled() -> bool:
+    """WAL mode applies to SQLite file databases only."""
+    url = settings.database_url
+    return settings.sqlite_wal and url.startswith("sqlite") and ":memory:" not in url
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune each new SQLite connection for WAL mode."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable across application crashes in WAL mode; only
+    # a power loss can roll back the last transactions
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_mb * 1024}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+    cursor.close()
+
+
+def sqlite_engine(pool_size: int, logging_name: str) -> Engine:
+    """SQLite file engine with a fixed-size pool of WAL connections."""
+    wal_engine = create_engine(
+        settings.database_url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        },
+        poolclass=MonitoredQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=settings.database_pool_timeout,
+        pool_logging_name=logging_name,
+        echo=settings.is_development,
+    )
+    event.listen(wal_engine, "connect", set_sqlite_pragmas)
+    return wal_engine
+
+
+reader_engines: List[Engine] = []
+
+if sqlite_wal_enabled():
+    # One writer: SQLite allows a single write transaction at a time,
+    # so requests queue for this connection instead of for the lock
+    engine = sqlite_engine(1, "primary")
+    reader_engines.append(sqlite_engine(settings.sqlite_reader_pool_size, "reader"))
 # SQLite needs special handling for connection pooling
-if settings.database_url.startswith("sqlite"):
+elif settings.database_url.startswith("sqlite"):
     engine = create_engine(
         settings.database_url,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
+        pool_logging_name="primary",
         echo=settings.is_development,  # Log SQL in dev mode
     )
 else:
     # PostgreSQL with connection pooling
     engine = create_engine(
         settings.database_url,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,  # Verify connections are alive
+        poolclass=MonitoredQueuePool,
+        pool_logging_name="primary",
         echo=settings.is_development,
+        **pool_options(),
     )
 
+for index, replica_url in enumerate(settings.database_replica_urls_list):
+    reader_engines.append(create_engine(
+        replica_url,
+        poolclass=MonitoredQueuePool,
+        pool_logging_name=f"replica{index}",
+        echo=settings.is_development,
+        **pool_options(),
+    ))
+
+# Checkouts, wait times and timeouts (see /api/v1/metrics)
+PoolMonitor("primary").attach(engine)
+for reader in reader_engines:
+    PoolMonitor(reader.pool.logging_name).attach(reader)
+
+# Statement counts, latency and errors for every engine
+query_monitor.attach()
+
+
+# Read Replicas
+
+class ReplicaSet:
+    """
+    Read engines with passive health tracking.
+    
+    Healthy replicas are used round-robin. A replica whose connection
+    fails is skipped for replica_retry_seconds and then tried again;
+    while none is healthy, reads go to the primary.
+    """
+    
+    def __init__(self, engines: List[Engine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until: Dict[Engine, float] = {}
+        self._counter = itertools.count()
+    
+    @property
+    def healthy(self) -> List[Engine]:
+        now = time.monotonic()
+        return [e for e in self.engines if self._down_until.get(e, 0) <= now]
+    
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica, or None to use the primary."""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+    
+    def mark_down(self, replica: Engine, error: Exception) -> None:
+        self._down_until[replica] = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Read replica marked down",
+            replica=replica.pool.logging_name,
+            retry_seconds=self.retry_seconds,
+            error=str(error),
+        )
+
+
+replicas = ReplicaSet(reader_engines, settings.database_replica_retry_seconds)
+
+metrics.register_gauge(
+    "db_replicas_healthy",
+    lambda: len(replicas.healthy),
+    "Read replicas currently receiving reads",
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that can send reads to a replica.
+    
+    Only plain SELECTs issued inside run_db_read() are routed. Writes,
+    SELECT ... FOR UPDATE and - once the session has written anything -
+    all later statements go to the primary, so a session always reads
+    its own writes.
+    """
+    
+    @property
+    def replica_set(self) -> ReplicaSet:
+        """Read engines this session may route to."""
+        return replicas
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        elif (
+            self.info.get("read_only")
+            and not self.info.get("wrote")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            replica = self.replica_set.choose()
+            if replica is not None:
+                self.info["replica"] = replica
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context) -> None:
+    session.info["wrote"] = True
+
 
 # Session Factory
 
 SessionLocal = sessionmaker(
     bind=engine,
+    class_=RoutingSession,
     autocommit=False,
     autoflush=False,
 )
 
 
+# Background Worker Sessions
+#
+# Workers run their database work in threads (asyncio.to_thread). A
+# StaticPool hands every session the same connection - and so the same
+# transaction - which a worker thread would then share with requests on
+# the event loop. Workers get their own connections instead; an
+# in-memory database lives on that one connection, so it has none.
+
+if not isinstance(engine.pool, StaticPool):
+    worker_engine: Optional[Engine] = engine
+elif engine.url.database in (None, "", ":memory:"):
+    worker_engine = None
+else:
+    worker_engine = create_engine(
+        settings.database_url,
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+        pool_logging_name="worker",
+        echo=settings.is_development,
+    )
+    PoolMonitor("worker").attach(worker_engine)
+
+WorkerSessionLocal = (
+    sessionmaker(bind=worker_engine, autocommit=False, autoflush=False)
+    if worker_engine is not None
+    else None
+)
+
+
+# Async Engine (optional)
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart."""
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+    if url.startswith("postgres"):
+        return "postgresql+asyncpg" + url[url.index(":"):]
+    return url
+
+
+def create_async_engine_for(url: str, logging_name: str) -> AsyncEngine:
+    """
+    Async engine for a database URL.
+    
+    SQLite files get a NullPool: each session opens its own aiosqlite
+    connection, so concurrent sessions never share a transaction. Only
+    an in-memory database keeps a single (static) connection, since
+    it exists on that connection alone.
+    """
+    async_url = async_database_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            async_url,
+            poolclass=MonitoredAsyncQueuePool,
+            pool_logging_name=logging_name,
+            echo=settings.is_development,
+            **pool_options(),
+        )
+    
+    memory = make_url(url).database in (None, "", ":memory:")
+    async_sqlite_engine = create_async_engine(
+        async_url,
+        poolclass=StaticPool if memory else NullPool,
+        pool_logging_name=logging_name,
+        echo=settings.is_development,
+    )
+    if sqlite_wal_enabled():
+        event.listen(async_sqlite_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return async_sqlite_engine
+
+
+class AsyncRoutingSession(RoutingSession):
+    """
+    RoutingSession behind an AsyncSession: reads go to the async
+    replica engines (returned as their sync facades, as run_sync needs).
+    """
+    
+    @property
+    def replica_set(self) -> ReplicaSet:
+        return async_replicas
+
+
+async_engine = None
+AsyncSessionLocal = None
+async_reader_engines: List[AsyncEngine] = []
+
+if settings.database_async:
+    async_engine = create_async_engine_for(settings.database_url, "primary_async")
+    PoolMonitor("primary_async").attach(async_engine.sync_engine)
+    
+    for index, replica_url in enumerate(settings.database_replica_urls_list):
+        reader = create_async_engine_for(replica_url, f"replica{index}_async")
+        PoolMonitor(reader.sync_engine.pool.logging_name).attach(reader.sync_engine)
+        async_reader_engines.append(reader)
+    
+    # Objects stay loaded after commit - they are read outside
+    # run_db, where lazy loading is not possible
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        sync_session_class=AsyncRoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+async_replicas = ReplicaSet(
+    [reader.sync_engine for reader in async_reader_engines],
+    settings.database_replica_retry_seconds,
+)
+
+
 # Base Model
 
 Base = declarative_base()
@@ -49,24 +355,112 @@ Base = declarative_base()
 
 # Dependency Injection
 
-def get_db():
+async def get_db():
     """
     FastAPI dependency that provides a database session.
     
+    Yields an AsyncSession when DATABASE_ASYNC is enabled, otherwise
+    a Session. Pass it to services through run_db() (or run_db_read()
+    for read-only work). The session only holds a pooled connection
+    while run_db() work is in progress.
+    
     Usage:
         @router.get("/items")
-        def get_items(db: Session = Depends(get_db)):
-            ...
+        async def get_items(db: Session = Depends(get_db)):
+            return await run_db(db, lambda s: ItemService(s).list_items())
     
     Automatically closes session after request completes.
     """
-    db = SessionLocal()
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    
+    # Objects stay loaded after commit, so reading them between
+    # run_db() calls does not check a connection out again
+    db = SessionLocal(expire_on_commit=False)
     try:
         yield db
     finally:
         db.close()
 
 
+async def run_db(
+    db: Union[Session, AsyncSession],
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """
+    Run one unit of synchronous ORM work against either session type.
+    
+    fn receives a Session as its first argument. For an AsyncSession it
+    runs through run_sync, so its queries go through the async driver
+    without blocking the event loop; for a Session it is called directly.
+    
+    The transaction is ended when fn returns (committed) or raises
+    (rolled back), which returns the connection to the pool. Callers
+    can then wait on Stripe, SMS or PDF rendering without holding a
+    connection; the next run_db() checks one out again.
+    """
+    if isinstance(db, AsyncSession):
+        try:
+            result = await db.run_sync(fn, *args, **kwargs)
+        except BaseException:
+            await db.rollback()
+            raise
+        if db.in_transaction():
+            await db.commit()
+        return result
+    
+    try:
+        result = fn(db, *args, **kwargs)
+    except BaseException:
+        db.rollback()
+        raise
+    if db.in_transaction():
+        db.commit()
+    return result
+
+
+async def run_db_read(
+    db: Union[Session, AsyncSession],
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """
+    Like run_db(), for work that only reads.
+    
+    Its SELECTs may be served by a read replica (see RoutingSession).
+    If the replica's connection fails, the replica is marked down and
+    the work is retried once on the primary.
+    """
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info["read_only"] = True
+    try:
+        return await run_db(db, fn, *args, **kwargs)
+    except DBAPIError as e:
+        replica = session.info.get("replica")
+        if replica is None or not (e.connection_invalidated or isinstance(e, OperationalError)):
+            raise
+        session.replica_set.mark_down(replica, e)
+        session.info["read_only"] = False
+        return await run_db(db, fn, *args, **kwargs)
+    finally:
+        session.info.pop("read_only", None)
+        session.info.pop("replica", None)
+
+
+def read_engine_for(db: Union[Session, AsyncSession]) -> Engine:
+    """Synchronous engine for a streaming read in a thread (replica if healthy)."""
+    if isinstance(db, AsyncSession):
+        return engine
+    if db.info.get("wrote"):
+        return db.get_bind()
+    return replicas.choose() or db.get_bind()
+
+
 def init_db():
     """
     Initialize database tables.
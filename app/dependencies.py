@@ -11,10 +11,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, run_db_read
 from app.config import settings
-from app.models.user import User
-from app.schemas.auth import TokenData
+from app.schemas.auth import Principal, TokenData
+from app.services.auth_service import AuthService
 from app.utils.logger import logger
 
 
@@ -25,10 +25,13 @@ security = HTTPBearer()
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     """
     Dependency to get the current authenticated user by verifying JWT.
     
+    Returns a cached Principal when possible - the session only opens
+    a connection on a cache miss.
+    
     Raises 401 if token is invalid, expired, or user not found.
     """
     token = credentials.credentials
@@ -52,8 +55,11 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
         
-    # Check if user exists in database
-    user = db.query(User).filter(User.username == token_data.username).first()
+    # Check if user exists (principal cache, then database)
+    user = await run_db_read(
+        db,
+        lambda s: AuthService(s).get_principal(token_data.username),
+    )
     if user is None:
         raise credentials_exception
     
@@ -64,8 +70,8 @@ async def get_current_user(
 
 
 async def get_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     Dependency to ensure the current user is active.
     """
@@ -14,8 +14,15 @@ from fastapi.responses import JSONResponse
 from app import __version__
 from app.config import settings
 from app.database import init_db
-from app.routes import api_router
+from app.middleware import RequestInstrumentationMiddleware
+from app.routes import api_router, prometheus_router
+from app.services.metrics_exporter import metrics_exporter
+from app.services.notifier import notifier
+from app.services.redis_client import redis_client
+from app.services.stripe_client import stripe_client
 from app.utils import logger, setup_logging, POSException
+from app.utils.security import password_hasher
+from app.workers import sms_outbox_worker, pdf_renderer, webhook_worker, reconciler
 
 
 # Lifespan Events
@@ -41,10 +48,32 @@ async def lifespan(app: FastAPI):
         init_db()
         logger.info("Database tables created")
     
+    # Start background workers
+    if settings.sms_outbox_workers > 0:
+        await sms_outbox_worker.start()
+    if settings.webhook_workers > 0:
+        await webhook_worker.start()
+    if settings.reconcile_interval_seconds > 0:
+        await reconciler.start()
+    await pdf_renderer.start()
+    await notifier.start()
+    await metrics_exporter.start()
+    if not settings.metrics_token and not settings.is_development:
+        logger.warning("METRICS_TOKEN not set - /metrics refuses every scrape")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down POS System")
+    await metrics_exporter.stop()
+    await notifier.stop()
+    await reconciler.stop()
+    await webhook_worker.stop()
+    await sms_outbox_worker.stop()
+    await pdf_renderer.stop()
+    await stripe_client.close()
+    await redis_client.close()
+    password_hasher.shutdown()
 
 
 # Create FastAPI App
@@ -71,8 +100,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-Id"],
 )
 
+# Request IDs, access logs and latency metrics (outermost, so the
+# numbers include every other middleware)
+app.add_middleware(RequestInstrumentationMiddleware)
+
 
 # Exception Handlers
 
@@ -126,6 +160,7 @@ async def general_exception_handler(request: Request, exc: Exception):
 # Register Routes
 
 app.include_router(api_router)
+app.include_router(prometheus_router, tags=["Metrics"])
 
 
 # Root Endpoint
@@ -3,6 +3,6 @@ Middleware modules.
 """
 
 from app.middleware.cors import setup_cors
-from app.middleware.logging import LoggingMiddleware
+from app.middleware.instrumentation import RequestInstrumentationMiddleware
 
-__all__ = ["setup_cors", "LoggingMiddleware"]
+__all__ = ["setup_cors", "RequestInstrumentationMiddleware"]
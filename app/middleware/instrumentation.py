@@ -0,0 +1,121 @@
+"""
+Request Instrumentation Middleware
+
+Assigns request IDs, logs each request and records per-route latency
+and status counts for the metrics endpoint.
+"""
+
+import re
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from structlog.contextvars import bind_contextvars, reset_contextvars
+
+from app.utils import logger
+from app.utils.metrics import CounterFamily, HistogramFamily, metrics
+
+
+# Incoming X-Request-Id values are kept only if they look like an ID
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Requests that matched no route share one label, so scanners probing
+# random paths cannot create unbounded metric series
+UNMATCHED_ROUTE = "<unmatched>"
+
+request_latency = HistogramFamily(("method", "route"))
+request_count = CounterFamily(("method", "route", "status"))
+
+metrics.register_histogram(
+    "http_request_duration_seconds",
+    request_latency,
+    "Request latency by method and route template",
+)
+metrics.register_counter(
+    "http_requests_total",
+    request_count,
+    "Responses by method, route template and status code",
+)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request.
+
+    Unlike BaseHTTPMiddleware it adds no task or stream per request and
+    never touches the body: it only wraps `send` to read the status and
+    add the X-Request-Id header. The request ID is taken from an
+    incoming X-Request-Id header when valid, exposed as
+    request.state.request_id and bound to every log line written while
+    the request runs.
+
+    Metrics are labelled with the route template (e.g.
+    /api/v1/transactions/{transaction_id}), not the raw path. Latency is
+    measured until the response body is complete, so streaming and
+    long-poll routes report how long they were held open.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._request_id(scope)
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-Id", request_id)
+            await send(message)
+
+        tokens = bind_contextvars(request_id=request_id)
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception as e:
+            logger.error(
+                "Request failed",
+                method=scope["method"],
+                path=scope["path"],
+                duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+                error=str(e),
+            )
+            raise
+        finally:
+            duration = time.perf_counter() - start_time
+            route = self._route_template(scope)
+            request_latency.labels(scope["method"], route).observe(duration)
+            request_count.inc(scope["method"], route, str(status_code))
+            reset_contextvars(**tokens)
+
+        logger.info(
+            "Request completed",
+            request_id=request_id,
+            method=scope["method"],
+            path=scope["path"],
+            status_code=status_code,
+            duration_ms=round(duration * 1000, 2),
+        )
+
+    @staticmethod
+    def _request_id(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                if REQUEST_ID_PATTERN.match(request_id):
+                    return request_id
+                break
+        return uuid.uuid4().hex[:8]
+
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        """Path template of the matched route (set in scope by the router)."""
+        route = scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
@@ -1,80 +0,0 @@
-"""
-Request/Response Logging Middleware
-
-Logs all API requests for debugging and monitoring.
-"""
-
-import time
-import uuid
-from typing import Callable
-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from app.utils import logger
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware that logs all requests and responses.
-    
-    Adds a unique request ID to each request for tracing.
-    Logs request method, path, status, and duration.
-    """
-    
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable,
-    ) -> Response:
-        # Generate unique request ID
-        request_id = str(uuid.uuid4())[:8]
-        
-        # Add request ID to response headers
-        request.state.request_id = request_id
-        
-        # Record start time
-        start_time = time.time()
-        
-        # Log incoming request
-        logger.info(
-            "Request started",
-            request_id=request_id,
-            method=request.method,
-            path=request.url.path,
-            client_ip=request.client.host if request.client else None,
-        )
-        
-        # Process request
-        try:
-            response = await call_next(request)
-        except Exception as e:
-            # Log error
-            duration = time.time() - start_time
-            logger.error(
-                "Request failed",
-                request_id=request_id,
-                method=request.method,
-                path=request.url.path,
-                duration_ms=round(duration * 1000, 2),
-                error=str(e),
-            )
-            raise
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            "Request completed",
-            request_id=request_id,
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            duration_ms=round(duration * 1000, 2),
-        )
-        
-        # Add request ID to response headers
-        response.headers["X-Request-Id"] = request_id
-        
-        return response
@@ -9,10 +9,20 @@ from app.models.transaction import Transaction
 from app.models.payment_link import PaymentLink
 from app.models.receipt import Receipt
 from app.models.user import User
+from app.models.sms_outbox import SMSOutbox
+from app.models.transaction_rollup import TransactionRollup
+from app.models.webhook_event import WebhookEvent
+from app.models.processed_event import ProcessedEvent
+from app.models.sync_cursor import SyncCursor
 
 __all__ = [
     "Transaction",
     "PaymentLink",
     "Receipt",
     "User",
+    "SMSOutbox",
+    "TransactionRollup",
+    "WebhookEvent",
+    "ProcessedEvent",
+    "SyncCursor",
 ]
@@ -55,7 +55,7 @@ class PaymentLink(Base):
     # Stripe references
     stripe_link_id = Column(String(255), unique=True, index=True)
     stripe_price_id = Column(String(255))
-    stripe_session_id = Column(String(255))  # Checkout session if used
+    stripe_session_id = Column(String(255), index=True)  # Checkout session if used
     
     # Payment URL
     url = Column(Text, nullable=False)
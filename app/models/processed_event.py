@@ -0,0 +1,49 @@
+"""
+Processed Event Model
+
+Stripe event IDs that have already been handled.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.database import Base
+
+
+class ProcessedEvent(Base):
+    """
+    De-duplication record for a handled Stripe event.
+
+    Inserted in the same commit as the handler's changes, so the unique
+    event_id guarantees each event is applied at most once even when
+    Stripe redelivers it or two workers race. Rows older than
+    webhook_dedup_retention_days are swept (Stripe stops retrying
+    after 3 days).
+
+    Attributes:
+        id: Primary key
+        event_id: Stripe event ID (evt_...) - unique
+        event_type: Stripe event type
+        processed_at: When the event was handled
+    """
+
+    __tablename__ = "processed_events"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Event
+    event_id = Column(String(255), unique=True, nullable=False)
+    event_type = Column(String(100), nullable=False)
+
+    # Timestamps - indexed for the retention sweep
+    processed_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True,
+    )
+
+    def __repr__(self) -> str:
+        return f"<ProcessedEvent(event_id={self.event_id})>"
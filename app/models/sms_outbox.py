@@ -0,0 +1,87 @@
+"""
+SMS Outbox Model
+
+Durable queue of SMS messages waiting to be delivered.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    ForeignKey,
+    Index,
+)
+
+from app.database import Base
+
+
+class SMSOutbox(Base):
+    """
+    Queued SMS message.
+
+    Routes insert a row and return immediately; the SMS outbox worker
+    claims due rows, sends them and writes the result back to the
+    linked PaymentLink or Receipt.
+
+    Attributes:
+        id: Primary key
+        phone: Recipient phone number
+        message: Message body
+        sender_id: Sender ID override (optional)
+        status: pending, sending, sent, failed
+        attempts: Delivery attempts so far
+        max_attempts: Attempts before giving up
+        next_attempt_at: Earliest time for the next attempt
+        locked_by: Worker that claimed the message
+        locked_until: Claim lease expiry (reclaimed after a crash)
+        last_error: Error from the most recent attempt
+        message_id: Africa's Talking message ID once sent
+        payment_link_id: PaymentLink to update on delivery
+        receipt_id: Receipt to update on delivery
+        created_at: When the message was queued
+        sent_at: When the message was sent
+    """
+
+    __tablename__ = "sms_outbox"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Message
+    phone = Column(String(20), nullable=False)
+    message = Column(Text, nullable=False)
+    sender_id = Column(String(20))
+
+    # Delivery state
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(64))
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    message_id = Column(String(255))  # Africa's Talking message ID
+
+    # What to update once delivered
+    payment_link_id = Column(Integer, ForeignKey("payment_links.id"))
+    receipt_id = Column(Integer, ForeignKey("receipts.id"))
+
+    # Timestamps
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    sent_at = Column(DateTime)
+
+    # Workers poll on (status, next_attempt_at)
+    __table_args__ = (
+        Index("ix_sms_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SMSOutbox(id={self.id}, status={self.status}, attempts={self.attempts})>"
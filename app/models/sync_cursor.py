@@ -0,0 +1,51 @@
+"""
+Sync Cursor Model
+
+Progress markers for jobs that catch up with an external system.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Text
+
+from app.database import Base
+
+
+class SyncCursor(Base):
+    """
+    Named high-water mark for a catch-up job.
+
+    The Stripe event replay stores the time up to which every event has
+    been fetched, so the next run starts where the last one finished.
+
+    Attributes:
+        id: Primary key
+        name: Job name (e.g. "stripe_events") - unique
+        position: Everything created before this time has been synced
+        last_run_at: When the job last ran
+        last_result: Summary of the last run (JSON)
+        updated_at: Last update timestamp
+    """
+
+    __tablename__ = "sync_cursors"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Cursor
+    name = Column(String(100), unique=True, nullable=False)
+    position = Column(DateTime)
+
+    # Last run
+    last_run_at = Column(DateTime)
+    last_result = Column(Text)
+
+    # Timestamps
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncCursor(name={self.name}, position={self.position})>"
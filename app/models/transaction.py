@@ -40,6 +40,7 @@ class Transaction(Base):
         customer_phone: Customer phone for SMS receipt
         description: Transaction description/memo
         metadata: Additional JSON metadata
+        last_event_at: Stripe creation time of the last applied event
         created_at: When transaction was created
         updated_at: Last update timestamp
     """
@@ -82,6 +83,10 @@ class Transaction(Base):
     # Description
     description = Column(Text)
     
+    # Creation time of the newest Stripe event applied to this row;
+    # older events arriving late must not overwrite a newer status
+    last_event_at = Column(DateTime)
+    
     # Timestamps (always UTC)
     created_at = Column(
         DateTime,
@@ -91,7 +96,9 @@ class Transaction(Base):
     )
     updated_at = Column(
         DateTime,
+        default=datetime.utcnow,
         onupdate=datetime.utcnow,
+        index=True,  # Change feed seeks on this
     )
     
     # Relationships
@@ -0,0 +1,79 @@
+"""
+Transaction Rollup Model
+
+Pre-aggregated transaction counts and amounts per time bucket.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Numeric,
+    UniqueConstraint,
+)
+
+from app.database import Base
+
+
+class TransactionRollup(Base):
+    """
+    Sales totals for one (granularity, bucket, currency, status).
+
+    Maintained incrementally as transactions are created and change
+    status, so dashboards read O(buckets) rows instead of scanning
+    the transactions table. Rebuild from raw rows with:
+        python -m app.cli rebuild-rollups
+
+    Attributes:
+        id: Primary key
+        granularity: Bucket size ("hour" or "day")
+        bucket_start: Start of the bucket (UTC, truncated created_at)
+        currency: ISO 4217 currency code
+        status: Transaction status counted in this bucket
+        count: Number of transactions
+        amount: Sum of transaction amounts
+        updated_at: Last time the bucket changed
+    """
+
+    __tablename__ = "transaction_rollups"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Bucket key
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    currency = Column(String(3), nullable=False)
+    status = Column(String(50), nullable=False)
+
+    # Aggregates
+    count = Column(Integer, nullable=False, default=0)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+    # Timestamps
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    # One row per bucket - also the upsert conflict target
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "currency",
+            "status",
+            name="uq_transaction_rollups_bucket",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<TransactionRollup({self.granularity} {self.bucket_start}, "
+            f"{self.currency}, {self.status}, count={self.count})>"
+        )
@@ -0,0 +1,89 @@
+"""
+Webhook Event Model
+
+Inbox of verified Stripe webhook events waiting to be processed.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+    Index,
+)
+
+from app.database import Base
+
+
+class WebhookEvent(Base):
+    """
+    Received Stripe event.
+
+    The webhook route verifies the signature, stores the raw event here
+    and acknowledges Stripe straight away; the webhook worker claims
+    pending rows and runs the TransactionService handlers.
+
+    Attributes:
+        id: Primary key
+        event_id: Stripe event ID (evt_...)
+        event_type: Stripe event type (payment_intent.succeeded, ...)
+        partition_key: Payment intent the event belongs to (event ID
+            if none) - events sharing a key are processed one at a time
+        event_created: Stripe's event creation time, the order within
+            a partition
+        payload: Raw event JSON as received
+        status: pending, processing, processed, failed
+        attempts: Processing attempts so far
+        max_attempts: Attempts before giving up
+        next_attempt_at: Earliest time for the next attempt
+        locked_by: Worker that claimed the event
+        locked_until: Claim lease expiry (reclaimed after a crash)
+        last_error: Error from the most recent attempt
+        received_at: When Stripe delivered the event
+        processed_at: When processing finished
+    """
+
+    __tablename__ = "webhook_events"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Event
+    event_id = Column(String(255), nullable=False, index=True)
+    event_type = Column(String(100), nullable=False)
+    partition_key = Column(String(255), nullable=False)
+    event_created = Column(DateTime, nullable=False)
+    payload = Column(Text, nullable=False)
+
+    # Processing state
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=8)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(64))
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+
+    # Timestamps
+    received_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    processed_at = Column(DateTime)
+
+    # Workers poll on (status, next_attempt_at); claiming checks for
+    # earlier unprocessed events in the same partition
+    __table_args__ = (
+        Index("ix_webhook_events_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_webhook_events_partition", "partition_key", "status", "event_created"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<WebhookEvent(id={self.id}, event_id={self.event_id}, "
+            f"status={self.status})>"
+        )
@@ -12,6 +12,7 @@ from app.routes.payment_links import router as payment_links_router
 from app.routes.webhooks import router as webhooks_router
 from app.routes.receipts import router as receipts_router
 from app.routes.auth import router as auth_router
+from app.routes.metrics import router as metrics_router, prometheus_router
 
 
 # Main API router that includes all sub-routers
@@ -24,6 +25,7 @@ api_router.include_router(transactions_router, tags=["Transactions"])
 api_router.include_router(payment_links_router, tags=["Payment Links"])
 api_router.include_router(receipts_router, tags=["Receipts"])
 api_router.include_router(webhooks_router, tags=["Webhooks"])
+api_router.include_router(metrics_router, tags=["Metrics"])
 
 
-__all__ = ["api_router"]
+__all__ = ["api_router", "prometheus_router"]
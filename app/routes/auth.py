@@ -4,11 +4,12 @@ Auth Routes
 Endpoints for login and authentication.
 """
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.auth import UserLogin, UserRegister, Token, UserResponse
+from app.dependencies import get_current_user
+from app.schemas.auth import Principal, UserLogin, UserRegister, UserUpdate, Token, UserResponse
 from app.services.auth_service import AuthService
 
 
@@ -18,15 +19,20 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/login", response_model=Token)
 async def login(
     login_data: UserLogin,
+    request: Request,
     db: Session = Depends(get_db),
 ):
     """
     Authenticate user and return JWT token.
+    
+    Repeated failures lock out the username (and client address)
+    for a while - further attempts get a 429.
     """
     auth_service = AuthService(db)
-    user = auth_service.authenticate_user(
+    user = await auth_service.authenticate_user(
         login_data.username, 
-        login_data.password
+        login_data.password,
+        client_ip=request.client.host if request.client else None,
     )
     
     access_token = auth_service.create_access_token(
@@ -45,4 +51,36 @@ async def register(
     Register a new admin user (intended for initial setup).
     """
     auth_service = AuthService(db)
-    return auth_service.register_user(user_data)
+    return await auth_service.register_user(user_data)
+
+
+@router.patch("/users/{username}", response_model=UserResponse)
+async def update_user(
+    username: str,
+    user_data: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Change a user's email, password or active flag.
+    
+    The user's cached principal is dropped in every worker.
+    """
+    auth_service = AuthService(db)
+    return await auth_service.update_user(
+        username,
+        **user_data.model_dump(exclude_unset=True),
+    )
+
+
+@router.post("/users/{username}/deactivate", response_model=UserResponse)
+async def deactivate_user(
+    username: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Deactivate a user; their tokens stop working immediately.
+    """
+    auth_service = AuthService(db)
+    return await auth_service.deactivate_user(username)
@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from app import __version__
-from app.database import get_db
+from app.database import get_db, run_db
 from app.config import settings
 from app.schemas.common import HealthResponse
 
@@ -39,7 +39,7 @@ async def health_check(db: Session = Depends(get_db)) -> dict:
     
     # Check database connection
     try:
-        db.execute(text("SELECT 1"))
+        await run_db(db, lambda s: s.execute(text("SELECT 1")))
         response["database"] = "connected"
     except Exception:
         response["status"] = "degraded"
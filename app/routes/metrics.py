@@ -0,0 +1,118 @@
+"""
+Metrics Endpoints
+
+Process-level operational numbers (cache hit rates, queue depths) as
+JSON, and every worker's metrics in the Prometheus text format.
+"""
+
+import hmac
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db, run_db_read
+from app.dependencies import get_current_user
+from app.schemas.auth import Principal
+from app.services.metrics_exporter import metrics_exporter
+from app.services.sms_outbox_service import SMSOutboxService
+from app.services.webhook_service import WebhookService
+from app.utils import logger, AuthenticationError
+from app.utils.metrics import MetricFamily, metrics, render_prometheus
+
+
+router = APIRouter()
+
+# Served at the root (/metrics), where Prometheus scrapes by default
+prometheus_router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics")
+async def get_metrics(
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    """
+    Current metric values for this worker process.
+    """
+    return {
+        "status": "success",
+        "data": metrics.collect(),
+    }
+
+
+def _read_backlogs(db: Session) -> tuple:
+    return SMSOutboxService(db).pending_count(), WebhookService(db).backlog()
+
+
+async def _backlog_families(db: Session) -> List[MetricFamily]:
+    """
+    Outbox and inbox depths. They live in the database, so they are
+    shared by all workers and read once per scrape rather than
+    published by each worker.
+    """
+    try:
+        sms_pending, webhooks = await run_db_read(db, _read_backlogs)
+    except Exception as e:
+        logger.warning("Backlog metrics unavailable", error=str(e))
+        return []
+
+    def gauge(name: str, help: str, value: float) -> MetricFamily:
+        return MetricFamily(name, "gauge", help, [("", (), float(value))])
+
+    return [
+        gauge("sms_outbox_pending", "SMS messages waiting to be sent", sms_pending),
+        MetricFamily(
+            "webhook_inbox_events",
+            "gauge",
+            "Webhook inbox events by status",
+            [
+                ("", (("status", status),), float(webhooks[status]))
+                for status in ("pending", "processing", "failed")
+            ],
+        ),
+        gauge(
+            "webhook_inbox_lag_seconds",
+            "Age of the oldest unprocessed webhook event",
+            webhooks["lag_seconds"],
+        ),
+    ]
+
+
+def require_metrics_token(authorization: Optional[str] = Header(default=None)) -> None:
+    """
+    Check `Authorization: Bearer <METRICS_TOKEN>`.
+
+    Only a development server may leave METRICS_TOKEN unset (anywhere
+    else every scrape is refused until it is configured). Declared
+    before get_db, so a refused scrape never opens a session.
+    """
+    if not settings.metrics_token:
+        if not settings.is_development:
+            raise AuthenticationError(message="Metrics token not configured")
+    elif not hmac.compare_digest(authorization or "", f"Bearer {settings.metrics_token}"):
+        raise AuthenticationError(message="Invalid metrics token")
+
+
+@prometheus_router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(
+    _: None = Depends(require_metrics_token),
+    db: Session = Depends(get_db),
+) -> PlainTextResponse:
+    """
+    Metrics for all workers in the Prometheus text format.
+    
+    Covers request latency by route, SQL statement counts and time,
+    Stripe and SMS latency and failures, connection pools, caches and
+    queue depths. Requires the metrics token (see require_metrics_token).
+    """
+    families = await metrics_exporter.families()
+    families.extend(await _backlog_families(db))
+
+    return PlainTextResponse(
+        render_prometheus(families),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
@@ -7,9 +7,10 @@ Create and manage Stripe Payment Links sent via SMS.
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db
 from app.dependencies import get_current_user
-from app.models.user import User
+from app.schemas.auth import Principal
 from app.schemas.payment import PaymentLinkRequest, PaymentLinkResponse
 from app.services.payment_link_service import PaymentLinkService
 from app.utils import logger
@@ -22,7 +23,7 @@ router = APIRouter(prefix="/payment-links")
 async def create_payment_link(
     link_data: PaymentLinkRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Create a payment link and optionally send via SMS.
@@ -47,30 +48,47 @@ async def create_payment_link(
 async def get_payment_link(
     link_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Get payment link status and details.
     """
-    service = PaymentLinkService(db)
-    link = service.get_payment_link(link_id)
+    link = await PaymentLinkService(db).get_payment_link_data(link_id)
+    
+    if not link:
+        raise HTTPException(status_code=404, detail="Payment link not found")
+    
+    return {
+        "status": "success",
+        "data": link,
+    }
+
+
+@router.get("/{link_id}/wait")
+async def wait_for_payment_link(
+    link_id: int,
+    timeout: int = Query(
+        settings.status_wait_timeout_seconds,
+        ge=1,
+        le=settings.status_wait_max_seconds,
+    ),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    """
+    Long-poll a payment link until it is paid.
+    
+    Responds as soon as the link is paid, or with the unpaid link after
+    `timeout` seconds - the client then simply asks again.
+    """
+    link = await PaymentLinkService(db).wait_until_paid(link_id, timeout)
     
     if not link:
         raise HTTPException(status_code=404, detail="Payment link not found")
     
     return {
         "status": "success",
-        "data": {
-            "id": link.id,
-            "url": link.url,
-            "amount": link.amount,
-            "currency": link.currency,
-            "customer_phone": link.customer_phone,
-            "paid": link.paid,
-            "sms_sent": link.sms_sent,
-            "is_expired": link.is_expired,
-            "created_at": link.created_at.isoformat(),
-        }
+        "data": link,
     }
 
 
@@ -78,7 +96,7 @@ async def get_payment_link(
 async def resend_payment_link_sms(
     link_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Resend the payment link via SMS.
@@ -7,9 +7,9 @@ Generate and deliver receipts for transactions.
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, run_db_read
 from app.dependencies import get_current_user
-from app.models.user import User
+from app.schemas.auth import Principal
 from app.schemas.receipt import ReceiptRequest, ReceiptResponse
 from app.services.receipt_service import ReceiptService
 from app.utils import logger
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/receipts")
 async def generate_receipt(
     receipt_data: ReceiptRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Generate and optionally deliver a receipt.
@@ -48,13 +48,15 @@ async def generate_receipt(
 async def get_receipt(
     receipt_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Get receipt details by ID.
     """
-    service = ReceiptService(db)
-    receipt = service.get_receipt(receipt_id)
+    receipt = await run_db_read(
+        db,
+        lambda s: ReceiptService(s).get_receipt(receipt_id),
+    )
     
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
@@ -78,13 +80,15 @@ async def get_receipt(
 async def get_receipts_for_transaction(
     transaction_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Get all receipts for a transaction.
     """
-    service = ReceiptService(db)
-    receipts = service.get_receipts_for_transaction(transaction_id)
+    receipts = await run_db_read(
+        db,
+        lambda s: ReceiptService(s).get_receipts_for_transaction(transaction_id),
+    )
     
     return {
         "status": "success",
@@ -4,17 +4,21 @@ Transaction Endpoints
 CRUD operations for payment transactions.
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, read_engine_for, run_db_read
 from app.dependencies import get_current_user
-from app.models.user import User
+from app.schemas.auth import Principal
 from app.schemas.transaction import (
     TransactionCreate,
     TransactionResponse,
     TransactionList,
+    TransactionStats,
 )
 from app.schemas.payment import (
     PaymentRequest,
@@ -22,7 +26,10 @@ from app.schemas.payment import (
     RefundRequest,
     RefundResponse,
 )
+from app.services.export_service import ExportService, MEDIA_TYPES
 from app.services.payment_service import PaymentService
+from app.services.rollup_service import RollupService
+from app.services.transaction_feed import TransactionFeed
 from app.services.transaction_service import TransactionService
 from app.utils import logger
 
@@ -34,7 +41,7 @@ router = APIRouter(prefix="/transactions")
 async def create_payment(
     payment_data: PaymentRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Create a new payment.
@@ -57,10 +64,13 @@ async def create_payment(
 @router.get("", response_model=TransactionList)
 async def list_transactions(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     page: int = Query(default=1, ge=1),
     per_page: int = Query(default=20, ge=1, le=100),
     status: Optional[str] = Query(default=None),
+    mode: Literal["offset", "cursor"] = Query(default="offset"),
+    cursor: Optional[str] = Query(default=None),
+    count: Literal["exact", "cached", "estimate"] = Query(default="exact"),
 ) -> dict:
     """
     List all transactions with pagination.
@@ -69,42 +79,200 @@ async def list_transactions(
     - page: Page number (default: 1)
     - per_page: Items per page (default: 20, max: 100)
     - status: Filter by status (pending, succeeded, failed, refunded)
+    - mode: "offset" (page numbers) or "cursor" (constant-time deep paging)
+    - cursor: next_cursor from the previous page (implies mode=cursor)
+    - count: How offset mode computes the total - "exact", "cached"
+      (short TTL, invalidated by webhooks) or "estimate" (PostgreSQL
+      planner statistics). pagination.count_strategy reports which was used.
     """
-    service = TransactionService(db)
-    transactions, total = service.list_transactions(
-        page=page,
-        per_page=per_page,
-        status=status,
+    if mode == "cursor" or cursor:
+        transactions, next_cursor = await run_db_read(
+            db,
+            lambda s: TransactionService(s).list_transactions_after(
+                cursor=cursor,
+                per_page=per_page,
+                status=status,
+            ),
+        )
+        
+        return {
+            "status": "success",
+            "data": transactions,
+            "pagination": {
+                "mode": "cursor",
+                "per_page": per_page,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+            }
+        }
+    
+    transactions, total, count_strategy = await run_db_read(
+        db,
+        lambda s: TransactionService(s).list_transactions(
+            page=page,
+            per_page=per_page,
+            status=status,
+            count_strategy=count,
+        ),
     )
     
     return {
         "status": "success",
         "data": transactions,
         "pagination": {
+            "mode": "offset",
             "page": page,
             "per_page": per_page,
             "total": total,
             "total_pages": (total + per_page - 1) // per_page,
+            "count_strategy": count_strategy,
         }
     }
 
 
+@router.get("/stats", response_model=TransactionStats)
+async def transaction_stats(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    granularity: Literal["hour", "day"] = Query(default="day"),
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    currency: Optional[str] = Query(default=None, min_length=3, max_length=3),
+) -> dict:
+    """
+    Sales statistics from the rollup table.
+    
+    Reads pre-aggregated buckets, so cost depends on the number of
+    buckets in the range, not on the size of the transactions table.
+    
+    Query Parameters:
+    - granularity: Bucket size (hour or day)
+    - start / end: Time range (UTC, end exclusive)
+    - currency: Restrict to one currency
+    """
+    return await run_db_read(
+        db,
+        lambda s: RollupService(s).get_stats(
+            granularity=granularity,
+            start=start,
+            end=end,
+            currency=currency,
+        ),
+    )
+
+
+@router.get("/export")
+async def export_transactions(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    status: Optional[str] = Query(default=None),
+) -> StreamingResponse:
+    """
+    Stream every matching transaction as CSV or NDJSON.
+    
+    Rows are read through a server-side cursor and written as they
+    arrive, so memory stays flat however many rows match.
+    
+    Query Parameters:
+    - format: "csv" (with header row) or "ndjson" (one object per line)
+    - start / end: created_at range (UTC, end exclusive)
+    - status: Filter by status
+    """
+    logger.info(
+        "Exporting transactions",
+        format=format,
+        start=start,
+        end=end,
+        status=status,
+    )
+    
+    service = ExportService(read_engine_for(db))
+    filename = f"transactions-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    
+    return StreamingResponse(
+        service.stream(format=format, start=start, end=end, status=status),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/feed")
+async def transaction_feed(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    limit: int = Query(default=20, ge=1, le=100),
+    last_event_id: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    """
+    Live transaction feed (server-sent events).
+    
+    Sends a `snapshot` event with the latest `limit` transactions, then
+    a `transaction` event with the full row whenever one is created or
+    changes status. Clients upsert rows by id. On reconnect, send the
+    last event id back as the Last-Event-ID header to receive only what
+    changed meanwhile (or a fresh snapshot after a long absence).
+    """
+    feed = TransactionFeed(db, snapshot_size=limit)
+    
+    return StreamingResponse(
+        feed.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Keep nginx from buffering events
+        },
+    )
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> TransactionResponse:
     """
     Get a single transaction by ID.
     """
-    service = TransactionService(db)
-    transaction = service.get_transaction(transaction_id)
+    transaction = await TransactionService(db).get_transaction_data(transaction_id)
+    
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    
+    return transaction
+
+
+@router.get("/{transaction_id}/wait", response_model=TransactionResponse)
+async def wait_for_transaction(
+    transaction_id: int,
+    status: str = Query("pending", description="Return once the status is no longer this"),
+    timeout: int = Query(
+        settings.status_wait_timeout_seconds,
+        ge=1,
+        le=settings.status_wait_max_seconds,
+    ),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> TransactionResponse:
+    """
+    Long-poll a transaction until its status changes.
+    
+    Responds as soon as the status differs from `status`, or with the
+    unchanged transaction after `timeout` seconds - the client then
+    simply asks again. Replaces repeated GET /transactions/{id} polls.
+    """
+    transaction = await TransactionService(db).wait_for_status_change(
+        transaction_id,
+        status,
+        timeout,
+    )
     
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    return TransactionResponse.model_validate(transaction)
+    return transaction
 
 
 @router.post("/{transaction_id}/refund", response_model=RefundResponse)
@@ -112,7 +280,7 @@ async def refund_transaction(
     transaction_id: int,
     refund_data: RefundRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     """
     Refund a transaction (full or partial).
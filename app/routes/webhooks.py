@@ -5,14 +5,19 @@ Handle incoming webhooks from Stripe.
 CRITICAL: Always verify webhook signatures before processing.
 """
 
-from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, Request, HTTPException, Depends
 from sqlalchemy.orm import Session
 import stripe
 
-from app.database import get_db
+from app.database import WorkerSessionLocal, get_db, run_db, run_db_read
 from app.config import settings
-from app.services.transaction_service import TransactionService
-from app.utils import logger
+from app.dependencies import get_current_user
+from app.schemas.auth import Principal
+from app.schemas.webhook import ReplayRequest
+from app.services.replay_service import ReplayService, replay_in_progress, run_replay
+from app.services.webhook_service import WebhookService
+from app.utils import logger, ServiceUnavailableError
+from app.workers.webhook_worker import webhook_worker
 
 
 router = APIRouter(prefix="/webhooks")
@@ -29,10 +34,9 @@ async def stripe_webhook(
     SECURITY: Verifies webhook signature before processing.
     Stripe signs all webhooks - we MUST verify to prevent spoofing.
     
-    Events handled:
-    - payment_intent.succeeded: Mark transaction as successful
-    - payment_intent.payment_failed: Mark transaction as failed
-    - checkout.session.completed: Payment link was paid
+    Verified events are stored in the webhook inbox and acknowledged
+    immediately; the webhook worker runs the handlers (see
+    WebhookService.dispatch), so Stripe never waits on our database.
     """
     
     # Get raw body for signature verification
@@ -64,28 +68,95 @@ async def stripe_webhook(
         event_id=event.id,
     )
     
-    # Handle specific event types
-    service = TransactionService(db)
+    # Stripe redelivers events - acknowledge repeats without reprocessing
+    if await run_db(db, lambda s: WebhookService(s).is_duplicate(event.id)):
+        logger.info("Duplicate webhook acknowledged", event_id=event.id)
+        return {"status": "received", "event_type": event.type, "duplicate": True}
     
-    if event.type == "payment_intent.succeeded":
-        payment_intent = event.data.object
-        await service.handle_payment_success(payment_intent)
-        
-    elif event.type == "payment_intent.payment_failed":
-        payment_intent = event.data.object
-        await service.handle_payment_failure(payment_intent)
-        
-    elif event.type == "checkout.session.completed":
-        session = event.data.object
-        await service.handle_checkout_complete(session)
-        
-    elif event.type == "charge.refunded":
-        charge = event.data.object
-        await service.handle_refund(charge)
-    
-    else:
-        logger.debug("Unhandled webhook event type", event_type=event.type)
+    # Store for background processing
+    await run_db(
+        db,
+        lambda s: WebhookService(s).enqueue(event, payload.decode("utf-8")),
+    )
     
     # Always return 200 to acknowledge receipt
     # Stripe retries failed webhooks, so we must acknowledge even if we don't handle
     return {"status": "received", "event_type": event.type}
+
+
+@router.get("/status")
+async def webhook_status(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    """
+    Webhook inbox backlog and processing lag.
+    
+    lag_seconds is the age of the oldest unprocessed event.
+    """
+    return {
+        "status": "success",
+        "data": {
+            **await run_db_read(db, lambda s: WebhookService(s).backlog()),
+            "worker": {
+                "running": webhook_worker.running,
+                "queue_depth": webhook_worker.queue_depth,
+            },
+        },
+    }
+
+
+@router.post("/replay", status_code=202)
+async def replay_events(
+    replay_data: ReplayRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    """
+    Recover missed webhooks from Stripe's events list.
+    
+    Runs in the background: events are fetched in concurrent time
+    windows and queued in the webhook inbox (duplicates skipped).
+    Poll GET /webhooks/replay for progress.
+    """
+    if replay_in_progress():
+        raise ServiceUnavailableError(
+            message="A replay is already running",
+            code="REPLAY_RUNNING",
+        )
+    if WorkerSessionLocal is None:
+        raise ServiceUnavailableError(
+            message="Replay needs a file or server database",
+            code="REPLAY_UNAVAILABLE",
+        )
+    
+    logger.info(
+        "Stripe event replay requested",
+        start=replay_data.start,
+        end=replay_data.end,
+        user=current_user.username,
+    )
+    
+    background_tasks.add_task(run_replay, replay_data.start, replay_data.end)
+    
+    return {
+        "status": "accepted",
+        "data": {"start": replay_data.start, "end": replay_data.end},
+    }
+
+
+@router.get("/replay")
+async def replay_status(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    """
+    Replay cursor and the result of the last run.
+    """
+    return {
+        "status": "success",
+        "data": {
+            **await run_db(db, lambda s: ReplayService(s).status()),
+            "running": replay_in_progress(),
+        },
+    }
@@ -8,6 +8,7 @@ from app.schemas.transaction import (
     TransactionCreate,
     TransactionResponse,
     TransactionList,
+    TransactionStats,
 )
 from app.schemas.payment import (
     PaymentRequest,
@@ -20,11 +21,13 @@ from app.schemas.receipt import (
     ReceiptResponse,
 )
 from app.schemas.auth import (
+    Principal,
     Token,
     UserLogin,
     UserRegister,
     UserResponse,
 )
+from app.schemas.webhook import ReplayRequest
 from app.schemas.common import (
     SuccessResponse,
     ErrorResponse,
@@ -35,16 +38,19 @@ __all__ = [
     "TransactionCreate",
     "TransactionResponse",
     "TransactionList",
+    "TransactionStats",
     "PaymentRequest",
     "PaymentResponse",
     "PaymentLinkRequest",
     "PaymentLinkResponse",
     "ReceiptRequest",
     "ReceiptResponse",
+    "Principal",
     "Token",
     "UserLogin",
     "UserRegister",
     "UserResponse",
+    "ReplayRequest",
     "SuccessResponse",
     "ErrorResponse",
     "PaginationParams",
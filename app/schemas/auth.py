@@ -19,6 +19,21 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
+class Principal(BaseModel):
+    """
+    Authenticated user as seen by routes.
+    
+    Immutable and detached from the database session, so it can be
+    cached between requests.
+    """
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    
+    model_config = {"from_attributes": True, "frozen": True}
+
+
 class UserLogin(BaseModel):
     """User login request."""
     username: str
@@ -32,6 +47,13 @@ class UserRegister(BaseModel):
     password: str = Field(..., min_length=8)
 
 
+class UserUpdate(BaseModel):
+    """User update request (only the given fields change)."""
+    email: Optional[EmailStr] = None
+    password: Optional[str] = Field(default=None, min_length=8)
+    is_active: Optional[bool] = None
+
+
 class UserResponse(BaseModel):
     """User info in API response."""
     id: int
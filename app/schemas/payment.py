@@ -116,6 +116,7 @@ class PaymentLinkResponse(BaseModel):
     currency: str
     customer_phone: str
     sms_sent: bool
+    sms_queued: bool = False
     expires_at: Optional[str] = None
 
 
@@ -35,6 +35,7 @@ class ReceiptResponse(BaseModel):
     transaction_id: int
     delivery_method: str
     delivered: bool
+    delivery_queued: bool = False
     recipient: Optional[str] = None
     pdf_url: Optional[str] = None
 
@@ -6,7 +6,7 @@ Request/response models for transaction endpoints.
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field
 
 
@@ -83,11 +83,25 @@ class TransactionList(BaseModel):
     pagination: dict
 
 
+class TransactionStatsBucket(BaseModel):
+    """Totals for one time bucket, currency and status."""
+    
+    bucket_start: datetime
+    currency: str
+    status: str
+    count: int
+    amount: Decimal
+
+
 class TransactionStats(BaseModel):
     """Transaction statistics."""
     
     total_count: int
-    total_amount: Decimal
+    total_amount: Decimal  # Succeeded amount (all currencies unless filtered)
     successful_count: int
     failed_count: int
     pending_count: int
+    refunded_count: int = 0
+    amount_by_currency: Dict[str, Decimal] = Field(default_factory=dict)
+    granularity: str = "day"
+    buckets: List[TransactionStatsBucket] = Field(default_factory=list)
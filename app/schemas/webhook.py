@@ -0,0 +1,39 @@
+"""
+Webhook Schemas
+
+Request models for webhook operations.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+
+
+class ReplayRequest(BaseModel):
+    """
+    Request to replay Stripe events for a time range.
+    
+    Omit start to resume from the saved cursor; omit end for "now".
+    """
+    
+    start: Optional[datetime] = Field(
+        default=None,
+        description="Range start (UTC)",
+    )
+    end: Optional[datetime] = Field(
+        default=None,
+        description="Range end (UTC, exclusive)",
+    )
+    
+    @model_validator(mode="after")
+    def check_range(self) -> "ReplayRequest":
+        """Normalize to naive UTC and ensure start is before end."""
+        # Stored timestamps are naive UTC; comparing an aware value
+        # against them raises TypeError
+        if self.start and self.start.tzinfo:
+            self.start = self.start.astimezone(timezone.utc).replace(tzinfo=None)
+        if self.end and self.end.tzinfo:
+            self.end = self.end.astimezone(timezone.utc).replace(tzinfo=None)
+        if self.start and self.end and self.start >= self.end:
+            raise ValueError("start must be before end")
+        return self
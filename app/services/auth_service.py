@@ -5,16 +5,74 @@ Handles user authentication, password hashing, and JWT generation.
 """
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.database import run_db
 from app.models.user import User
-from app.schemas.auth import UserRegister, TokenData
-from app.utils.security import hash_password, verify_password
-from app.utils import logger, AuthenticationError
+from app.services.notifier import notifier
+from app.schemas.auth import Principal, UserRegister, TokenData
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+from app.utils.rate_limit import FailureThrottle
+from app.utils.security import password_hasher
+from app.utils import logger, AuthenticationError, NotFoundError, RateLimitError
+
+
+# Active principals keyed by username, so authenticated requests skip
+# the user lookup. Entries are dropped in every worker when AuthService
+# changes a user (via the notifier); changes made elsewhere show up
+# within principal_cache_ttl seconds.
+principal_cache = TTLCache(ttl=settings.principal_cache_ttl, maxsize=10000)
+
+metrics.register_gauge(
+    "auth_principal_cache_hit_rate",
+    lambda: principal_cache.hit_rate,
+    "Fraction of authenticated requests served without a user lookup",
+)
+metrics.register_gauge(
+    "auth_principal_cache_size",
+    lambda: len(principal_cache),
+    "Principals currently cached",
+)
+metrics.register_gauge(
+    "auth_password_hash_queue_depth",
+    lambda: password_hasher.queue_depth,
+    "Password hashes queued or running",
+)
+
+# Failed logins per username and per client address
+login_throttle = FailureThrottle(
+    max_failures=settings.login_max_failures,
+    window=settings.login_failure_window_seconds,
+    lockout=settings.login_lockout_seconds,
+)
+login_ip_throttle = FailureThrottle(
+    max_failures=settings.login_max_failures_per_ip,
+    window=settings.login_failure_window_seconds,
+    lockout=settings.login_lockout_seconds,
+)
+
+
+USER_TOPIC_PREFIX = "user:"
+
+
+def _drop_principals(topics: List[str]) -> None:
+    """Notifier listener: forget principals of changed users."""
+    for topic in topics:
+        if topic.startswith(USER_TOPIC_PREFIX):
+            principal_cache.delete(topic[len(USER_TOPIC_PREFIX):])
+
+
+notifier.add_listener(_drop_principals)
+
+
+async def invalidate_principal(username: str) -> None:
+    """Drop a cached principal after the user changes, in every worker."""
+    await notifier.publish([f"{USER_TOPIC_PREFIX}{username}"])
 
 
 class AuthService:
@@ -25,22 +83,91 @@ class AuthService:
     def __init__(self, db: Session):
         self.db = db
     
-    def authenticate_user(self, username: str, password: str) -> User:
+    async def authenticate_user(
+        self,
+        username: str,
+        password: str,
+        client_ip: Optional[str] = None,
+    ) -> User:
         """
         Verify user credentials.
+        
+        Usernames and client addresses with too many recent failures
+        are rejected before the password is hashed. Hashing runs on
+        the password hasher pool, not the event loop.
+        
+        Raises:
+            RateLimitError: If locked out after repeated failures
+            AuthenticationError: If the credentials are wrong
         """
-        user = self.db.query(User).filter(User.username == username).first()
+        self._check_throttle(username, client_ip)
+        
+        user = await run_db(
+            self.db,
+            lambda db: db.query(User).filter(User.username == username).first(),
+        )
         
         if not user:
             logger.warning("Auth failed: User not found", username=username)
+            self._record_failure(username, client_ip)
             raise AuthenticationError("Invalid username or password")
             
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             logger.warning("Auth failed: Invalid password", username=username)
+            self._record_failure(username, client_ip)
             raise AuthenticationError("Invalid username or password")
-            
+        
+        # A shared (NAT) address is not kept locked by earlier mistakes
+        # once someone there signs in
+        login_throttle.reset(username)
+        if client_ip:
+            login_ip_throttle.reset(client_ip)
         return user
     
+    def _check_throttle(self, username: str, client_ip: Optional[str]) -> None:
+        """Reject locked-out usernames and addresses."""
+        retry_after = login_throttle.retry_after(username)
+        if client_ip:
+            retry_after = max(retry_after, login_ip_throttle.retry_after(client_ip))
+        
+        if retry_after:
+            logger.warning(
+                "Auth throttled",
+                username=username,
+                client_ip=client_ip,
+                retry_after=round(retry_after),
+            )
+            raise RateLimitError(
+                message="Too many failed login attempts, try again later",
+                code="LOGIN_THROTTLED",
+                details={"retry_after": int(retry_after) + 1},
+            )
+    
+    def _record_failure(self, username: str, client_ip: Optional[str]) -> None:
+        login_throttle.record_failure(username)
+        if client_ip:
+            login_ip_throttle.record_failure(client_ip)
+    
+    def get_principal(self, username: str) -> Optional[Principal]:
+        """
+        Look up the principal for a token subject.
+        
+        Active users are served from the principal cache; inactive
+        users are returned uncached so the caller can reject them.
+        """
+        principal = principal_cache.get(username)
+        if principal is not None:
+            return principal
+        
+        user = self.db.query(User).filter(User.username == username).first()
+        if user is None:
+            return None
+        
+        principal = Principal.model_validate(user)
+        if principal.is_active:
+            principal_cache.set(username, principal)
+        return principal
+    
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """
         Generate a JWT access token.
@@ -62,14 +189,17 @@ class AuthService:
         
         return encoded_jwt
     
-    def register_user(self, user_data: UserRegister) -> User:
+    async def register_user(self, user_data: UserRegister) -> User:
         """
         Create a new admin user.
         """
         # Check if user already exists
-        existing_user = self.db.query(User).filter(
-            (User.username == user_data.username) | (User.email == user_data.email)
-        ).first()
+        existing_user = await run_db(
+            self.db,
+            lambda db: db.query(User).filter(
+                (User.username == user_data.username) | (User.email == user_data.email)
+            ).first(),
+        )
         
         if existing_user:
             raise AuthenticationError("Username or email already registered")
@@ -77,12 +207,54 @@ class AuthService:
         new_user = User(
             username=user_data.username,
             email=user_data.email,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await password_hasher.hash(user_data.password),
         )
         
-        self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
+        await run_db(self.db, self._save_user, new_user)
         
         logger.info("New admin registered", username=new_user.username)
         return new_user
+    
+    def _save_user(self, db: Session, user: User) -> None:
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    
+    async def update_user(self, username: str, **changes) -> User:
+        """
+        Change user fields (email, is_active, password).
+        
+        A "password" change is hashed on the password hasher pool
+        before it is stored.
+        """
+        user = await run_db(
+            self.db,
+            lambda db: db.query(User).filter(User.username == username).first(),
+        )
+        if not user:
+            raise NotFoundError("User not found")
+        
+        if "password" in changes:
+            changes["hashed_password"] = await password_hasher.hash(changes.pop("password"))
+        
+        await run_db(self.db, self._apply_changes, user, changes)
+        await invalidate_principal(username)
+        
+        logger.info("User updated", username=username, fields=sorted(changes))
+        return user
+    
+    def _apply_changes(self, db: Session, user: User, changes: dict) -> None:
+        for field, value in changes.items():
+            setattr(user, field, value)
+        db.commit()
+        db.refresh(user)
+    
+    async def deactivate_user(self, username: str) -> User:
+        """
+        Deactivate a user; their tokens stop working immediately.
+        
+        Other workers drop their cached principal when the change is
+        relayed over Redis; without Redis they keep it for up to
+        principal_cache_ttl seconds.
+        """
+        return await self.update_user(username, is_active=False)
@@ -0,0 +1,126 @@
+"""
+Export Service
+
+Streams transactions as CSV or NDJSON for bulk downloads.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.models.transaction import Transaction
+from app.utils import logger
+
+
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.stripe_payment_intent_id,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.status,
+    Transaction.payment_method,
+    Transaction.card_brand,
+    Transaction.card_last4,
+    Transaction.customer_email,
+    Transaction.customer_phone,
+    Transaction.description,
+    Transaction.created_at,
+    Transaction.updated_at,
+)
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_default(value):
+    """Serialize the column types json does not handle."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class ExportService:
+    """
+    Streams transaction rows in constant memory.
+
+    Reads plain rows (no ORM objects) through a server-side cursor,
+    `batch_size` rows at a time, and yields encoded chunks as it goes.
+    The generator owns its own connection, because the request's
+    session is closed before a streaming response body is sent.
+    """
+
+    def __init__(self, bind: Engine, batch_size: Optional[int] = None):
+        self.bind = bind
+        self.batch_size = batch_size or settings.export_batch_size
+
+    def stream(
+        self,
+        format: str = "csv",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        status: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the export body in chunks.
+
+        Args:
+            format: "csv" or "ndjson"
+            start: Include transactions created at or after this time
+            end: Include transactions created before this time
+            status: Restrict to one status
+
+        Yields:
+            Encoded text, one chunk per fetched batch
+        """
+        stmt = select(*EXPORT_COLUMNS).order_by(Transaction.created_at, Transaction.id)
+        if start:
+            stmt = stmt.where(Transaction.created_at >= start)
+        if end:
+            stmt = stmt.where(Transaction.created_at < end)
+        if status:
+            stmt = stmt.where(Transaction.status == status)
+
+        encode = self._encode_csv if format == "csv" else self._encode_ndjson
+        exported = 0
+
+        with self.bind.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True,
+                yield_per=self.batch_size,
+            ).execute(stmt)
+
+            if format == "csv":
+                yield self._encode_csv([EXPORT_FIELDS])
+
+            for rows in result.partitions():
+                exported += len(rows)
+                yield encode(rows)
+
+        logger.info("Transactions exported", format=format, rows=exported)
+
+    @staticmethod
+    def _encode_csv(rows) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _encode_ndjson(rows) -> str:
+        return "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default) + "\n"
+            for row in rows
+        )
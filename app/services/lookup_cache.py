@@ -0,0 +1,136 @@
+"""
+Lookup Cache
+
+Read-through cache for single-record API lookups, backed by Redis
+with an in-process fallback.
+"""
+
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+from app.config import settings
+from app.services.redis_client import RedisClient, redis_client
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+
+class LookupCache:
+    """
+    Caches the API representation (a JSON-ready dict) of records by ID.
+
+    Entries live in Redis, shared by every worker, so invalidating
+    after a write is seen by all of them. While Redis is unavailable a
+    per-process TTLCache is used instead; invalidation always clears
+    both. Misses are not cached.
+
+    A load that started before an invalidation must not write its
+    (possibly stale) result back after it. Invalidation bumps a
+    generation - per key in Redis, per cache in the process - and a
+    loaded value is cached only if the generation read before loading
+    is still current.
+
+    Usage:
+        cache = LookupCache("transaction")
+        data = await cache.get_or_load(42, load_transaction_data)
+        await cache.invalidate(42)  # after the row changes
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        client: Optional[RedisClient] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl or settings.lookup_cache_ttl
+        self.redis = client or redis_client
+        self.local = TTLCache(ttl=self.ttl, maxsize=10000)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"pos:{self.namespace}:{key}"
+
+    def _generation_key(self, key: Hashable) -> str:
+        return f"pos:{self.namespace}:{key}:generation"
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        if self.redis.available:
+            raw = await self.redis.get(self._key(key))
+            value = json.loads(raw) if raw is not None else None
+        else:
+            value = self.local.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: Dict[str, Any]) -> None:
+        if not await self.redis.set(self._key(key), json.dumps(value), self.ttl):
+            self.local.set(key, value)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached value, or the loader's result (cached unless None, or
+        unless the key was invalidated while loading).
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        local_generation = self.generation
+        generation = await self.redis.get(self._generation_key(key))
+
+        value = await loader()
+        if value is None or self.generation != local_generation:
+            return value
+
+        stored = await self.redis.set_if(
+            self._key(key),
+            json.dumps(value),
+            self.ttl,
+            self._generation_key(key),
+            generation,
+        )
+        if stored is None:
+            self.local.set(key, value)
+        return value
+
+    async def invalidate(self, key: Hashable) -> None:
+        await self.invalidate_many([key])
+
+    async def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        keys = list(keys)
+        self.generation += 1
+        for key in keys:
+            self.local.delete(key)
+        await self.redis.incr(*[self._generation_key(key) for key in keys], ttl=self.ttl)
+        await self.redis.delete(*[self._key(key) for key in keys])
+
+
+# Shared caches, invalidated by the services that write these records
+transaction_cache = LookupCache("transaction")
+payment_link_cache = LookupCache("payment_link")
+
+metrics.register_gauge(
+    "cache_transaction_hit_rate",
+    lambda: transaction_cache.hit_rate,
+    "Fraction of transaction lookups served from the cache",
+)
+metrics.register_gauge(
+    "cache_payment_link_hit_rate",
+    lambda: payment_link_cache.hit_rate,
+    "Fraction of payment link lookups served from the cache",
+)
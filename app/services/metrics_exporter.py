@@ -0,0 +1,147 @@
+"""
+Metrics Exporter
+
+Combines every worker process's metrics for the Prometheus endpoint.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.redis_client import RedisClient, redis_client
+from app.utils import logger
+from app.utils.metrics import MetricFamily, metrics
+
+
+def _family_from_json(data: list) -> MetricFamily:
+    name, kind, help, samples = data
+    return MetricFamily(name, kind, help, [
+        (suffix, tuple(tuple(label) for label in labels), value)
+        for suffix, labels, value in samples
+    ])
+
+
+def merge_families(workers: Dict[str, List[MetricFamily]]) -> List[MetricFamily]:
+    """
+    Combine per-worker families into one set.
+
+    Counters and histograms are summed sample by sample (they only add
+    up). Gauges describe one process - a pool, a queue, a hit rate -
+    so each keeps its value under a `worker` label.
+    """
+    merged: Dict[str, Tuple[str, str, Dict[tuple, float]]] = {}
+    for worker_id, families in workers.items():
+        for family in families:
+            _, _, samples = merged.setdefault(family.name, (family.kind, family.help, {}))
+            for suffix, labels, value in family.samples:
+                if family.kind == "gauge":
+                    samples[(suffix, labels + (("worker", worker_id),))] = value
+                else:
+                    key = (suffix, labels)
+                    samples[key] = samples.get(key, 0) + value
+
+    return [
+        MetricFamily(name, kind, help, [
+            (suffix, labels, value) for (suffix, labels), value in samples.items()
+        ])
+        for name, (kind, help, samples) in merged.items()
+    ]
+
+
+class MetricsExporter:
+    """
+    Shares this worker's metrics with the others through Redis.
+
+    Each uvicorn worker has its own registry, and a scrape reaches only
+    one of them. Every worker writes its families to a Redis hash every
+    metrics_publish_seconds (and on each scrape), so the worker serving
+    /metrics can report all of them. A worker that stops publishing is
+    dropped after three intervals; its counters then disappear, which
+    Prometheus treats like a restart. Without Redis, only the serving
+    worker is reported.
+
+    Nothing here runs per request: the registry is read when publishing.
+    """
+
+    def __init__(
+        self,
+        client: Optional[RedisClient] = None,
+        key: str = "pos:metrics",
+        interval: Optional[float] = None,
+    ):
+        self.redis = client or redis_client
+        self.key = key
+        self.interval = interval or settings.metrics_publish_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, families: Optional[List[MetricFamily]] = None) -> bool:
+        """Write this worker's current families to Redis."""
+        payload = json.dumps({
+            "at": time.time(),
+            "families": families if families is not None else metrics.families(),
+        })
+        return await self.redis.hset(self.key, self.worker_id, payload)
+
+    async def worker_families(self) -> Dict[str, List[MetricFamily]]:
+        """Families of every live worker, this one's read fresh."""
+        local = metrics.families()
+        workers = {self.worker_id: local}
+        if not await self.publish(local):
+            return workers
+
+        published = await self.redis.hgetall(self.key) or {}
+        cutoff = time.time() - 3 * self.interval
+        stale = []
+        for worker_id, raw in published.items():
+            if worker_id == self.worker_id:
+                continue
+            try:
+                data = json.loads(raw)
+                if data["at"] < cutoff:
+                    stale.append(worker_id)
+                    continue
+                workers[worker_id] = [_family_from_json(f) for f in data["families"]]
+            except (ValueError, KeyError, TypeError):
+                stale.append(worker_id)
+
+        if stale:
+            await self.redis.hdel(self.key, *stale)
+        return workers
+
+    async def families(self) -> List[MetricFamily]:
+        """All workers' metrics, merged (see merge_families)."""
+        return merge_families(await self.worker_families())
+
+    async def start(self) -> None:
+        """Start publishing in the background."""
+        if self._task is not None or not self.redis.enabled:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Metrics exporter started", worker_id=self.worker_id)
+
+    async def stop(self) -> None:
+        """Stop publishing and withdraw this worker's metrics."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.redis.hdel(self.key, self.worker_id)
+        logger.info("Metrics exporter stopped")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.publish()
+
+
+# Shared exporter - one per application process
+metrics_exporter = MetricsExporter()
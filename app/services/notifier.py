@@ -0,0 +1,140 @@
+"""
+Change Notifier
+
+Wakes requests waiting on a record (long-poll status endpoints) when
+a service commits a change to it, in this process and - over Redis
+pub/sub - in every other worker.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from app.services.redis_client import RedisClient, redis_client
+from app.utils import logger
+from app.utils.metrics import metrics
+
+
+class Notifier:
+    """
+    In-process topic waiters, fanned out across workers via Redis.
+
+    Topics are strings such as "transaction:42". publish() wakes local
+    waiters directly and broadcasts the topics on a Redis channel; the
+    listener started with start() wakes this process's waiters for
+    topics published elsewhere. Without Redis, notifications stay
+    within the process.
+
+    Subscribe before reading the current state, so a change committed
+    between the read and the wait is not missed:
+
+        async with notifier.subscribe("transaction:42") as changed:
+            changed.clear()
+            ...read state, return if done...
+            await asyncio.wait_for(changed.wait(), timeout)
+
+    Listeners added with add_listener() see every topic, local or
+    relayed, e.g. to drop cache entries in each worker.
+    """
+
+    def __init__(
+        self,
+        client: Optional[RedisClient] = None,
+        channel: str = "pos:changes",
+    ):
+        self.redis = client or redis_client
+        self.channel = channel
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def waiting(self) -> int:
+        """Requests currently waiting for a change."""
+        return sum(len(events) for events in self._waiters.values())
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[asyncio.Event]:
+        """Event set whenever `topic` is published while subscribed."""
+        event = asyncio.Event()
+        self._waiters.setdefault(topic, set()).add(event)
+        try:
+            yield event
+        finally:
+            events = self._waiters.get(topic)
+            if events is not None:
+                events.discard(event)
+                if not events:
+                    del self._waiters[topic]
+
+    def add_listener(self, callback: Callable[[List[str]], None]) -> None:
+        """Call `callback(topics)` for every publish, here or in another worker."""
+        self._listeners.append(callback)
+
+    async def publish(self, topics: Iterable[str]) -> None:
+        """Wake waiters on these topics in every worker."""
+        topics = list(topics)
+        if not topics:
+            return
+        self._wake(topics)
+        await self.redis.publish(self.channel, json.dumps(topics))
+
+    def _wake(self, topics: List[str]) -> None:
+        for listener in self._listeners:
+            listener(topics)
+        for topic in topics:
+            for event in self._waiters.get(topic, ()):
+                event.set()
+
+    async def start(self) -> None:
+        """Start listening for other workers' notifications."""
+        if self._task is not None or not self.redis.enabled:
+            return
+        self._task = asyncio.create_task(self._listen())
+        logger.info("Change notifier started", channel=self.channel)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Change notifier stopped")
+
+    async def _listen(self) -> None:
+        """Relay channel messages to local waiters, reconnecting on errors."""
+        while True:
+            if not self.redis.available:
+                await asyncio.sleep(self.redis.retry_seconds)
+                continue
+
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                while True:
+                    # A read timeout here just means no message yet
+                    # (listen() would fail on the socket timeout)
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self._wake(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Change notifier disconnected", error=str(e))
+                await asyncio.sleep(self.redis.retry_seconds)
+            finally:
+                await pubsub.aclose()
+
+
+# Shared notifier - one per application process
+notifier = Notifier()
+
+metrics.register_gauge(
+    "notifier_waiting",
+    lambda: notifier.waiting,
+    "Requests waiting for a status change",
+)
@@ -4,15 +4,20 @@ Payment Link Service
 Creates Stripe Payment Links and sends them via SMS.
 """
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterable, Optional
 import stripe
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.database import run_db
 from app.models.payment_link import PaymentLink
 from app.schemas.payment import PaymentLinkRequest
-from app.services.sms_service import SMSService
+from app.services.lookup_cache import payment_link_cache
+from app.services.notifier import notifier
+from app.services.sms_outbox_service import SMSOutboxService
+from app.services.stripe_client import stripe_client
 from app.utils import logger, PaymentError, StripeError
 
 
@@ -20,20 +25,31 @@ from app.utils import logger, PaymentError, StripeError
 stripe.api_key = settings.stripe_secret_key
 
 
+async def payment_links_changed(link_ids: Iterable[int]) -> None:
+    """
+    Announce committed changes to payment links.
+    
+    Drops their cached lookups, then wakes requests waiting on them.
+    """
+    link_ids = list(link_ids)
+    await payment_link_cache.invalidate_many(link_ids)
+    await notifier.publish(f"payment_link:{id}" for id in link_ids)
+
+
 class PaymentLinkService:
     """
     Service for creating and managing payment links.
     
     Flow:
     1. Create a Stripe Checkout Session with a payment link URL
-    2. Send the link to customer via SMS
+    2. Queue the link SMS to the customer (sent by the outbox worker)
     3. Customer pays on Stripe hosted page
     4. Webhook notifies us of completion
     """
     
     def __init__(self, db: Session):
         self.db = db
-        self.sms_service = SMSService()
+        self.stripe = stripe_client
     
     async def create_payment_link(self, link_data: PaymentLinkRequest) -> dict:
         """
@@ -49,7 +65,7 @@ class PaymentLinkService:
         """
         try:
             # Create a Stripe Checkout Session
-            session = stripe.checkout.Session.create(
+            session = await self.stripe.create_checkout_session(
                 mode="payment",
                 line_items=[{
                     "price_data": {
@@ -73,25 +89,12 @@ class PaymentLinkService:
             )
             
             # Save payment link to database
-            payment_link = PaymentLink(
-                stripe_session_id=session.id,
-                url=session.url,
-                amount=link_data.amount / 100,
-                currency=link_data.currency.upper(),
-                customer_phone=link_data.customer_phone,
-                customer_name=link_data.customer_name,
-                description=link_data.description,
-                expires_at=datetime.utcnow() + timedelta(hours=24),
-            )
-            
-            self.db.add(payment_link)
-            self.db.commit()
-            self.db.refresh(payment_link)
+            payment_link = await run_db(self.db, self._save_link, session, link_data)
             
-            # Send SMS if requested
-            sms_sent = False
+            # Queue SMS if requested (delivered by the outbox worker)
+            sms_queued = False
             if link_data.send_sms:
-                sms_sent = await self._send_payment_sms(payment_link)
+                sms_queued = await run_db(self.db, self._queue_payment_sms, payment_link)
             
             return {
                 "status": "success",
@@ -100,7 +103,8 @@ class PaymentLinkService:
                 "amount": link_data.amount,
                 "currency": link_data.currency,
                 "customer_phone": link_data.customer_phone,
-                "sms_sent": sms_sent,
+                "sms_sent": False,
+                "sms_queued": sms_queued,
                 "expires_at": payment_link.expires_at.isoformat() if payment_link.expires_at else None,
             }
             
@@ -111,11 +115,35 @@ class PaymentLinkService:
                 details={"stripe_error": str(e)},
             )
     
-    async def _send_payment_sms(self, payment_link: PaymentLink) -> bool:
+    def _save_link(
+        self,
+        db: Session,
+        session: stripe.checkout.Session,
+        link_data: PaymentLinkRequest,
+    ) -> PaymentLink:
+        """Insert the payment link for a new Checkout Session."""
+        payment_link = PaymentLink(
+            stripe_session_id=session.id,
+            url=session.url,
+            amount=link_data.amount / 100,
+            currency=link_data.currency.upper(),
+            customer_phone=link_data.customer_phone,
+            customer_name=link_data.customer_name,
+            description=link_data.description,
+            expires_at=datetime.utcnow() + timedelta(hours=24),
+        )
+        
+        db.add(payment_link)
+        db.commit()
+        db.refresh(payment_link)
+        return payment_link
+    
+    def _queue_payment_sms(self, db: Session, payment_link: PaymentLink) -> bool:
         """
-        Send payment link to customer via SMS.
+        Queue the payment link SMS for background delivery.
         
-        Returns True if SMS was sent successfully.
+        The SMS outbox worker sends it and sets sms_sent /
+        sms_message_id on the link. Returns True if queued.
         """
         # Format amount for display
         amount_display = f"${payment_link.amount:,.2f}"
@@ -128,35 +156,77 @@ class PaymentLinkService:
         )
         
         try:
-            result = await self.sms_service.send_sms(
+            SMSOutboxService(db).enqueue(
                 phone=payment_link.customer_phone,
                 message=message,
+                payment_link_id=payment_link.id,
             )
-            
-            if result["success"]:
-                payment_link.sms_sent = True
-                payment_link.sms_sent_at = datetime.utcnow()
-                payment_link.sms_message_id = result.get("message_id")
-                self.db.commit()
-                
-                logger.info(
-                    "Payment link SMS sent",
-                    link_id=payment_link.id,
-                    phone=payment_link.customer_phone,
-                )
-                return True
-            else:
-                logger.warning(
-                    "Failed to send payment link SMS",
-                    link_id=payment_link.id,
-                    error=result.get("error"),
-                )
-                return False
+            return True
                 
         except Exception as e:
-            logger.error("SMS sending failed", error=str(e))
+            logger.error("Failed to queue payment link SMS", error=str(e))
+            db.rollback()
             return False
     
+    async def get_payment_link_data(self, link_id: int) -> Optional[dict]:
+        """
+        Get payment link status and details for the API.
+        
+        Read through payment_link_cache (loaded from the primary);
+        writers call payment_links_changed().
+        """
+        async def load() -> Optional[dict]:
+            link = await run_db(
+                self.db,
+                lambda db: PaymentLinkService(db).get_payment_link(link_id),
+            )
+            if link is None:
+                return None
+            return {
+                "id": link.id,
+                "url": link.url,
+                "amount": float(link.amount),
+                "currency": link.currency,
+                "customer_phone": link.customer_phone,
+                "paid": link.paid,
+                "sms_sent": link.sms_sent,
+                "is_expired": link.is_expired,
+                "created_at": link.created_at.isoformat(),
+            }
+        
+        return await payment_link_cache.get_or_load(link_id, load)
+    
+    async def wait_until_paid(self, link_id: int, timeout: float) -> Optional[dict]:
+        """
+        Wait until a payment link is paid.
+        
+        Woken by payment_links_changed() (in any worker), with a
+        periodic re-check as a fallback, and holds no database
+        connection while waiting.
+        
+        Returns:
+            Payment link data once paid, or as it stands when the
+            timeout passes; None if the link does not exist
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        async with notifier.subscribe(f"payment_link:{link_id}") as changed:
+            while True:
+                changed.clear()
+                link = await self.get_payment_link_data(link_id)
+                remaining = deadline - loop.time()
+                if link is None or link["paid"] or remaining <= 0:
+                    return link
+                
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(),
+                        min(remaining, settings.status_wait_recheck_seconds),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+    
     def get_payment_link(self, link_id: int) -> Optional[PaymentLink]:
         """Get a payment link by ID."""
         return self.db.query(PaymentLink).filter(
@@ -167,7 +237,10 @@ class PaymentLinkService:
         """
         Resend payment link SMS.
         """
-        payment_link = self.get_payment_link(link_id)
+        payment_link = await run_db(
+            self.db,
+            lambda db: PaymentLinkService(db).get_payment_link(link_id),
+        )
         
         if not payment_link:
             raise PaymentError(
@@ -187,10 +260,10 @@ class PaymentLinkService:
                 code="LINK_EXPIRED",
             )
         
-        sms_sent = await self._send_payment_sms(payment_link)
+        sms_queued = await run_db(self.db, self._queue_payment_sms, payment_link)
         
         return {
-            "status": "success" if sms_sent else "failed",
-            "sms_sent": sms_sent,
+            "status": "success" if sms_queued else "failed",
+            "sms_queued": sms_queued,
             "link_id": link_id,
         }
@@ -10,8 +10,16 @@ import stripe
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.database import run_db
 from app.models.transaction import Transaction
 from app.schemas.payment import PaymentRequest
+from app.services.stripe_client import stripe_client
+from app.services.rollup_service import RollupService
+from app.services.transaction_service import (
+    TransactionService,
+    invalidate_transaction_counts,
+    transactions_changed,
+)
 from app.utils import logger, PaymentError, StripeError
 
 
@@ -31,6 +39,7 @@ class PaymentService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.stripe = stripe_client
     
     async def create_payment(self, payment_data: PaymentRequest) -> dict:
         """
@@ -69,7 +78,7 @@ class PaymentService:
                 intent_params["receipt_email"] = payment_data.customer_email
             
             # Create PaymentIntent in Stripe
-            intent = stripe.PaymentIntent.create(
+            intent = await self.stripe.create_payment_intent(
                 **intent_params,
                 idempotency_key=idempotency_key,
             )
@@ -81,20 +90,13 @@ class PaymentService:
             )
             
             # Save transaction to database
-            transaction = Transaction(
-                stripe_payment_intent_id=intent.id,
-                amount=payment_data.amount / 100,  # Convert cents to dollars
-                currency=payment_data.currency.upper(),
-                status="pending",
-                payment_method="card",
-                customer_email=payment_data.customer_email,
-                customer_phone=payment_data.customer_phone,
-                description=payment_data.description,
+            transaction = await run_db(
+                self.db,
+                self._record_transaction,
+                intent,
+                payment_data,
             )
-            
-            self.db.add(transaction)
-            self.db.commit()
-            self.db.refresh(transaction)
+            await transactions_changed([transaction.id])
             
             logger.info(
                 "Transaction created",
@@ -131,6 +133,32 @@ class PaymentService:
                 details={"error": str(e)},
             )
     
+    def _record_transaction(
+        self,
+        db: Session,
+        intent: stripe.PaymentIntent,
+        payment_data: PaymentRequest,
+    ) -> Transaction:
+        """Insert the pending transaction for a new PaymentIntent."""
+        transaction = Transaction(
+            stripe_payment_intent_id=intent.id,
+            amount=payment_data.amount / 100,  # Convert cents to dollars
+            currency=payment_data.currency.upper(),
+            status="pending",
+            payment_method="card",
+            customer_email=payment_data.customer_email,
+            customer_phone=payment_data.customer_phone,
+            description=payment_data.description,
+        )
+        
+        db.add(transaction)
+        db.flush()
+        RollupService(db).record_status_change(transaction, None, "pending")
+        db.commit()
+        db.refresh(transaction)
+        invalidate_transaction_counts()
+        return transaction
+    
     async def refund_payment(
         self,
         transaction_id: int,
@@ -150,9 +178,10 @@ class PaymentService:
             PaymentError: If refund fails
         """
         # Get transaction
-        transaction = self.db.query(Transaction).filter(
-            Transaction.id == transaction_id
-        ).first()
+        transaction = await run_db(
+            self.db,
+            lambda db: TransactionService(db).get_transaction(transaction_id),
+        )
         
         if not transaction:
             raise PaymentError(
@@ -182,11 +211,11 @@ class PaymentService:
             if amount:
                 refund_params["amount"] = amount
             
-            refund = stripe.Refund.create(**refund_params)
+            refund = await self.stripe.create_refund(**refund_params)
             
             # Update transaction status
-            transaction.status = "refunded"
-            self.db.commit()
+            await run_db(self.db, self._mark_refunded, transaction)
+            await transactions_changed([transaction_id])
             
             logger.info(
                 "Refund processed",
@@ -210,6 +239,12 @@ class PaymentService:
                 details={"stripe_error": str(e)},
             )
     
+    def _mark_refunded(self, db: Session, transaction: Transaction) -> None:
+        """Record a successful refund."""
+        TransactionService(db).set_status(transaction, "refunded")
+        db.commit()
+        invalidate_transaction_counts()
+    
     async def get_payment_status(self, payment_intent_id: str) -> dict:
         """
         Get current status of a payment from Stripe.
@@ -217,7 +252,7 @@ class PaymentService:
         Useful for syncing status if webhook was missed.
         """
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            intent = await self.stripe.retrieve_payment_intent(payment_intent_id)
             return {
                 "payment_intent_id": intent.id,
                 "status": intent.status,
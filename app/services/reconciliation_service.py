@@ -0,0 +1,303 @@
+"""
+Reconciliation Service
+
+Re-syncs stale pending transactions with their Stripe PaymentIntents.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import stripe
+from sqlalchemy import and_, bindparam, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.sync_cursor import SyncCursor
+from app.models.transaction import Transaction
+from app.services.rollup_service import RollupService
+from app.services.stripe_client import StripeClient, stripe_client
+from app.services.transaction_service import (
+    invalidate_transaction_counts,
+    transactions_changed,
+)
+from app.utils import logger
+from app.utils.rate_limit import TokenBucket
+
+
+CURSOR_NAME = "reconciliation"
+
+# PaymentIntent statuses that settle a pending transaction
+INTENT_STATUS_MAP = {
+    "succeeded": "succeeded",
+    "canceled": "failed",
+}
+
+
+def transaction_status_for(intent: stripe.PaymentIntent) -> Optional[str]:
+    """
+    Transaction status implied by a PaymentIntent, or None if still pending.
+
+    A requires_payment_method intent with a last_payment_error has had
+    its payment attempt declined.
+    """
+    if intent.status in INTENT_STATUS_MAP:
+        return INTENT_STATUS_MAP[intent.status]
+    if intent.status == "requires_payment_method" and intent.get("last_payment_error"):
+        return "failed"
+    return None
+
+
+def card_details_for(intent: stripe.PaymentIntent) -> Tuple[Optional[str], Optional[str]]:
+    """(last4, brand) from an intent fetched with latest_charge expanded."""
+    charge = intent.get("latest_charge")
+    if not charge or isinstance(charge, str):
+        return None, None
+    details = charge.get("payment_method_details") or {}
+    card = details.get("card")
+    if not card:
+        return None, None
+    return card.get("last4"), card.get("brand")
+
+
+class ReconciliationService:
+    """
+    Service for reconciling pending transactions.
+
+    Selects pending rows older than reconcile_stale_minutes in batches
+    (ix_transactions_status_created), fetches their PaymentIntents
+    concurrently within a token-bucket request budget, and writes all
+    changes in a batch with one executemany UPDATE. The UPDATE only
+    touches rows that are still pending, so a webhook that lands first
+    wins.
+    """
+
+    def __init__(self, db: Session, client: Optional[StripeClient] = None):
+        self.db = db
+        self.stripe = client or stripe_client
+        self.bucket = TokenBucket(rate=settings.reconcile_rate_per_second)
+        self.semaphore = asyncio.Semaphore(settings.reconcile_concurrency)
+
+    def claim_run(self, interval_seconds: int) -> bool:
+        """
+        Claim the next scheduled run across processes.
+
+        Succeeds for one process per interval: the conditional UPDATE
+        on the cursor's last_run_at acts as a lease.
+        """
+        now = datetime.utcnow()
+
+        if not self.db.query(SyncCursor.id).filter(SyncCursor.name == CURSOR_NAME).first():
+            self.db.add(SyncCursor(name=CURSOR_NAME))
+            self.db.commit()
+
+        claimed = self.db.query(SyncCursor).filter(
+            SyncCursor.name == CURSOR_NAME,
+            or_(
+                SyncCursor.last_run_at.is_(None),
+                SyncCursor.last_run_at < now - timedelta(seconds=interval_seconds),
+            ),
+        ).update({SyncCursor.last_run_at: now}, synchronize_session=False)
+        self.db.commit()
+
+        return claimed == 1
+
+    async def reconcile(self, limit: Optional[int] = None) -> dict:
+        """
+        Reconcile stale pending transactions.
+
+        Database reads and writes run in a thread (asyncio.to_thread), so
+        a run never blocks the event loop it shares with the API.
+
+        Args:
+            limit: Maximum rows to check (default reconcile_max_per_run)
+
+        Returns:
+            Run report: rows checked and updated per status, Stripe
+            errors, and Stripe/overall latency
+        """
+        limit = limit or settings.reconcile_max_per_run
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.reconcile_stale_minutes)
+        started = time.perf_counter()
+
+        report = {
+            "checked": 0,
+            "updated": {},
+            "unchanged": 0,
+            "errors": 0,
+            "stripe_latency_ms": {"avg": 0.0, "max": 0.0},
+            "duration_ms": 0.0,
+        }
+        latencies: List[float] = []
+        after: Optional[Tuple[int, datetime]] = None
+
+        while report["checked"] < limit:
+            batch = await asyncio.to_thread(
+                self._next_batch,
+                cutoff,
+                after,
+                min(settings.reconcile_batch_size, limit - report["checked"]),
+            )
+            if not batch:
+                break
+            after = batch[-1][0], batch[-1][1]
+
+            results = await asyncio.gather(
+                *[self._fetch(pi_id, latencies) for _, _, pi_id in batch]
+            )
+
+            changes = []
+            for (txn_id, _, _), intent in zip(batch, results):
+                if intent is None:
+                    report["errors"] += 1
+                    continue
+                status = transaction_status_for(intent)
+                if status is None:
+                    report["unchanged"] += 1
+                    continue
+                last4, brand = card_details_for(intent)
+                changes.append({
+                    "b_id": txn_id,
+                    "b_status": status,
+                    "b_last4": last4,
+                    "b_brand": brand,
+                })
+
+            applied = await asyncio.to_thread(self._apply, changes)
+            for status, count in applied.items():
+                report["updated"][status] = report["updated"].get(status, 0) + count
+            if changes:
+                await transactions_changed(change["b_id"] for change in changes)
+
+            report["checked"] += len(batch)
+
+        if latencies:
+            report["stripe_latency_ms"] = {
+                "avg": round(sum(latencies) / len(latencies), 1),
+                "max": round(max(latencies), 1),
+            }
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        await asyncio.to_thread(self._save_report, report)
+
+        logger.info("Pending transactions reconciled", **report)
+        return report
+
+    def _next_batch(
+        self,
+        cutoff: datetime,
+        after: Optional[Tuple[int, datetime]],
+        size: int,
+    ) -> List[Tuple[int, datetime, str]]:
+        """Next (id, created_at, payment_intent_id) batch, oldest first."""
+        query = self.db.query(
+            Transaction.id,
+            Transaction.created_at,
+            Transaction.stripe_payment_intent_id,
+        ).filter(
+            Transaction.status == "pending",
+            Transaction.created_at < cutoff,
+            Transaction.stripe_payment_intent_id.isnot(None),
+        )
+
+        if after:
+            last_id, last_created = after
+            query = query.filter(
+                or_(
+                    Transaction.created_at > last_created,
+                    and_(
+                        Transaction.created_at == last_created,
+                        Transaction.id > last_id,
+                    ),
+                )
+            )
+
+        rows = query.order_by(
+            Transaction.created_at,
+            Transaction.id,
+        ).limit(size).all()
+
+        # Release the read transaction while Stripe is called
+        self.db.rollback()
+        return [tuple(row) for row in rows]
+
+    async def _fetch(
+        self,
+        payment_intent_id: str,
+        latencies: List[float],
+    ) -> Optional[stripe.PaymentIntent]:
+        """Fetch one PaymentIntent within the concurrency and rate budget."""
+        async with self.semaphore:
+            await self.bucket.acquire()
+            started = time.perf_counter()
+            try:
+                return await self.stripe.retrieve_payment_intent(
+                    payment_intent_id,
+                    expand=["latest_charge"],
+                )
+            except stripe.error.StripeError as e:
+                logger.warning(
+                    "Reconciliation fetch failed",
+                    payment_intent_id=payment_intent_id,
+                    error=str(e),
+                )
+                return None
+            finally:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    def _apply(self, changes: List[dict]) -> Dict[str, int]:
+        """
+        Write a batch of status changes with a single executemany UPDATE.
+
+        Rows that stopped being pending since they were read are left
+        alone. Rollups are moved for the rows that are updated.
+        """
+        if not changes:
+            return {}
+
+        wanted = {change["b_id"]: change for change in changes}
+
+        # Lock the rows that are still pending; these are the ones updated
+        still_pending = self.db.query(Transaction).filter(
+            Transaction.id.in_(list(wanted)),
+            Transaction.status == "pending",
+        ).with_for_update().all()
+
+        if not still_pending:
+            self.db.rollback()
+            return {}
+
+        table = Transaction.__table__
+        stmt = update(table).where(
+            table.c.id == bindparam("b_id"),
+            table.c.status == "pending",
+        ).values(
+            status=bindparam("b_status"),
+            card_last4=func.coalesce(bindparam("b_last4"), table.c.card_last4),
+            card_brand=func.coalesce(bindparam("b_brand"), table.c.card_brand),
+            updated_at=datetime.utcnow(),
+        )
+        self.db.execute(stmt, [wanted[txn.id] for txn in still_pending])
+
+        rollups = RollupService(self.db)
+        counts: Dict[str, int] = {}
+        for txn in still_pending:
+            status = wanted[txn.id]["b_status"]
+            rollups.record_status_change(txn, "pending", status)
+            counts[status] = counts.get(status, 0) + 1
+
+        self.db.commit()
+        invalidate_transaction_counts()
+        return counts
+
+    def _save_report(self, report: dict) -> None:
+        """Keep the last run's report on the reconciliation cursor."""
+        cursor = self.db.query(SyncCursor).filter(SyncCursor.name == CURSOR_NAME).first()
+        if not cursor:
+            cursor = SyncCursor(name=CURSOR_NAME)
+            self.db.add(cursor)
+        cursor.last_run_at = datetime.utcnow()
+        cursor.last_result = json.dumps(report)
+        self.db.commit()
@@ -0,0 +1,204 @@
+"""
+Redis Client
+
+Shared asyncio Redis connection pool for caching, pub/sub and
+cross-worker metrics.
+Callers fall back to in-process state while Redis is unavailable.
+"""
+
+import time
+from typing import Dict, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.utils import logger
+
+
+# SET key value PX ttl, only if the guard key still holds the expected
+# value ("" for missing)
+SET_IF_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') == ARGV[3] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class RedisClient:
+    """
+    Async Redis client that backs off after failures.
+
+    Every command returns None (or False) instead of raising when
+    Redis is down. After an error the client reports itself
+    unavailable for redis_retry_seconds, so requests do not each pay
+    a connect timeout during an outage.
+
+    Usage:
+        from app.services.redis_client import redis_client
+        if redis_client.available:
+            value = await redis_client.get("key")
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        retry_seconds: Optional[float] = None,
+    ):
+        self.url = url or settings.redis_url
+        self.enabled = enabled if enabled is not None else settings.redis_enabled
+        self.timeout = timeout or settings.redis_timeout_seconds
+        self.retry_seconds = retry_seconds or settings.redis_retry_seconds
+        self._client: Optional[aioredis.Redis] = None
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Whether commands are currently sent to Redis."""
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def _get_client(self) -> aioredis.Redis:
+        """Lazily create the connection pool."""
+        if self._client is None:
+            self._client = aioredis.from_url(
+                self.url,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout,
+                decode_responses=True,
+            )
+        return self._client
+
+    def _mark_down(self, error: Exception) -> None:
+        self._down_until = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Redis unavailable, using in-process fallback",
+            error=str(error),
+            retry_seconds=self.retry_seconds,
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self.available:
+            return None
+        try:
+            return await self._get_client().get(key)
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return None
+
+    async def set(self, key: str, value: str, ttl: float) -> bool:
+        if not self.available:
+            return False
+        try:
+            await self._get_client().set(key, value, px=int(ttl * 1000))
+            return True
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return False
+
+    async def delete(self, *keys: str) -> bool:
+        if not self.available or not keys:
+            return False
+        try:
+            await self._get_client().delete(*keys)
+            return True
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return False
+
+    async def incr(self, *keys: str, ttl: float) -> bool:
+        """Increment counters, each (re)expiring after ttl seconds."""
+        if not self.available or not keys:
+            return False
+        try:
+            async with self._get_client().pipeline(transaction=True) as pipe:
+                for key in keys:
+                    pipe.incr(key)
+                    pipe.pexpire(key, int(ttl * 1000))
+                await pipe.execute()
+            return True
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return False
+
+    async def set_if(
+        self,
+        key: str,
+        value: str,
+        ttl: float,
+        guard_key: str,
+        guard_value: Optional[str],
+    ) -> Optional[bool]:
+        """
+        Set `key` only while `guard_key` still holds `guard_value`
+        (None: does not exist), atomically.
+
+        Returns:
+            Whether the key was set, or None if Redis is unavailable
+        """
+        if not self.available:
+            return None
+        try:
+            return bool(await self._get_client().eval(
+                SET_IF_SCRIPT, 2, key, guard_key,
+                value, int(ttl * 1000), guard_value or "",
+            ))
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return None
+
+    async def hset(self, name: str, key: str, value: str) -> bool:
+        if not self.available:
+            return False
+        try:
+            await self._get_client().hset(name, key, value)
+            return True
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return False
+
+    async def hgetall(self, name: str) -> Optional[Dict[str, str]]:
+        if not self.available:
+            return None
+        try:
+            return await self._get_client().hgetall(name)
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return None
+
+    async def hdel(self, name: str, *keys: str) -> bool:
+        if not self.available or not keys:
+            return False
+        try:
+            await self._get_client().hdel(name, *keys)
+            return True
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return False
+
+    async def publish(self, channel: str, message: str) -> bool:
+        if not self.available:
+            return False
+        try:
+            await self._get_client().publish(channel, message)
+            return True
+        except (RedisError, OSError) as e:
+            self._mark_down(e)
+            return False
+
+    def pubsub(self) -> aioredis.client.PubSub:
+        """New PubSub connection (the caller handles errors and closes it)."""
+        return self._get_client().pubsub(ignore_subscribe_messages=True)
+
+    async def close(self) -> None:
+        """Close pooled connections (call on shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared client - one connection pool per application process
+redis_client = RedisClient()
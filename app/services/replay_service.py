@@ -0,0 +1,247 @@
+"""
+Replay Service
+
+Recovers missed Stripe webhooks from the Events API.
+"""
+
+import asyncio
+import calendar
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import WorkerSessionLocal
+from app.models.sync_cursor import SyncCursor
+from app.services.stripe_client import StripeClient, stripe_client
+from app.services.webhook_service import WebhookService, HANDLED_EVENT_TYPES
+from app.utils import logger, ServiceUnavailableError
+
+
+CURSOR_NAME = "stripe_events"
+
+# One replay at a time per process
+_replay_lock = asyncio.Lock()
+
+
+def _to_unix(value: datetime) -> int:
+    """Naive UTC datetime to a Unix timestamp."""
+    return calendar.timegm(value.utctimetuple())
+
+
+def replay_in_progress() -> bool:
+    """Whether this process is currently replaying."""
+    return _replay_lock.locked()
+
+
+async def run_replay(start: Optional[datetime], end: Optional[datetime]) -> None:
+    """Run a replay in its own worker session (background tasks)."""
+    db = WorkerSessionLocal()
+    try:
+        await ReplayService(db).replay(start, end)
+    except Exception as e:
+        logger.error("Stripe event replay failed", error=str(e))
+    finally:
+        db.close()
+
+
+class ReplayService:
+    """
+    Service for replaying Stripe events.
+
+    Splits the requested time range into windows and pages through
+    Stripe's events list for several windows concurrently (bounded by
+    stripe_replay_concurrency). Each event goes into the webhook inbox
+    exactly like a live delivery, so de-duplication, per-intent ordering
+    and the TransactionService handlers all apply unchanged.
+
+    Each window queues its pages in a thread (asyncio.to_thread) with
+    its own session on the same engine as db, so windows never share a
+    transaction and the event loop is not blocked.
+
+    Progress is kept in a SyncCursor: the next run without an explicit
+    start resumes from where the last one finished.
+    """
+
+    def __init__(self, db: Session, client: Optional[StripeClient] = None):
+        self.db = db
+        self.stripe = client or stripe_client
+        self._window_session = sessionmaker(
+            bind=db.get_bind(),
+            autocommit=False,
+            autoflush=False,
+        )
+
+    def get_cursor(self) -> SyncCursor:
+        """Load the replay cursor, creating it if needed."""
+        cursor = self.db.query(SyncCursor).filter(SyncCursor.name == CURSOR_NAME).first()
+        if not cursor:
+            cursor = SyncCursor(name=CURSOR_NAME)
+            self.db.add(cursor)
+            self.db.commit()
+        return cursor
+
+    def status(self) -> dict:
+        """Current cursor position and the last run's summary."""
+        cursor = self.get_cursor()
+        return {
+            "position": cursor.position,
+            "last_run_at": cursor.last_run_at,
+            "last_result": json.loads(cursor.last_result) if cursor.last_result else None,
+        }
+
+    async def replay(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> dict:
+        """
+        Fetch every handled event created in [start, end) into the inbox.
+
+        Args:
+            start: Range start (UTC). Defaults to the saved cursor, or
+                stripe_replay_lookback_hours ago on the first run
+            end: Range end (UTC). Defaults to now
+
+        Returns:
+            Counts of fetched, queued and duplicate events
+
+        Raises:
+            ServiceUnavailableError: If a replay is already running
+        """
+        if _replay_lock.locked():
+            raise ServiceUnavailableError(
+                message="A replay is already running",
+                code="REPLAY_RUNNING",
+            )
+
+        async with _replay_lock:
+            return await self._replay(start, end)
+
+    async def _replay(self, start: Optional[datetime], end: Optional[datetime]) -> dict:
+        cursor = await asyncio.to_thread(self.get_cursor)
+        end = end or datetime.utcnow()
+        start = start or cursor.position or (
+            end - timedelta(hours=settings.stripe_replay_lookback_hours)
+        )
+
+        windows = self._split(start, end)
+        semaphore = asyncio.Semaphore(settings.stripe_replay_concurrency)
+
+        logger.info(
+            "Stripe event replay started",
+            start=start,
+            end=end,
+            windows=len(windows),
+        )
+
+        results = await asyncio.gather(
+            *[self._replay_window(w_start, w_end, semaphore) for w_start, w_end in windows],
+            return_exceptions=True,
+        )
+
+        result = {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "windows": len(windows),
+            "failed_windows": 0,
+            "fetched": 0,
+            "queued": 0,
+            "duplicates": 0,
+        }
+
+        # Advance the cursor over the leading run of completed windows,
+        # so a failed window is fetched again next time
+        resume_at = start
+        contiguous = True
+        for (w_start, w_end), window in zip(windows, results):
+            if isinstance(window, Exception):
+                logger.error(
+                    "Stripe event replay window failed",
+                    window_start=w_start,
+                    window_end=w_end,
+                    error=str(window),
+                )
+                result["failed_windows"] += 1
+                contiguous = False
+                continue
+            for key in ("fetched", "queued", "duplicates"):
+                result[key] += window[key]
+            if contiguous:
+                resume_at = w_end
+
+        # Only move forward, and only from a range that touches the cursor
+        if cursor.position is None or start <= cursor.position:
+            if cursor.position is None or resume_at > cursor.position:
+                cursor.position = resume_at
+
+        cursor.last_run_at = datetime.utcnow()
+        cursor.last_result = json.dumps(result)
+        await asyncio.to_thread(self.db.commit)
+
+        logger.info("Stripe event replay finished", **result)
+        return result
+
+    async def _replay_window(
+        self,
+        start: datetime,
+        end: datetime,
+        semaphore: asyncio.Semaphore,
+    ) -> dict:
+        """Page through one window's events and queue the new ones."""
+        counts = {"fetched": 0, "queued": 0, "duplicates": 0}
+
+        async with semaphore:
+            db = self._window_session()
+            try:
+                await self._page_through(db, start, end, counts)
+            finally:
+                await asyncio.to_thread(db.close)
+        return counts
+
+    async def _page_through(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        counts: dict,
+    ) -> None:
+        """Fetch each page of a window and queue it in a thread."""
+        starting_after = None
+        while True:
+            params = {
+                "created": {"gte": _to_unix(start), "lt": _to_unix(end)},
+                "types": list(HANDLED_EVENT_TYPES),
+                "limit": 100,
+            }
+            if starting_after:
+                params["starting_after"] = starting_after
+
+            page = await self.stripe.list_events(**params)
+            await asyncio.to_thread(self._queue_page, db, page.data, counts)
+
+            if not page.has_more or not page.data:
+                return
+            starting_after = page.data[-1].id
+
+    def _queue_page(self, db: Session, events: list, counts: dict) -> None:
+        """Store one page's new events in the inbox."""
+        webhooks = WebhookService(db)
+        for event in events:
+            counts["fetched"] += 1
+            if webhooks.is_duplicate(event.id):
+                counts["duplicates"] += 1
+                continue
+            webhooks.enqueue(event, json.dumps(event))
+            counts["queued"] += 1
+
+    def _split(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Cut [start, end) into consecutive windows."""
+        step = timedelta(minutes=settings.stripe_replay_window_minutes)
+        windows = []
+        while start < end:
+            windows.append((start, min(start + step, end)))
+            start += step
+        return windows
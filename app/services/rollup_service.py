@@ -0,0 +1,249 @@
+"""
+Rollup Service
+
+Maintains and queries pre-aggregated transaction statistics.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, delete, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.transaction import Transaction
+from app.models.transaction_rollup import TransactionRollup
+from app.utils import logger
+
+
+GRANULARITIES = ("hour", "day")
+
+
+def truncate_to_bucket(value: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour or day."""
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class RollupService:
+    """
+    Service for the transaction rollup table.
+
+    Responsibilities:
+    - Apply incremental deltas when a transaction is created or
+      changes status (same DB transaction as the status change)
+    - Serve dashboard statistics from the rollups
+    - Rebuild rollups from raw transaction rows
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_status_change(
+        self,
+        transaction: Transaction,
+        old_status: Optional[str],
+        new_status: Optional[str],
+    ) -> None:
+        """
+        Move a transaction between status buckets.
+
+        Pass old_status=None for a new transaction. Does not commit -
+        the caller commits together with the status change.
+        """
+        if old_status == new_status:
+            return
+
+        amount = Decimal(transaction.amount or 0)
+        created_at = transaction.created_at or datetime.utcnow()
+
+        for granularity in GRANULARITIES:
+            bucket = truncate_to_bucket(created_at, granularity)
+            if old_status:
+                self._apply_delta(
+                    granularity, bucket, transaction.currency, old_status, -1, -amount
+                )
+            if new_status:
+                self._apply_delta(
+                    granularity, bucket, transaction.currency, new_status, 1, amount
+                )
+
+    def _apply_delta(
+        self,
+        granularity: str,
+        bucket_start: datetime,
+        currency: str,
+        status: str,
+        count_delta: int,
+        amount_delta: Decimal,
+    ) -> None:
+        """Atomically add a delta to one bucket, creating it if needed."""
+        dialect = self.db.get_bind().dialect.name
+        values = {
+            "granularity": granularity,
+            "bucket_start": bucket_start,
+            "currency": currency,
+            "status": status,
+            "count": count_delta,
+            "amount": amount_delta,
+            "updated_at": datetime.utcnow(),
+        }
+
+        if dialect in ("postgresql", "sqlite"):
+            insert = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert(TransactionRollup).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["granularity", "bucket_start", "currency", "status"],
+                set_={
+                    "count": TransactionRollup.count + stmt.excluded.count,
+                    "amount": TransactionRollup.amount + stmt.excluded.amount,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            self.db.execute(stmt)
+            return
+
+        # Other databases: read-modify-write under a row lock
+        row = self.db.query(TransactionRollup).filter(
+            TransactionRollup.granularity == granularity,
+            TransactionRollup.bucket_start == bucket_start,
+            TransactionRollup.currency == currency,
+            TransactionRollup.status == status,
+        ).with_for_update().first()
+
+        if row:
+            row.count += count_delta
+            row.amount += amount_delta
+        else:
+            self.db.add(TransactionRollup(**values))
+
+    def get_stats(
+        self,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        currency: Optional[str] = None,
+    ) -> dict:
+        """
+        Summarize transactions from the rollups.
+
+        Args:
+            granularity: Bucket size to read ("hour" or "day")
+            start: Include buckets starting at or after this time
+            end: Include buckets starting before this time
+            currency: Restrict to one currency (optional)
+
+        Returns:
+            Dict matching the TransactionStats schema
+        """
+        query = self.db.query(TransactionRollup).filter(
+            TransactionRollup.granularity == granularity,
+            TransactionRollup.count != 0,
+        )
+
+        if start:
+            query = query.filter(
+                TransactionRollup.bucket_start >= truncate_to_bucket(start, granularity)
+            )
+        if end:
+            query = query.filter(TransactionRollup.bucket_start < end)
+        if currency:
+            query = query.filter(TransactionRollup.currency == currency.upper())
+
+        rows = query.order_by(TransactionRollup.bucket_start).all()
+
+        counts: Dict[str, int] = {}
+        amount_by_currency: Dict[str, Decimal] = {}
+        buckets: List[dict] = []
+
+        for row in rows:
+            counts[row.status] = counts.get(row.status, 0) + row.count
+            if row.status == "succeeded":
+                amount_by_currency[row.currency] = (
+                    amount_by_currency.get(row.currency, Decimal(0)) + row.amount
+                )
+            buckets.append({
+                "bucket_start": row.bucket_start,
+                "currency": row.currency,
+                "status": row.status,
+                "count": row.count,
+                "amount": row.amount,
+            })
+
+        return {
+            "total_count": sum(counts.values()),
+            "total_amount": sum(amount_by_currency.values(), Decimal(0)),
+            "successful_count": counts.get("succeeded", 0),
+            "failed_count": counts.get("failed", 0),
+            "pending_count": counts.get("pending", 0),
+            "refunded_count": counts.get("refunded", 0),
+            "amount_by_currency": amount_by_currency,
+            "granularity": granularity,
+            "buckets": buckets,
+        }
+
+    def rebuild(self) -> int:
+        """
+        Recompute every rollup from the transactions table.
+
+        Aggregation runs in the database (GROUP BY); only the
+        resulting buckets are loaded. Commits when done.
+
+        Returns:
+            Number of rollup rows written
+        """
+        self.db.execute(delete(TransactionRollup))
+
+        now = datetime.utcnow()
+        written = 0
+
+        for granularity in GRANULARITIES:
+            bucket = self._bucket_expression(granularity)
+            rows = self.db.query(
+                bucket.label("bucket_start"),
+                Transaction.currency,
+                Transaction.status,
+                func.count(Transaction.id),
+                func.coalesce(func.sum(Transaction.amount), 0),
+            ).group_by(
+                bucket,
+                Transaction.currency,
+                Transaction.status,
+            ).all()
+
+            for bucket_start, currency, status, count, amount in rows:
+                if isinstance(bucket_start, str):
+                    bucket_start = datetime.fromisoformat(bucket_start)
+                self.db.add(TransactionRollup(
+                    granularity=granularity,
+                    bucket_start=bucket_start,
+                    currency=currency,
+                    status=status,
+                    count=count,
+                    amount=amount,
+                    updated_at=now,
+                ))
+            written += len(rows)
+
+        self.db.commit()
+
+        logger.info("Transaction rollups rebuilt", rows=written)
+        return written
+
+    def _bucket_expression(self, granularity: str):
+        """SQL expression truncating created_at to a bucket."""
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect == "postgresql":
+            return func.date_trunc(granularity, Transaction.created_at)
+
+        if dialect == "sqlite":
+            fmt = "%Y-%m-%d %H:00:00" if granularity == "hour" else "%Y-%m-%d 00:00:00"
+            return func.strftime(literal(fmt), Transaction.created_at)
+
+        # MySQL and others
+        fmt = "%Y-%m-%d %H:00:00" if granularity == "hour" else "%Y-%m-%d 00:00:00"
+        return func.date_format(Transaction.created_at, literal(fmt))
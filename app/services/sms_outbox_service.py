@@ -0,0 +1,223 @@
+"""
+SMS Outbox Service
+
+Queues SMS messages for background delivery and records results.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.payment_link import PaymentLink
+from app.models.receipt import Receipt
+from app.models.sms_outbox import SMSOutbox
+from app.utils import logger
+
+
+class SMSOutboxService:
+    """
+    Service for the durable SMS outbox.
+
+    Responsibilities:
+    - Queue messages (routes return as soon as the row is committed)
+    - Claim due messages for a worker
+    - Record delivery results with retry and exponential backoff
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        phone: str,
+        message: str,
+        payment_link_id: Optional[int] = None,
+        receipt_id: Optional[int] = None,
+        sender_id: Optional[str] = None,
+    ) -> SMSOutbox:
+        """
+        Queue an SMS for delivery.
+
+        Args:
+            phone: Recipient phone number
+            message: Message body
+            payment_link_id: PaymentLink to mark as sent on delivery
+            receipt_id: Receipt to mark as delivered on delivery
+            sender_id: Sender ID override (optional)
+
+        Returns:
+            The queued outbox row
+        """
+        outbox = SMSOutbox(
+            phone=phone,
+            message=message,
+            sender_id=sender_id,
+            max_attempts=settings.sms_outbox_max_attempts,
+            payment_link_id=payment_link_id,
+            receipt_id=receipt_id,
+        )
+
+        self.db.add(outbox)
+        self.db.commit()
+        self.db.refresh(outbox)
+
+        logger.info(
+            "SMS queued",
+            outbox_id=outbox.id,
+            payment_link_id=payment_link_id,
+            receipt_id=receipt_id,
+        )
+
+        # Wake the in-process worker so delivery starts immediately
+        from app.workers.sms_worker import sms_outbox_worker
+        sms_outbox_worker.notify()
+
+        return outbox
+
+    def claim_due(self, worker_id: str, limit: int) -> List[SMSOutbox]:
+        """
+        Claim up to `limit` due messages for a worker.
+
+        Messages stuck in "sending" past their lease (worker crashed)
+        are reclaimed. The conditional UPDATE makes claiming safe
+        across worker processes.
+        """
+        now = datetime.utcnow()
+
+        due = or_(
+            and_(
+                SMSOutbox.status == "pending",
+                SMSOutbox.next_attempt_at <= now,
+            ),
+            and_(
+                SMSOutbox.status == "sending",
+                SMSOutbox.locked_until < now,
+            ),
+        )
+
+        candidate_ids = [
+            row.id
+            for row in self.db.query(SMSOutbox.id)
+            .filter(due)
+            .order_by(SMSOutbox.next_attempt_at)
+            .limit(limit)
+        ]
+
+        if not candidate_ids:
+            self.db.rollback()
+            return []
+
+        self.db.query(SMSOutbox).filter(
+            SMSOutbox.id.in_(candidate_ids),
+            due,
+        ).update(
+            {
+                SMSOutbox.status: "sending",
+                SMSOutbox.locked_by: worker_id,
+                SMSOutbox.locked_until: now + timedelta(
+                    seconds=settings.sms_outbox_lease_seconds
+                ),
+                SMSOutbox.attempts: SMSOutbox.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+        return (
+            self.db.query(SMSOutbox)
+            .filter(
+                SMSOutbox.id.in_(candidate_ids),
+                SMSOutbox.status == "sending",
+                SMSOutbox.locked_by == worker_id,
+            )
+            .all()
+        )
+
+    def record_result(self, outbox_id: int, result: dict) -> Optional[SMSOutbox]:
+        """
+        Record the outcome of a delivery attempt.
+
+        On success, writes sms_sent/sms_message_id back to the payment
+        link or delivered back to the receipt. On failure, schedules a
+        retry with exponential backoff until max_attempts is reached.
+        """
+        outbox = self.db.query(SMSOutbox).filter(SMSOutbox.id == outbox_id).first()
+
+        if not outbox:
+            logger.warning("Outbox message not found", outbox_id=outbox_id)
+            return None
+
+        now = datetime.utcnow()
+        outbox.locked_by = None
+        outbox.locked_until = None
+
+        if result.get("success"):
+            outbox.status = "sent"
+            outbox.sent_at = now
+            outbox.message_id = result.get("message_id")
+            outbox.last_error = None
+            self._mark_delivered(outbox, now)
+        else:
+            error = result.get("error") or "Unknown SMS error"
+            outbox.last_error = error
+
+            if outbox.attempts >= outbox.max_attempts:
+                outbox.status = "failed"
+            else:
+                outbox.status = "pending"
+                outbox.next_attempt_at = now + self._backoff(outbox.attempts)
+
+            self._mark_failed(outbox, error)
+
+        self.db.commit()
+
+        logger.info(
+            "SMS outbox attempt recorded",
+            outbox_id=outbox.id,
+            status=outbox.status,
+            attempts=outbox.attempts,
+        )
+        return outbox
+
+    def pending_count(self) -> int:
+        """Number of messages still waiting to be sent."""
+        return self.db.query(func.count(SMSOutbox.id)).filter(
+            SMSOutbox.status.in_(["pending", "sending"])
+        ).scalar()
+
+    def _backoff(self, attempts: int) -> timedelta:
+        """Exponential backoff: base * 2^(attempts - 1), capped."""
+        delay = settings.sms_outbox_backoff_seconds * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, settings.sms_outbox_backoff_max_seconds))
+
+    def _mark_delivered(self, outbox: SMSOutbox, sent_at: datetime) -> None:
+        """Write a successful delivery back to the linked record."""
+        if outbox.payment_link_id:
+            link = self.db.query(PaymentLink).filter(
+                PaymentLink.id == outbox.payment_link_id
+            ).first()
+            if link:
+                link.sms_sent = True
+                link.sms_sent_at = sent_at
+                link.sms_message_id = outbox.message_id
+
+        if outbox.receipt_id:
+            receipt = self.db.query(Receipt).filter(
+                Receipt.id == outbox.receipt_id
+            ).first()
+            if receipt:
+                receipt.delivered = True
+                receipt.delivered_at = sent_at
+                receipt.delivery_error = None
+
+    def _mark_failed(self, outbox: SMSOutbox, error: str) -> None:
+        """Write the latest delivery error back to the linked receipt."""
+        if outbox.receipt_id:
+            receipt = self.db.query(Receipt).filter(
+                Receipt.id == outbox.receipt_id
+            ).first()
+            if receipt:
+                receipt.delivery_error = error
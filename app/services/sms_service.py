@@ -4,11 +4,164 @@ SMS Service
 Sends SMS messages using Africa's Talking API.
 """
 
-from typing import Optional
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import africastalking
 
 from app.config import settings
 from app.utils import logger, SMSError
+from app.utils.metrics import CounterFamily, Histogram, metrics
+
+
+sms_latency = Histogram()
+sms_results = CounterFamily(("result",))
+
+metrics.register_histogram(
+    "sms_send_duration_seconds",
+    sms_latency,
+    "Time to send one SMS through Africa's Talking, including batching",
+)
+metrics.register_counter(
+    "sms_sends_total",
+    sms_results,
+    "SMS send attempts by result (sent, rejected, unexpected_response, error, not_configured)",
+)
+
+
+class SMSBatcher:
+    """
+    Coalesces concurrent sends of the same message into bulk API calls.
+    
+    Africa's Talking accepts a list of recipients per request. Messages
+    with an identical body and sender ID submitted within the batching
+    window share one request; a batch is flushed early once it reaches
+    the maximum size. Each caller gets its own entry from
+    SMSMessageData.Recipients, matched by phone number.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+    ):
+        self.window_seconds = (
+            window_seconds
+            if window_seconds is not None
+            else settings.sms_batch_window_ms / 1000
+        )
+        self.max_batch_size = max_batch_size or settings.sms_batch_max_size
+        # (message, sender_id) -> pending (phone, future) pairs
+        self._pending: Dict[Tuple[str, str], List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._senders: Dict[Tuple[str, str], Callable] = {}
+        # Batches being sent; the loop only keeps weak references to tasks
+        self._sending: Set[asyncio.Task] = set()
+    
+    @property
+    def pending_count(self) -> int:
+        """Messages waiting for their batch to flush."""
+        return sum(len(batch) for batch in self._pending.values())
+    
+    async def submit(
+        self,
+        send: Callable,
+        phone: str,
+        message: str,
+        sender_id: str,
+    ) -> Optional[dict]:
+        """
+        Add a recipient to the batch for this message and wait for the result.
+        
+        Args:
+            send: Blocking bulk send function (africastalking.SMS.send)
+            phone: Normalized recipient phone number
+            message: Message body
+            sender_id: Sender ID
+            
+        Returns:
+            This recipient's entry from SMSMessageData.Recipients,
+            or None if the response did not include it
+        """
+        loop = asyncio.get_running_loop()
+        key = (message, sender_id)
+        future = loop.create_future()
+        
+        batch = self._pending.setdefault(key, [])
+        batch.append((phone, future))
+        self._senders.setdefault(key, send)
+        
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(
+                self.window_seconds, self._flush, key
+            )
+        
+        return await future
+    
+    def _flush(self, key: Tuple[str, str]) -> None:
+        """Detach the batch for `key` and send it in the background."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        
+        batch = self._pending.pop(key, [])
+        send = self._senders.pop(key, None)
+        if batch and send is not None:
+            task = asyncio.ensure_future(self._send_batch(send, key, batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+    
+    async def _send_batch(
+        self,
+        send: Callable,
+        key: Tuple[str, str],
+        batch: List[Tuple[str, asyncio.Future]],
+    ) -> None:
+        """Send one bulk request and resolve each caller's future."""
+        message, sender_id = key
+        phones = [phone for phone, _ in batch]
+        
+        try:
+            response = await asyncio.to_thread(
+                send,
+                message=message,
+                recipients=phones,
+                sender_id=sender_id,
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        # Group results by number (a number may appear more than once)
+        results: Dict[str, List[dict]] = {}
+        if response and response.get("SMSMessageData"):
+            for recipient in response["SMSMessageData"].get("Recipients", []):
+                results.setdefault(recipient.get("number"), []).append(recipient)
+        
+        logger.info(
+            "SMS batch sent",
+            recipients=len(phones),
+            results=sum(len(r) for r in results.values()),
+        )
+        
+        for phone, future in batch:
+            matches = results.get(phone)
+            if not future.done():
+                future.set_result(matches.pop(0) if matches else None)
+
+
+# Shared batcher - batches across all SMSService instances in this process
+sms_batcher = SMSBatcher()
+
+metrics.register_gauge(
+    "sms_batch_pending",
+    lambda: sms_batcher.pending_count,
+    "Messages waiting for their SMS batch to flush",
+)
 
 
 class SMSService:
@@ -53,6 +206,7 @@ class SMSService:
         """
         if not self._initialized:
             logger.warning("SMS not sent - service not initialized", phone=phone)
+            sms_results.inc("not_configured")
             return {
                 "success": False,
                 "error": "SMS service not configured",
@@ -60,52 +214,68 @@ class SMSService:
         
         # Normalize phone number
         phone = self._normalize_phone(phone)
+        sender_id = sender_id or settings.at_sender_id
         
+        started = time.perf_counter()
         try:
-            # Send via Africa's Talking
-            response = self.sms.send(
-                message=message,
-                recipients=[phone],
-                sender_id=sender_id or settings.at_sender_id,
-            )
+            if settings.sms_batch_window_ms > 0:
+                # Coalesce with concurrent sends of the same message
+                recipient = await sms_batcher.submit(
+                    self.sms.send, phone, message, sender_id
+                )
+            else:
+                # Send via Africa's Talking (blocking SDK - keep it off the event loop)
+                response = await asyncio.to_thread(
+                    self.sms.send,
+                    message=message,
+                    recipients=[phone],
+                    sender_id=sender_id,
+                )
+                recipients = []
+                if response and response.get("SMSMessageData"):
+                    recipients = response["SMSMessageData"].get("Recipients", [])
+                recipient = recipients[0] if recipients else None
+            
+            sms_latency.observe(time.perf_counter() - started)
             
             # Parse response
-            if response and response.get("SMSMessageData"):
-                recipients = response["SMSMessageData"].get("Recipients", [])
+            if recipient:
+                status = recipient.get("status", "")
                 
-                if recipients:
-                    recipient = recipients[0]
-                    status = recipient.get("status", "")
-                    
-                    if status == "Success":
-                        logger.info(
-                            "SMS sent successfully",
-                            phone=phone,
-                            message_id=recipient.get("messageId"),
-                        )
-                        return {
-                            "success": True,
-                            "message_id": recipient.get("messageId"),
-                            "cost": recipient.get("cost"),
-                        }
-                    else:
-                        logger.warning(
-                            "SMS sending failed",
-                            phone=phone,
-                            status=status,
-                        )
-                        return {
-                            "success": False,
-                            "error": status,
-                        }
+                if status == "Success":
+                    sms_results.inc("sent")
+                    logger.info(
+                        "SMS sent successfully",
+                        phone=phone,
+                        message_id=recipient.get("messageId"),
+                    )
+                    return {
+                        "success": True,
+                        "message_id": recipient.get("messageId"),
+                        "cost": recipient.get("cost"),
+                    }
+                else:
+                    sms_results.inc("rejected")
+                    logger.warning(
+                        "SMS sending failed",
+                        phone=phone,
+                        status=status,
+                    )
+                    return {
+                        "success": False,
+                        "error": status,
+                    }
             
-            logger.warning("Unexpected SMS response", response=response)
+            sms_results.inc("unexpected_response")
+            logger.warning("Unexpected SMS response", phone=phone)
             return {
                 "success": False,
                 "error": "Unexpected response from SMS service",
             }
             
         except Exception as e:
+            sms_latency.observe(time.perf_counter() - started)
+            sms_results.inc("error")
             logger.error("SMS sending error", error=str(e), phone=phone)
             return {
                 "success": False,
@@ -143,11 +313,20 @@ class SMSService:
         
         Convenience method for sending receipts.
         """
-        message = (
+        message = self.format_receipt_message(receipt_number, amount, business_name)
+        
+        return await self.send_sms(phone, message)
+    
+    @staticmethod
+    def format_receipt_message(
+        receipt_number: str,
+        amount: str,
+        business_name: str = "POS System",
+    ) -> str:
+        """Compose the receipt summary text."""
+        return (
             f"Receipt: {receipt_number}\n"
             f"Amount: {amount}\n"
             f"Thank you for your payment!\n"
             f"- {business_name}"
         )
-        
-        return await self.send_sms(phone, message)
@@ -0,0 +1,267 @@
+"""
+Stripe Client
+
+Non-blocking gateway to the Stripe REST API.
+Shares one pooled, keep-alive HTTP client across all services.
+"""
+
+import asyncio
+import re
+import time
+import uuid
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import httpx
+import stripe
+from stripe._encode import _api_encode
+
+from app.config import settings
+from app.utils import logger
+from app.utils.metrics import CounterFamily, HistogramFamily, metrics
+
+
+# Object IDs in API paths (pi_3N..., cs_test_a1...): a prefix and an
+# underscore, and - unlike resource names - digits or capitals.
+# Collapsed so ad-hoc request() calls do not create a series per object.
+OBJECT_ID_PATTERN = re.compile(r"/(?=[^/]*_)(?=[^/]*[0-9A-Z])[A-Za-z0-9_]+")
+
+stripe_latency = HistogramFamily(("operation",))
+stripe_errors = CounterFamily(("operation", "error"))
+
+metrics.register_histogram(
+    "stripe_request_duration_seconds",
+    stripe_latency,
+    "Stripe API call time by operation, including network retries",
+)
+metrics.register_counter(
+    "stripe_errors_total",
+    stripe_errors,
+    "Failed Stripe API calls by operation and error class",
+)
+
+
+class StripeClient:
+    """
+    Async Stripe API client.
+
+    The official SDK (v7) only ships a blocking HTTP client, so calling
+    it from an async route freezes the event loop for the whole round
+    trip. This client sends the same requests over a shared
+    httpx.AsyncClient and reuses the SDK for encoding, headers, error
+    mapping and response objects, so callers still get
+    stripe.PaymentIntent / stripe.Refund objects and stripe.error.*
+    exceptions.
+
+    Usage:
+        from app.services.stripe_client import stripe_client
+        intent = await stripe_client.create_payment_intent(amount=1000, currency="usd")
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_network_retries: Optional[int] = None,
+    ):
+        self._api_key = api_key
+        self.max_connections = max_connections or settings.stripe_max_connections
+        self.max_keepalive_connections = (
+            max_keepalive_connections or settings.stripe_max_keepalive_connections
+        )
+        self.timeout = timeout or settings.stripe_timeout_seconds
+        self.max_network_retries = (
+            max_network_retries
+            if max_network_retries is not None
+            else settings.stripe_max_network_retries
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._requestor: Optional[stripe.APIRequestor] = None
+
+    @property
+    def api_key(self) -> str:
+        """API key, falling back to the globally configured one."""
+        return self._api_key or stripe.api_key or settings.stripe_secret_key
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily create the pooled HTTP client."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=stripe.api_base,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+            )
+        return self._client
+
+    def _get_requestor(self) -> stripe.APIRequestor:
+        """SDK requestor used for headers and response interpretation only."""
+        if self._requestor is None:
+            self._requestor = stripe.APIRequestor(key=self.api_key)
+        return self._requestor
+
+    async def close(self) -> None:
+        """Close pooled connections. Call on application shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> stripe.StripeObject:
+        """
+        Issue a Stripe API request.
+
+        Args:
+            method: HTTP method (get, post, delete)
+            path: API path, e.g. "/v1/payment_intents"
+            params: Request parameters (nested dicts allowed)
+            idempotency_key: Idempotency key for POST requests
+            operation: Metrics label (defaults to method and path)
+
+        Returns:
+            Stripe object built from the response
+
+        Raises:
+            stripe.error.StripeError: On API or connection failure
+        """
+        operation = operation or f"{method.lower()} {OBJECT_ID_PATTERN.sub('/{id}', path)}"
+        started = time.perf_counter()
+        try:
+            return await self._request(method, path, params, idempotency_key)
+        except stripe.error.StripeError as e:
+            stripe_errors.inc(operation, type(e).__name__)
+            raise
+        finally:
+            stripe_latency.labels(operation).observe(time.perf_counter() - started)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        idempotency_key: Optional[str],
+    ) -> stripe.StripeObject:
+        method = method.lower()
+        api_key = self.api_key
+        if not api_key:
+            raise stripe.error.AuthenticationError("No Stripe API key configured")
+
+        requestor = self._get_requestor()
+        headers = requestor.request_headers(api_key, method)
+        if method == "post" and not idempotency_key:
+            # Without a key, a retry after a timeout Stripe had already
+            # applied would repeat the request (e.g. a second refund)
+            idempotency_key = str(uuid.uuid4())
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+
+        # Same form encoding as the SDK (nested params use brackets)
+        encoded = urlencode(list(_api_encode(params or {})))
+        encoded = encoded.replace("%5B", "[").replace("%5D", "]")
+
+        url = path
+        content = None
+        if method in ("get", "delete"):
+            if encoded:
+                url = f"{path}?{encoded}"
+        else:
+            content = encoded
+
+        client = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                response = await client.request(
+                    method.upper(),
+                    url,
+                    headers=headers,
+                    content=content,
+                )
+                break
+            except httpx.TransportError as e:
+                # POSTs carry an idempotency key (reused on every attempt), so retrying is safe
+                if attempt >= self.max_network_retries:
+                    logger.error(
+                        "Stripe connection error",
+                        path=path,
+                        error=str(e),
+                    )
+                    raise stripe.error.APIConnectionError(
+                        f"Error communicating with Stripe: {e}"
+                    )
+                attempt += 1
+                await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 2.0))
+
+        resp = requestor.interpret_response(
+            response.content,
+            response.status_code,
+            response.headers,
+        )
+        return stripe.convert_to_stripe_object(resp, api_key, requestor.api_version)
+
+    # Resource helpers
+
+    async def create_payment_intent(
+        self,
+        idempotency_key: Optional[str] = None,
+        **params: Any,
+    ) -> stripe.PaymentIntent:
+        """Create a PaymentIntent."""
+        return await self.request(
+            "post", "/v1/payment_intents", params,
+            idempotency_key=idempotency_key,
+            operation="create_payment_intent",
+        )
+
+    async def retrieve_payment_intent(
+        self,
+        payment_intent_id: str,
+        **params: Any,
+    ) -> stripe.PaymentIntent:
+        """Retrieve a PaymentIntent by ID."""
+        return await self.request(
+            "get", f"/v1/payment_intents/{payment_intent_id}", params,
+            operation="retrieve_payment_intent",
+        )
+
+    async def create_refund(
+        self,
+        idempotency_key: Optional[str] = None,
+        **params: Any,
+    ) -> stripe.Refund:
+        """Create a Refund."""
+        return await self.request(
+            "post", "/v1/refunds", params,
+            idempotency_key=idempotency_key,
+            operation="create_refund",
+        )
+
+    async def create_checkout_session(
+        self,
+        idempotency_key: Optional[str] = None,
+        **params: Any,
+    ) -> stripe.checkout.Session:
+        """Create a Checkout Session."""
+        return await self.request(
+            "post", "/v1/checkout/sessions", params,
+            idempotency_key=idempotency_key,
+            operation="create_checkout_session",
+        )
+
+    async def list_events(self, **params: Any) -> stripe.ListObject:
+        """List Events (newest first), e.g. created[gte], starting_after."""
+        return await self.request("get", "/v1/events", params, operation="list_events")
+
+
+# Shared client - one connection pool per worker process
+stripe_client = StripeClient()
@@ -0,0 +1,176 @@
+"""
+Transaction Feed
+
+Live stream of transaction changes (server-sent events) for the
+dashboard, so it no longer re-fetches list pages to see new sales.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import run_db
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionResponse
+from app.services.notifier import notifier
+from app.services.transaction_service import TRANSACTIONS_TOPIC
+from app.utils import logger
+from app.utils.errors import ValidationError
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+class TransactionFeed:
+    """
+    Snapshot-plus-delta stream of the transactions table.
+
+    A new client receives a `snapshot` event with the latest
+    transactions, then a `transaction` event carrying the full row each
+    time one is created or changes; clients upsert rows by id, so a
+    repeated delta is harmless. Every event id is a cursor on
+    updated_at: a reconnecting client sends it back as Last-Event-ID
+    and receives only the rows changed since, or a fresh snapshot when
+    it has been away longer than transaction_feed_resume_seconds.
+
+    Changes are read with an indexed seek on updated_at whenever
+    transactions_changed() publishes (in any worker), and on every
+    heartbeat in case a notification was lost. Each read starts
+    transaction_feed_lookback_seconds before the cursor so a row
+    stamped just before another worker's commit is not skipped.
+
+    The request's session is closed before a streaming body is sent;
+    run_db() checks a connection out again for each read, so none is
+    held between changes. Request sessions do not expire on commit, so
+    every read uses populate_existing() - otherwise rows already in the
+    identity map would keep their old updated_at and never be re-sent.
+    """
+
+    def __init__(self, db: Session, snapshot_size: int = 20):
+        self.db = db
+        self.snapshot_size = snapshot_size
+        self.lookback = timedelta(seconds=settings.transaction_feed_lookback_seconds)
+        self.max_changes = settings.transaction_feed_max_changes
+
+    def _latest(self, db: Session) -> List[Transaction]:
+        """Newest transactions, for the snapshot."""
+        return (
+            db.query(Transaction)
+            .populate_existing()
+            .order_by(desc(Transaction.created_at), desc(Transaction.id))
+            .limit(self.snapshot_size)
+            .all()
+        )
+
+    def _changed_since(self, db: Session, since: datetime) -> List[Transaction]:
+        """Up to max_changes + 1 rows updated at or after `since`, oldest first."""
+        return (
+            db.query(Transaction)
+            .populate_existing()
+            .filter(Transaction.updated_at >= since)
+            .order_by(Transaction.updated_at, Transaction.id)
+            .limit(self.max_changes + 1)
+            .all()
+        )
+
+    def _resume_point(self, last_event_id: Optional[str]) -> Optional[datetime]:
+        """Cursor time to resume from, or None if a snapshot is needed."""
+        if not last_event_id:
+            return None
+        try:
+            since, _ = decode_cursor(last_event_id)
+        except ValidationError:
+            return None
+        window = timedelta(seconds=settings.transaction_feed_resume_seconds)
+        if since < datetime.utcnow() - window:
+            return None
+        return since
+
+    @staticmethod
+    def _event(name: str, data: dict, event_id: str) -> str:
+        return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data)}\n\n"
+
+    @staticmethod
+    def _row(transaction: Transaction) -> dict:
+        return TransactionResponse.model_validate(transaction).model_dump(mode="json")
+
+    async def _snapshot(self) -> Tuple[str, datetime, Dict[int, datetime]]:
+        """
+        Snapshot event, the cursor time deltas continue from, and the
+        updated_at of each row sent.
+        """
+        # Taken before the read: rows changing meanwhile are re-sent as deltas
+        since = datetime.utcnow()
+        transactions = await run_db(self.db, self._latest)
+        event = self._event(
+            "snapshot",
+            {"transactions": [self._row(t) for t in transactions]},
+            encode_cursor(since, 0),
+        )
+        return event, since, {t.id: t.updated_at for t in transactions if t.updated_at}
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the feed as server-sent events until the client disconnects.
+
+        Args:
+            last_event_id: Last-Event-ID from a previous connection
+        """
+        heartbeat = settings.transaction_feed_heartbeat_seconds
+
+        # Subscribed before the first read, so no change is missed
+        async with notifier.subscribe(TRANSACTIONS_TOPIC) as changed:
+            yield f"retry: {heartbeat * 1000}\n\n"
+
+            # Rows already sent, by id, as of their updated_at
+            sent: Dict[int, datetime] = {}
+
+            since = self._resume_point(last_event_id)
+            resuming = since is not None
+            if not resuming:
+                event, since, sent = await self._snapshot()
+                yield event
+
+            while True:
+                changed.clear()
+                start = since - self.lookback
+                rows = await run_db(self.db, lambda db: self._changed_since(db, start))
+                more = len(rows) > self.max_changes
+                rows = rows[:self.max_changes]
+
+                if resuming and more:
+                    # Too far behind to replay - start over
+                    logger.info("Transaction feed resume too far behind, sending snapshot")
+                    event, since, sent = await self._snapshot()
+                    yield event
+                    resuming = False
+                    continue
+                resuming = False
+
+                emitted = False
+                for transaction in rows:
+                    if sent.get(transaction.id) == transaction.updated_at:
+                        continue
+                    sent[transaction.id] = transaction.updated_at
+                    since = max(since, transaction.updated_at)
+                    emitted = True
+                    yield self._event(
+                        "transaction",
+                        self._row(transaction),
+                        encode_cursor(since, transaction.id),
+                    )
+
+                # Rows older than the lookback window are never re-read
+                horizon = since - self.lookback
+                sent = {id: at for id, at in sent.items() if at >= horizon}
+
+                if more and emitted:
+                    continue
+
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
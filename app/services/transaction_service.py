@@ -5,12 +5,74 @@ Business logic for transaction management.
 Handles database operations and webhook events.
 """
 
-from typing import Optional, List, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import asyncio
+import json
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional, List, Tuple
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import desc, or_, text
 
+from app.config import settings
+from app.database import run_db
+from app.models.payment_link import PaymentLink
 from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionResponse
+from app.services.lookup_cache import transaction_cache
+from app.services.notifier import notifier
+from app.services.payment_link_service import payment_links_changed
+from app.services.rollup_service import RollupService
 from app.utils import logger
+from app.utils.cache import TTLCache
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+# Cached totals for list pagination, keyed by status filter.
+# Cleared whenever a transaction is created or changes status.
+transaction_count_cache = TTLCache(ttl=settings.transaction_count_cache_ttl)
+
+
+def invalidate_transaction_counts() -> None:
+    """Drop cached pagination totals after a write."""
+    transaction_count_cache.clear()
+
+
+# Notifier topic published on every transaction create or change
+TRANSACTIONS_TOPIC = "transactions"
+
+
+async def transactions_changed(transaction_ids: Iterable[int]) -> None:
+    """
+    Announce committed changes to transactions (including new ones).
+    
+    Drops their cached lookups, then wakes requests waiting on them
+    and the live transaction feeds.
+    """
+    transaction_ids = list(transaction_ids)
+    if not transaction_ids:
+        return
+    await transaction_cache.invalidate_many(transaction_ids)
+    await notifier.publish(
+        [f"transaction:{id}" for id in transaction_ids] + [TRANSACTIONS_TOPIC]
+    )
+
+
+class Changes(NamedTuple):
+    """Rows a committed webhook event changed, to be announced."""
+    transaction_ids: List[int] = []
+    payment_link_ids: List[int] = []
+
+
+async def announce_changes(changes: Changes) -> None:
+    """
+    Announce the rows a webhook event changed, once committed.
+    
+    Must run on the event loop (the notifier wakes waiters there).
+    """
+    if changes.transaction_ids:
+        invalidate_transaction_counts()
+        await transactions_changed(changes.transaction_ids)
+    if changes.payment_link_ids:
+        await payment_links_changed(changes.payment_link_ids)
 
 
 class TransactionService:
@@ -32,6 +94,62 @@ class TransactionService:
             Transaction.id == transaction_id
         ).first()
     
+    async def get_transaction_data(self, transaction_id: int) -> Optional[dict]:
+        """
+        Get a transaction as TransactionResponse data.
+        
+        Read through transaction_cache, so repeated status polls do not
+        reach the database. Writers call transactions_changed().
+        """
+        # Loaded from the primary: a lagging replica would put a stale
+        # status in the cache just after transactions_changed()
+        async def load() -> Optional[dict]:
+            transaction = await run_db(
+                self.db,
+                lambda db: TransactionService(db).get_transaction(transaction_id),
+            )
+            if transaction is None:
+                return None
+            return TransactionResponse.model_validate(transaction).model_dump(mode="json")
+        
+        return await transaction_cache.get_or_load(transaction_id, load)
+    
+    async def wait_for_status_change(
+        self,
+        transaction_id: int,
+        status: str,
+        timeout: float,
+    ) -> Optional[dict]:
+        """
+        Wait until a transaction's status is no longer `status`.
+        
+        Woken by transactions_changed() (in any worker), with a periodic
+        re-check as a fallback, and holds no database connection while
+        waiting.
+        
+        Returns:
+            TransactionResponse data once changed, or as it stands when
+            the timeout passes; None if the transaction does not exist
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        async with notifier.subscribe(f"transaction:{transaction_id}") as changed:
+            while True:
+                changed.clear()
+                transaction = await self.get_transaction_data(transaction_id)
+                remaining = deadline - loop.time()
+                if transaction is None or transaction["status"] != status or remaining <= 0:
+                    return transaction
+                
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(),
+                        min(remaining, settings.status_wait_recheck_seconds),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+    
     def get_by_payment_intent(self, payment_intent_id: str) -> Optional[Transaction]:
         """Get a transaction by Stripe PaymentIntent ID."""
         return self.db.query(Transaction).filter(
@@ -43,7 +161,8 @@ class TransactionService:
         page: int = 1,
         per_page: int = 20,
         status: Optional[str] = None,
-    ) -> Tuple[List[Transaction], int]:
+        count_strategy: str = "exact",
+    ) -> Tuple[List[Transaction], int, str]:
         """
         List transactions with pagination and filtering.
         
@@ -51,9 +170,10 @@ class TransactionService:
             page: Page number (1-indexed)
             per_page: Items per page
             status: Filter by status (optional)
+            count_strategy: How to compute the total (see count_transactions)
             
         Returns:
-            Tuple of (transactions, total_count)
+            Tuple of (transactions, total_count, count_strategy_used)
         """
         query = self.db.query(Transaction)
         
@@ -62,7 +182,9 @@ class TransactionService:
             query = query.filter(Transaction.status == status)
         
         # Get total count
-        total = query.count()
+        total, count_strategy = self.count_transactions(
+            query, status, count_strategy
+        )
         
         # Apply pagination and ordering
         transactions = (
@@ -73,11 +195,171 @@ class TransactionService:
             .all()
         )
         
-        return transactions, total
+        return transactions, total, count_strategy
+    
+    def count_transactions(
+        self,
+        query: Query,
+        status: Optional[str],
+        strategy: str = "exact",
+    ) -> Tuple[int, str]:
+        """
+        Count rows matched by a list query.
+        
+        Strategies:
+        - exact: COUNT(*) over the filtered table
+        - cached: exact count reused for transaction_count_cache_ttl
+          seconds; cleared when webhooks or payments change a transaction
+        - estimate: planner row estimate (PostgreSQL only); falls back
+          to exact on other databases or when statistics are missing
+        
+        Returns:
+            Tuple of (total, strategy actually used)
+        """
+        if strategy == "cached":
+            key = status or "*"
+            total = transaction_count_cache.get(key)
+            if total is None:
+                total = query.count()
+                transaction_count_cache.set(key, total)
+            return total, "cached"
+        
+        if strategy == "estimate" and self.db.get_bind().dialect.name == "postgresql":
+            total = self._estimate_count(query, status)
+            if total is not None:
+                return total, "estimate"
+        
+        return query.count(), "exact"
+    
+    def _estimate_count(self, query: Query, status: Optional[str]) -> Optional[int]:
+        """Read a row estimate from PostgreSQL planner statistics."""
+        try:
+            if not status:
+                # Whole table: reltuples is maintained by ANALYZE/autovacuum
+                estimate = self.db.execute(text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:table)"
+                ), {"table": Transaction.__tablename__}).scalar()
+            else:
+                statement = query.statement.compile(
+                    dialect=self.db.get_bind().dialect,
+                    compile_kwargs={"literal_binds": True},
+                )
+                plan = self.db.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {statement}")
+                ).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                estimate = plan[0]["Plan"]["Plan Rows"]
+        except Exception as e:
+            logger.warning("Count estimate failed", error=str(e))
+            self.db.rollback()
+            return None
+        
+        # reltuples is -1 before the table is first analyzed
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+    
+    def list_transactions_after(
+        self,
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        status: Optional[str] = None,
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        List transactions with keyset (cursor) pagination.
+        
+        Seeks on (created_at, id) instead of using OFFSET, so every page
+        costs the same regardless of depth. With a status filter the
+        seek uses ix_transactions_status_created; id only breaks ties
+        between rows created in the same instant.
+        
+        Args:
+            cursor: Opaque cursor from the previous page (None for first page)
+            per_page: Items per page
+            status: Filter by status (optional)
+            
+        Returns:
+            Tuple of (transactions, next_cursor). next_cursor is None on
+            the last page.
+        """
+        query = self.db.query(Transaction)
+        
+        # Apply status filter
+        if status:
+            query = query.filter(Transaction.status == status)
+        
+        # Seek past the last row of the previous page
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(
+                Transaction.created_at <= created_at,
+                or_(
+                    Transaction.created_at < created_at,
+                    Transaction.id < last_id,
+                ),
+            )
+        
+        # Fetch one extra row to know whether another page exists
+        transactions = (
+            query
+            .order_by(desc(Transaction.created_at), desc(Transaction.id))
+            .limit(per_page + 1)
+            .all()
+        )
+        
+        next_cursor = None
+        if len(transactions) > per_page:
+            transactions = transactions[:per_page]
+            last = transactions[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        
+        return transactions, next_cursor
+    
+    def set_status(
+        self,
+        transaction: Transaction,
+        status: str,
+        event_created: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Change a transaction's status and update the sales rollups.
+        
+        Does not commit - the rollup delta is committed together with
+        the status change. Returns True if the status actually changed.
+        
+        When event_created is given (webhooks), the change is ignored if
+        a newer Stripe event has already been applied, so a delayed
+        payment_intent.succeeded cannot undo a refund.
+        """
+        if event_created is not None:
+            if transaction.last_event_at and event_created < transaction.last_event_at:
+                logger.info(
+                    "Ignoring out-of-order event",
+                    transaction_id=transaction.id,
+                    status=status,
+                    event_created=event_created,
+                    last_event_at=transaction.last_event_at,
+                )
+                return False
+            transaction.last_event_at = event_created
+        
+        old_status = transaction.status
+        if old_status == status:
+            return False
+        
+        transaction.status = status
+        RollupService(self.db).record_status_change(transaction, old_status, status)
+        return True
     
-    async def handle_payment_success(self, payment_intent: dict) -> None:
+    def apply_payment_success(
+        self,
+        payment_intent: dict,
+        event_created: Optional[datetime] = None,
+    ) -> Changes:
         """
-        Handle payment_intent.succeeded webhook event.
+        Record a payment_intent.succeeded webhook event.
         
         Updates transaction status and stores card details (last4 only).
         """
@@ -88,14 +370,15 @@ class TransactionService:
                 "Transaction not found for payment intent",
                 payment_intent_id=payment_intent.id,
             )
-            return
+            return Changes()
         
         # Update status
-        transaction.status = "succeeded"
+        self.set_status(transaction, "succeeded", event_created)
         
         # Store safe card details (last 4 digits only)
-        if payment_intent.charges and payment_intent.charges.data:
-            charge = payment_intent.charges.data[0]
+        charges = payment_intent.get("charges")
+        if charges and charges.data:
+            charge = charges.data[0]
             if charge.payment_method_details and charge.payment_method_details.card:
                 card = charge.payment_method_details.card
                 transaction.card_last4 = card.last4
@@ -108,10 +391,15 @@ class TransactionService:
             transaction_id=transaction.id,
             payment_intent_id=payment_intent.id,
         )
+        return Changes(transaction_ids=[transaction.id])
     
-    async def handle_payment_failure(self, payment_intent: dict) -> None:
+    def apply_payment_failure(
+        self,
+        payment_intent: dict,
+        event_created: Optional[datetime] = None,
+    ) -> Changes:
         """
-        Handle payment_intent.payment_failed webhook event.
+        Record a payment_intent.payment_failed webhook event.
         """
         transaction = self.get_by_payment_intent(payment_intent.id)
         
@@ -120,9 +408,9 @@ class TransactionService:
                 "Transaction not found for failed payment",
                 payment_intent_id=payment_intent.id,
             )
-            return
+            return Changes()
         
-        transaction.status = "failed"
+        self.set_status(transaction, "failed", event_created)
         self.db.commit()
         
         logger.info(
@@ -130,40 +418,122 @@ class TransactionService:
             transaction_id=transaction.id,
             payment_intent_id=payment_intent.id,
         )
+        return Changes(transaction_ids=[transaction.id])
     
-    async def handle_checkout_complete(self, session: dict) -> None:
+    def apply_checkout_complete(
+        self,
+        session: dict,
+        event_created: Optional[datetime] = None,
+    ) -> Changes:
         """
-        Handle checkout.session.completed webhook event.
+        Record a checkout.session.completed webhook event.
         
-        Used when customer completes payment via Payment Link.
+        Used when customer completes payment via Payment Link. Marks
+        the payment link created for this Checkout Session as paid.
         """
+        transaction = None
         payment_intent_id = session.get("payment_intent")
         
         if payment_intent_id:
             transaction = self.get_by_payment_intent(payment_intent_id)
             if transaction:
-                transaction.status = "succeeded"
-                self.db.commit()
-                
-                logger.info(
-                    "Checkout completed",
-                    transaction_id=transaction.id,
-                    session_id=session.id,
-                )
+                self.set_status(transaction, "succeeded", event_created)
+        
+        payment_link = self.db.query(PaymentLink).filter(
+            PaymentLink.stripe_session_id == session.id
+        ).first()
+        link_paid = (
+            payment_link is not None
+            and not payment_link.paid
+            and session.get("payment_status") != "unpaid"
+        )
+        if link_paid:
+            payment_link.paid = True
+            payment_link.paid_at = datetime.utcnow()
+            if transaction:
+                payment_link.transaction_id = transaction.id
+        
+        if not transaction and not link_paid:
+            return Changes()
+        
+        self.db.commit()
+        
+        logger.info(
+            "Checkout completed",
+            transaction_id=transaction.id if transaction else None,
+            payment_link_id=payment_link.id if link_paid else None,
+            session_id=session.id,
+        )
+        return Changes(
+            transaction_ids=[transaction.id] if transaction else [],
+            payment_link_ids=[payment_link.id] if link_paid else [],
+        )
     
-    async def handle_refund(self, charge: dict) -> None:
+    def apply_refund(
+        self,
+        charge: dict,
+        event_created: Optional[datetime] = None,
+    ) -> Changes:
         """
-        Handle charge.refunded webhook event.
+        Record a charge.refunded webhook event.
         """
         payment_intent_id = charge.get("payment_intent")
+        if not payment_intent_id:
+            return Changes()
         
-        if payment_intent_id:
-            transaction = self.get_by_payment_intent(payment_intent_id)
-            if transaction:
-                transaction.status = "refunded"
-                self.db.commit()
-                
-                logger.info(
-                    "Charge refunded",
-                    transaction_id=transaction.id,
-                )
+        transaction = self.get_by_payment_intent(payment_intent_id)
+        if not transaction:
+            return Changes()
+        
+        self.set_status(transaction, "refunded", event_created)
+        self.db.commit()
+        
+        logger.info(
+            "Charge refunded",
+            transaction_id=transaction.id,
+        )
+        return Changes(transaction_ids=[transaction.id])
+    
+    # The handlers below run the database work in a thread, so a webhook
+    # processed on the API event loop does not block it, then announce
+    # the changes on the loop.
+    
+    async def handle_payment_success(
+        self,
+        payment_intent: dict,
+        event_created: Optional[datetime] = None,
+    ) -> None:
+        """Handle payment_intent.succeeded webhook event."""
+        await announce_changes(await asyncio.to_thread(
+            self.apply_payment_success, payment_intent, event_created
+        ))
+    
+    async def handle_payment_failure(
+        self,
+        payment_intent: dict,
+        event_created: Optional[datetime] = None,
+    ) -> None:
+        """Handle payment_intent.payment_failed webhook event."""
+        await announce_changes(await asyncio.to_thread(
+            self.apply_payment_failure, payment_intent, event_created
+        ))
+    
+    async def handle_checkout_complete(
+        self,
+        session: dict,
+        event_created: Optional[datetime] = None,
+    ) -> None:
+        """Handle checkout.session.completed webhook event."""
+        await announce_changes(await asyncio.to_thread(
+            self.apply_checkout_complete, session, event_created
+        ))
+    
+    async def handle_refund(
+        self,
+        charge: dict,
+        event_created: Optional[datetime] = None,
+    ) -> None:
+        """Handle charge.refunded webhook event."""
+        await announce_changes(await asyncio.to_thread(
+            self.apply_refund, charge, event_created
+        ))
@@ -0,0 +1,449 @@
+"""
+Webhook Service
+
+Stores verified Stripe events in the inbox and processes them.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import stripe
+from sqlalchemy import and_, exists, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.models.processed_event import ProcessedEvent
+from app.models.webhook_event import WebhookEvent
+from app.services.transaction_service import (
+    Changes,
+    TransactionService,
+    announce_changes,
+)
+from app.utils import logger
+from app.utils.cache import LRUSet
+
+
+# Event types dispatched to TransactionService (also what replay fetches)
+HANDLED_EVENT_TYPES = (
+    "payment_intent.succeeded",
+    "payment_intent.payment_failed",
+    "checkout.session.completed",
+    "charge.refunded",
+)
+
+# Event IDs this process has recently handled. Stripe redelivers
+# duplicates within seconds to days; most are answered from here
+# without a database round trip. processed_events is authoritative.
+processed_event_ids = LRUSet(maxsize=settings.webhook_dedup_cache_size)
+
+
+def partition_key_for(event: stripe.Event) -> str:
+    """
+    Key that serializes events touching the same transaction.
+
+    Payment intent events use the intent ID; charge and checkout events
+    use the intent they reference. Anything else is its own partition.
+    """
+    obj = event.data.object
+    if event.type.startswith("payment_intent."):
+        return obj.id
+    return obj.get("payment_intent") or event.id
+
+
+def event_created_at(event: stripe.Event) -> datetime:
+    """Stripe's creation time for an event (UTC)."""
+    created = event.get("created")
+    return datetime.utcfromtimestamp(created) if created else datetime.utcnow()
+
+
+class WebhookService:
+    """
+    Service for the Stripe webhook inbox.
+
+    Responsibilities:
+    - Persist verified events (the route acknowledges once committed)
+    - Recognize redelivered events (in-memory LRU, then processed_events)
+    - Claim pending events for a worker - only the oldest unprocessed
+      event of each payment intent, so events for one intent run in
+      Stripe order while different intents run in parallel
+    - Dispatch events to the TransactionService handlers, with retry
+      and exponential backoff on failure
+    - Report the backlog and sweep old dedup records
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_duplicate(self, event_id: str) -> bool:
+        """
+        Check whether an event was already handled or is waiting in the inbox.
+
+        Events that previously failed for good are not duplicates, so a
+        Stripe redelivery gets another chance.
+        """
+        if event_id in processed_event_ids:
+            return True
+
+        if self.db.query(ProcessedEvent.id).filter(
+            ProcessedEvent.event_id == event_id
+        ).first():
+            processed_event_ids.add(event_id)
+            return True
+
+        queued = self.db.query(WebhookEvent.id).filter(
+            WebhookEvent.event_id == event_id,
+            WebhookEvent.status != "failed",
+        ).first()
+        self.db.rollback()
+        return queued is not None
+
+    def enqueue(self, event: stripe.Event, payload: str) -> WebhookEvent:
+        """
+        Store a verified event for background processing.
+
+        Args:
+            event: Event returned by stripe.Webhook.construct_event
+            payload: Raw request body the signature was checked against
+
+        Returns:
+            The inbox row
+        """
+        inbox = WebhookEvent(
+            event_id=event.id,
+            event_type=event.type,
+            partition_key=partition_key_for(event),
+            event_created=event_created_at(event),
+            payload=payload,
+            max_attempts=settings.webhook_max_attempts,
+        )
+
+        self.db.add(inbox)
+        self.db.commit()
+        self.db.refresh(inbox)
+
+        # Wake the in-process worker so processing starts immediately
+        from app.workers.webhook_worker import webhook_worker
+        webhook_worker.notify()
+
+        return inbox
+
+    def claim_due(self, worker_id: str, limit: int) -> List[WebhookEvent]:
+        """
+        Claim up to `limit` pending events for a worker, oldest first.
+
+        An event is claimable only when it heads its partition: no
+        earlier unprocessed event for the same payment intent and no
+        other event of that intent currently being processed. Events
+        stuck in "processing" past their lease (worker crashed) are
+        reclaimed. The conditional UPDATE makes claiming safe across
+        worker processes.
+        """
+        now = datetime.utcnow()
+
+        other = aliased(WebhookEvent)
+        blocked = exists().where(
+            other.partition_key == WebhookEvent.partition_key,
+            other.id != WebhookEvent.id,
+            or_(
+                # Another event of this intent is being processed
+                and_(
+                    other.status == "processing",
+                    other.locked_until >= now,
+                ),
+                # An earlier event of this intent is still unprocessed
+                and_(
+                    other.status.in_(["pending", "processing"]),
+                    or_(
+                        other.event_created < WebhookEvent.event_created,
+                        and_(
+                            other.event_created == WebhookEvent.event_created,
+                            other.id < WebhookEvent.id,
+                        ),
+                    ),
+                ),
+            ),
+        )
+
+        due = and_(
+            or_(
+                and_(
+                    WebhookEvent.status == "pending",
+                    WebhookEvent.next_attempt_at <= now,
+                ),
+                and_(
+                    WebhookEvent.status == "processing",
+                    WebhookEvent.locked_until < now,
+                ),
+            ),
+            ~blocked,
+        )
+
+        candidate_ids = [
+            row.id
+            for row in self.db.query(WebhookEvent.id)
+            .filter(due)
+            .order_by(WebhookEvent.event_created, WebhookEvent.id)
+            .limit(limit)
+        ]
+
+        if not candidate_ids:
+            self.db.rollback()
+            return []
+
+        self.db.query(WebhookEvent).filter(
+            WebhookEvent.id.in_(candidate_ids),
+            due,
+        ).update(
+            {
+                WebhookEvent.status: "processing",
+                WebhookEvent.locked_by: worker_id,
+                WebhookEvent.locked_until: now + timedelta(
+                    seconds=settings.webhook_lease_seconds
+                ),
+                WebhookEvent.attempts: WebhookEvent.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+        return (
+            self.db.query(WebhookEvent)
+            .filter(
+                WebhookEvent.id.in_(candidate_ids),
+                WebhookEvent.status == "processing",
+                WebhookEvent.locked_by == worker_id,
+            )
+            .order_by(WebhookEvent.event_created, WebhookEvent.id)
+            .all()
+        )
+
+    async def process(self, inbox_id: int) -> None:
+        """
+        Process one claimed event and record the outcome.
+
+        The database work runs in a thread (see _process) so the event
+        loop serving requests is never blocked on it; the changes are
+        announced afterwards, on the loop.
+        """
+        changes = await asyncio.to_thread(self._process, inbox_id)
+        await announce_changes(changes)
+
+    def _process(self, inbox_id: int) -> Changes:
+        """
+        Apply one claimed event and record the outcome.
+
+        A processed_events row is added before the handler so its own
+        commit records it atomically with its changes. If another
+        worker got there first, the unique constraint rejects the commit
+        and the event is treated as a duplicate.
+
+        Failures are retried with exponential backoff until
+        max_attempts is reached, then left as "failed".
+
+        Returns:
+            The rows changed, to be announced once committed
+        """
+        inbox = self.db.query(WebhookEvent).filter(WebhookEvent.id == inbox_id).first()
+
+        if not inbox:
+            logger.warning("Webhook event not found", inbox_id=inbox_id)
+            return Changes()
+
+        event_id = inbox.event_id
+
+        if self._already_processed(event_id):
+            self._mark_processed(inbox, duplicate=True)
+            return Changes()
+
+        try:
+            event = stripe.Event.construct_from(json.loads(inbox.payload), stripe.api_key)
+            self.db.add(ProcessedEvent(event_id=event_id, event_type=inbox.event_type))
+            changes = self.apply(event)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            if isinstance(e, IntegrityError) and self._already_processed(event_id):
+                self._mark_processed(inbox, duplicate=True)
+            else:
+                self._record_failure(inbox, str(e))
+            return Changes()
+
+        processed_event_ids.add(event_id)
+        self._mark_processed(inbox)
+        return changes
+
+    async def drain(self, worker_id: str, batch_size: int = 100) -> int:
+        """
+        Process claimable events inline until none are left.
+
+        For processes that run without the webhook worker (CLI).
+        Events waiting on a retry backoff are left for the worker.
+
+        Returns:
+            Number of events processed
+        """
+        processed = 0
+        while True:
+            claimed = await asyncio.to_thread(
+                lambda: [e.id for e in self.claim_due(worker_id, batch_size)]
+            )
+            if not claimed:
+                return processed
+            for inbox_id in claimed:
+                await self.process(inbox_id)
+            processed += len(claimed)
+
+    async def dispatch(self, event: stripe.Event) -> None:
+        """Apply an event in a thread (see apply), then announce its changes."""
+        await announce_changes(await asyncio.to_thread(self.apply, event))
+
+    def apply(self, event: stripe.Event) -> Changes:
+        """
+        Run the handler for an event type.
+
+        Events handled:
+        - payment_intent.succeeded: Mark transaction as successful
+        - payment_intent.payment_failed: Mark transaction as failed
+        - checkout.session.completed: Payment link was paid
+        - charge.refunded: Mark transaction as refunded
+
+        Handlers receive the event's creation time so a late, older
+        event never overwrites a newer status.
+
+        Returns:
+            The rows changed, to be announced once committed
+        """
+        service = TransactionService(self.db)
+        created = event_created_at(event)
+
+        if event.type == "payment_intent.succeeded":
+            return service.apply_payment_success(event.data.object, created)
+
+        elif event.type == "payment_intent.payment_failed":
+            return service.apply_payment_failure(event.data.object, created)
+
+        elif event.type == "checkout.session.completed":
+            return service.apply_checkout_complete(event.data.object, created)
+
+        elif event.type == "charge.refunded":
+            return service.apply_refund(event.data.object, created)
+
+        logger.debug("Unhandled webhook event type", event_type=event.type)
+        return Changes()
+
+    def backlog(self) -> dict:
+        """
+        Summarize the inbox.
+
+        Returns:
+            Counts per status, the oldest unprocessed event and how far
+            behind processing is (seconds since it was received)
+        """
+        counts = dict(
+            self.db.query(WebhookEvent.status, func.count(WebhookEvent.id))
+            .group_by(WebhookEvent.status)
+            .all()
+        )
+
+        oldest = self.db.query(func.min(WebhookEvent.received_at)).filter(
+            WebhookEvent.status.in_(["pending", "processing"])
+        ).scalar()
+
+        return {
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "processed": counts.get("processed", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_pending_at": oldest,
+            "lag_seconds": (
+                (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+            ),
+        }
+
+    def sweep(self, retention_days: Optional[int] = None) -> dict:
+        """
+        Delete dedup records and processed inbox rows past retention.
+
+        Returns:
+            Number of rows deleted from each table
+        """
+        days = retention_days or settings.webhook_dedup_retention_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+
+        processed_events = self.db.query(ProcessedEvent).filter(
+            ProcessedEvent.processed_at < cutoff
+        ).delete(synchronize_session=False)
+
+        webhook_events = self.db.query(WebhookEvent).filter(
+            WebhookEvent.status == "processed",
+            WebhookEvent.processed_at < cutoff,
+        ).delete(synchronize_session=False)
+
+        self.db.commit()
+
+        logger.info(
+            "Webhook records swept",
+            retention_days=days,
+            processed_events=processed_events,
+            webhook_events=webhook_events,
+        )
+        return {
+            "processed_events": processed_events,
+            "webhook_events": webhook_events,
+        }
+
+    def _already_processed(self, event_id: str) -> bool:
+        """Check the LRU, then the processed_events table."""
+        if event_id in processed_event_ids:
+            return True
+        return self.db.query(ProcessedEvent.id).filter(
+            ProcessedEvent.event_id == event_id
+        ).first() is not None
+
+    def _mark_processed(self, inbox: WebhookEvent, duplicate: bool = False) -> None:
+        """Close out an inbox row."""
+        inbox.status = "processed"
+        inbox.processed_at = datetime.utcnow()
+        inbox.locked_by = None
+        inbox.locked_until = None
+        inbox.last_error = None
+        self.db.commit()
+
+        logger.info(
+            "Stripe webhook processed",
+            event_id=inbox.event_id,
+            event_type=inbox.event_type,
+            duplicate=duplicate,
+            lag_seconds=(inbox.processed_at - inbox.received_at).total_seconds(),
+        )
+
+    def _record_failure(self, inbox: WebhookEvent, error: str) -> None:
+        """Schedule a retry, or give up after max_attempts."""
+        inbox.last_error = error
+        inbox.locked_by = None
+        inbox.locked_until = None
+
+        if inbox.attempts >= inbox.max_attempts:
+            inbox.status = "failed"
+        else:
+            inbox.status = "pending"
+            inbox.next_attempt_at = datetime.utcnow() + self._backoff(inbox.attempts)
+
+        self.db.commit()
+
+        logger.error(
+            "Stripe webhook processing failed",
+            event_id=inbox.event_id,
+            event_type=inbox.event_type,
+            status=inbox.status,
+            attempts=inbox.attempts,
+            error=error,
+        )
+
+    def _backoff(self, attempts: int) -> timedelta:
+        """Exponential backoff: base * 2^(attempts - 1), capped."""
+        delay = settings.webhook_backoff_seconds * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, settings.webhook_backoff_max_seconds))
@@ -10,6 +10,8 @@ from app.utils.errors import (
     AuthenticationError,
     StripeError,
     SMSError,
+    ServiceUnavailableError,
+    RateLimitError,
 )
 from app.utils.logger import logger, setup_logging
 
@@ -21,6 +23,8 @@ __all__ = [
     "AuthenticationError",
     "StripeError",
     "SMSError",
+    "ServiceUnavailableError",
+    "RateLimitError",
     "logger",
     "setup_logging",
 ]
@@ -0,0 +1,127 @@
+"""
+In-Process Caching
+
+Small thread-safe caches for hot, cheap-to-rebuild values.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Dictionary cache whose entries expire after `ttl` seconds.
+    
+    Per-process only - each worker keeps its own copy, so entries can
+    be stale for up to `ttl` after a write made by another worker.
+    When `maxsize` is reached the oldest entry is evicted.
+    
+    Usage:
+        cache = TTLCache(ttl=30)
+        cache.set("key", value)
+        cache.get("key")  # value, or None once expired
+    """
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the oldest entry if full."""
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Dicts keep insertion order - first key is the oldest
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (expires_at, value)
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUSet:
+    """
+    Bounded set that forgets its least recently used members.
+    
+    A fast, per-process "seen before" check in front of a database
+    lookup. Absence proves nothing - only membership is authoritative.
+    
+    Usage:
+        seen = LRUSet(maxsize=10000)
+        seen.add("evt_123")
+        "evt_123" in seen  # True until evicted
+    """
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def add(self, key: Hashable) -> None:
+        """Add a member, evicting the least recently used if full."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return
+            if len(self._data) >= self.maxsize:
+                self._data.popitem(last=False)
+            self._data[key] = None
+    
+    def discard(self, key: Hashable) -> None:
+        """Remove a member if present."""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all members."""
+        with self._lock:
+            self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+    
+    def __len__(self) -> int:
+        return len(self._data)
@@ -144,3 +144,37 @@ class SMSError(POSException):
             status_code=502,
             details=details,
         )
+
+
+class ServiceUnavailableError(POSException):
+    """Service temporarily overloaded or unavailable."""
+    
+    def __init__(
+        self,
+        message: str = "Service temporarily unavailable",
+        code: str = "SERVICE_UNAVAILABLE",
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(
+            message=message,
+            code=code,
+            status_code=503,
+            details=details,
+        )
+
+
+class RateLimitError(POSException):
+    """Too many requests - client should back off."""
+    
+    def __init__(
+        self,
+        message: str = "Too many requests",
+        code: str = "RATE_LIMITED",
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(
+            message=message,
+            code=code,
+            status_code=429,
+            details=details,
+        )
@@ -0,0 +1,295 @@
+"""
+Application Metrics
+
+Process-local registry of named values read by the metrics endpoints,
+and Prometheus text rendering.
+"""
+
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple, Union
+
+
+class Histogram:
+    """
+    Counts observations into fixed, cumulative buckets.
+    
+    Usage:
+        waits = Histogram(buckets=(0.01, 0.1, 1))
+        waits.observe(0.05)
+        waits.snapshot()  # {"count": 1, "sum": 0.05, "buckets": {...}}
+    """
+    
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, sum, and observations <= each bound ("+Inf" for all)."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        
+        buckets = {}
+        running = 0
+        for bound, count in zip(self.bounds, counts):
+            running += count
+            buckets[str(bound)] = running
+        buckets["+Inf"] = running + counts[-1]
+        
+        return {"count": buckets["+Inf"], "sum": round(total, 6), "buckets": buckets}
+
+
+class HistogramFamily:
+    """
+    One Histogram per combination of label values (e.g. per route).
+    
+    Usage:
+        latency = HistogramFamily(("method", "route"))
+        latency.labels("GET", "/items/{id}").observe(0.012)
+        latency.snapshot()  # {"GET /items/{id}": {"count": 1, ...}}
+    """
+    
+    def __init__(
+        self,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+    ):
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values: str) -> Histogram:
+        # Lock only when a new label combination is first seen
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+    
+    def items(self) -> List[Tuple[Tuple[str, ...], Histogram]]:
+        with self._lock:
+            return list(self._children.items())
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Each child's snapshot, keyed by its space-joined label values."""
+        return {" ".join(values): child.snapshot() for values, child in self.items()}
+
+
+class CounterFamily:
+    """
+    Monotonic counts per combination of label values.
+    
+    Usage:
+        responses = CounterFamily(("route", "status"))
+        responses.inc("/items/{id}", "200")
+        responses.snapshot()  # {"/items/{id} 200": 1}
+    """
+    
+    def __init__(self, label_names: Sequence[str]):
+        self.label_names = tuple(label_names)
+        self._counts: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counts[values] = self._counts.get(values, 0) + amount
+    
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return list(self._counts.items())
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Counts keyed by their space-joined label values."""
+        return {" ".join(values): count for values, count in self.items()}
+
+
+class CallbackFamily:
+    """
+    Values per combination of label values, read from a callable when
+    metrics are collected - for gauges, or counts kept by another object.
+    
+    Usage:
+        sizes = CallbackFamily(("pool",), lambda: {("primary",): pool.size()})
+        sizes.snapshot()  # {"primary": 5}
+    """
+    
+    def __init__(
+        self,
+        label_names: Sequence[str],
+        fn: Callable[[], Dict[Tuple[str, ...], float]],
+    ):
+        self.label_names = tuple(label_names)
+        self.fn = fn
+    
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        return list(self.fn().items())
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Values keyed by their space-joined label values."""
+        return {" ".join(values): value for values, value in self.items()}
+
+
+# (name suffix, ((label, value), ...), value) - e.g. ("_bucket", (("le", "0.1"),), 3)
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+class MetricFamily(NamedTuple):
+    """One metric's type, help text and samples, ready for exposition."""
+    
+    name: str
+    kind: str  # "gauge", "counter" or "histogram"
+    help: str
+    samples: List[Sample]
+
+
+def _histogram_samples(
+    labels: Tuple[Tuple[str, str], ...],
+    snapshot: Dict[str, Any],
+) -> List[Sample]:
+    samples: List[Sample] = [
+        ("_bucket", labels + (("le", bound),), count)
+        for bound, count in snapshot["buckets"].items()
+    ]
+    samples.append(("_sum", labels, snapshot["sum"]))
+    samples.append(("_count", labels, snapshot["count"]))
+    return samples
+
+
+class MetricsRegistry:
+    """
+    Registry of metrics read on demand.
+    
+    Components register a callable per gauge, or the Histogram /
+    family objects they update; nothing else happens on the hot path -
+    values are read when metrics are collected. collect() gives JSON
+    values (histograms and families as their snapshot); families()
+    gives typed, labelled samples for Prometheus exposition.
+    
+    Usage:
+        metrics.register_gauge("cache_hit_rate", lambda: cache.hit_rate)
+        metrics.collect()  # {"cache_hit_rate": 0.97}
+    """
+    
+    def __init__(self):
+        # name -> (kind, help, callable or metric object)
+        self._entries: Dict[str, Tuple[str, str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, name: str, kind: str, source: Any, help: str) -> None:
+        with self._lock:
+            self._entries[name] = (kind, help, source)
+    
+    def register_gauge(
+        self,
+        name: str,
+        fn: Union[Callable[[], Any], CallbackFamily],
+        help: str = "",
+    ) -> None:
+        """Register (or replace) a gauge, or a labelled gauge family."""
+        self._register(name, "gauge", fn, help)
+    
+    def register_histogram(
+        self,
+        name: str,
+        histogram: Union[Histogram, HistogramFamily],
+        help: str = "",
+    ) -> None:
+        """Register (or replace) a histogram or histogram family."""
+        self._register(name, "histogram", histogram, help)
+    
+    def register_counter(
+        self,
+        name: str,
+        counter: Union[CounterFamily, CallbackFamily],
+        help: str = "",
+    ) -> None:
+        """Register (or replace) a counter family."""
+        self._register(name, "counter", counter, help)
+    
+    def _entries_list(self) -> List[Tuple[str, Tuple[str, str, Any]]]:
+        with self._lock:
+            return list(self._entries.items())
+    
+    def collect(self) -> Dict[str, Any]:
+        """Read every metric. A failing gauge is skipped."""
+        values = {}
+        for name, (kind, _, source) in self._entries_list():
+            try:
+                values[name] = source.snapshot() if hasattr(source, "snapshot") else source()
+            except Exception:
+                continue
+        return values
+    
+    def families(self) -> List[MetricFamily]:
+        """
+        Every metric as a MetricFamily. Gauges that fail or read a
+        non-numeric value are skipped.
+        """
+        families = []
+        for name, (kind, help, source) in self._entries_list():
+            if kind == "gauge" and isinstance(source, CallbackFamily):
+                try:
+                    items = source.items()
+                except Exception:
+                    continue
+                samples = [
+                    ("", tuple(zip(source.label_names, values)), float(value))
+                    for values, value in items
+                ]
+            elif kind == "gauge":
+                try:
+                    value = source()
+                except Exception:
+                    continue
+                if not isinstance(value, (int, float)):
+                    continue
+                samples = [("", (), float(value))]
+            elif kind == "counter":
+                samples = [
+                    ("", tuple(zip(source.label_names, values)), count)
+                    for values, count in source.items()
+                ]
+            elif isinstance(source, HistogramFamily):
+                samples = []
+                for values, child in source.items():
+                    labels = tuple(zip(source.label_names, values))
+                    samples.extend(_histogram_samples(labels, child.snapshot()))
+            else:
+                samples = _histogram_samples((), source.snapshot())
+            families.append(MetricFamily(name, kind, help, samples))
+        return families
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(families: List[MetricFamily]) -> str:
+    """Render families in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for family in families:
+        if family.help:
+            help = family.help.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {family.name} {help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for suffix, labels, value in family.samples:
+            label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+            name = family.name + suffix
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Shared registry - one per application process
+metrics = MetricsRegistry()
@@ -0,0 +1,41 @@
+"""
+Pagination Helpers
+
+Opaque cursors for keyset (seek) pagination.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from app.utils.errors import ValidationError
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a (created_at, id) position as an opaque cursor.
+    
+    Clients should treat the value as a token and pass it back unchanged.
+    """
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValidationError(
+            message="Invalid pagination cursor",
+            code="INVALID_CURSOR",
+            details={"error": str(e)},
+        )
@@ -0,0 +1,155 @@
+"""
+Connection Pool Monitoring
+
+Tracks checkouts, checkout wait time and timeouts for SQLAlchemy
+connection pools, and publishes them through the metrics registry.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.utils.metrics import CallbackFamily, HistogramFamily, metrics
+
+
+pool_wait = HistogramFamily(("pool",))
+
+
+class PoolMonitor:
+    """
+    Counters for one engine's pool.
+
+    Checkouts, checkins and new connections come from the pool events;
+    wait times and timeouts are reported by the Monitored*QueuePool
+    classes, which look their monitor up by the pool's logging name.
+
+    Usage:
+        engine = create_engine(url, poolclass=MonitoredQueuePool,
+                               pool_logging_name="primary")
+        PoolMonitor("primary").attach(engine)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait = pool_wait.labels(name)
+        self._lock = threading.Lock()
+
+    @property
+    def checked_out(self) -> int:
+        """Connections currently held by sessions."""
+        return self.checkouts - self.checkins
+
+    @property
+    def overflow(self) -> int:
+        """Connections open beyond pool_size (QueuePool only)."""
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is None or not hasattr(pool, "overflow"):
+            return 0
+        return max(pool.overflow(), 0)
+
+    def attach(self, engine: Engine) -> "PoolMonitor":
+        """Listen to the engine's pool events; its metrics carry pool=<name>."""
+        self.engine = engine
+        pool_monitors[self.name] = self
+
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "connect", self._on_connect)
+        return self
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait.observe(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+
+# Monitors by pool logging name
+pool_monitors: Dict[str, PoolMonitor] = {}
+
+
+def _by_pool(read: Callable[[PoolMonitor], int]) -> CallbackFamily:
+    """One value per monitored pool, labelled with its name."""
+    return CallbackFamily(
+        ("pool",),
+        lambda: {(name,): read(monitor) for name, monitor in list(pool_monitors.items())},
+    )
+
+
+metrics.register_gauge(
+    "db_pool_checked_out",
+    _by_pool(lambda monitor: monitor.checked_out),
+    "Connections currently checked out, by pool",
+)
+metrics.register_gauge(
+    "db_pool_overflow",
+    _by_pool(lambda monitor: monitor.overflow),
+    "Connections open beyond pool_size, by pool",
+)
+metrics.register_counter(
+    "db_pool_checkouts_total",
+    _by_pool(lambda monitor: monitor.checkouts),
+    "Connections checked out, by pool",
+)
+metrics.register_counter(
+    "db_pool_connects_total",
+    _by_pool(lambda monitor: monitor.connects),
+    "New database connections opened, by pool",
+)
+metrics.register_counter(
+    "db_pool_timeouts_total",
+    _by_pool(lambda monitor: monitor.timeouts),
+    "Checkouts that gave up after pool_timeout, by pool",
+)
+metrics.register_histogram(
+    "db_pool_wait_seconds",
+    pool_wait,
+    "Time spent waiting for a connection, by pool",
+)
+
+
+class _TimedCheckout:
+    """Times Pool.connect(), which blocks while the pool is exhausted."""
+
+    def connect(self):
+        monitor = pool_monitors.get(getattr(self, "logging_name", None))
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if monitor is not None:
+                monitor.record_timeout()
+            raise
+        if monitor is not None:
+            monitor.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class MonitoredQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool reporting checkout wait time and timeouts."""
+
+
+class MonitoredAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool reporting checkout wait time and timeouts."""
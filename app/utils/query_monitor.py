@@ -0,0 +1,93 @@
+"""
+Query Monitoring
+
+Counts and times every SQL statement executed through SQLAlchemy, by
+pool and statement type, and publishes them through the metrics
+registry.
+"""
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import CounterFamily, HistogramFamily, metrics
+
+
+STATEMENT_TYPES = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+def statement_type(statement: str) -> str:
+    """SELECT / INSERT / UPDATE / DELETE, or OTHER (DDL, PRAGMA, ...)."""
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in STATEMENT_TYPES else "OTHER"
+
+
+def pool_name(conn: Any) -> str:
+    """Pool logging name of a connection's engine ("default" if unnamed)."""
+    return getattr(conn.engine.pool, "logging_name", None) or "default"
+
+
+class QueryMonitor:
+    """
+    Statement latency and error counts for every engine.
+
+    Listens on the Engine class, so engines created later (replicas,
+    the async engine's sync core, test engines) are covered too. The
+    start time rides on the statement's execution context, so nothing
+    is shared between concurrent statements. Counts are the _count
+    series of the latency histogram.
+
+    Usage:
+        QueryMonitor().attach()
+    """
+
+    def __init__(self):
+        self.latency = HistogramFamily(("pool", "statement"))
+        self.errors = CounterFamily(("pool", "statement"))
+        self._attached = False
+
+    def attach(self) -> "QueryMonitor":
+        """Listen to statement events on all engines and register the metrics."""
+        if self._attached:
+            return self
+        self._attached = True
+
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+        event.listen(Engine, "handle_error", self._on_error)
+
+        metrics.register_histogram(
+            "db_query_duration_seconds",
+            self.latency,
+            "SQL statement execution time by pool and statement type",
+        )
+        metrics.register_counter(
+            "db_query_errors_total",
+            self.errors,
+            "SQL statements that raised, by pool and statement type",
+        )
+        return self
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        self.latency.labels(pool_name(conn), statement_type(statement)).observe(
+            time.perf_counter() - started
+        )
+
+    def _on_error(self, exception_context) -> None:
+        conn = exception_context.connection
+        if conn is None or exception_context.statement is None:
+            return
+        self.errors.inc(pool_name(conn), statement_type(exception_context.statement))
+
+
+# Shared monitor - attached once by app.database
+query_monitor = QueryMonitor()
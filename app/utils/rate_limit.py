@@ -0,0 +1,103 @@
+"""
+Rate Limiting
+
+Async token bucket for staying inside third-party API budgets, and a
+failure throttle for locking out repeated bad attempts.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Allows `rate` operations per second with bursts up to `capacity`.
+    
+    Usage:
+        bucket = TokenBucket(rate=20)
+        await bucket.acquire()  # waits until a token is available
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FailureThrottle:
+    """
+    Locks a key out after too many failures in a sliding window.
+    
+    Per-process only. Checking is a dictionary lookup, so rejected
+    attempts cost nothing else (e.g. no password hash).
+    
+    Usage:
+        throttle = FailureThrottle(max_failures=5, window=300, lockout=300)
+        throttle.retry_after("user:alice")  # seconds locked, or 0
+        throttle.record_failure("user:alice")
+        throttle.reset("user:alice")  # after a success
+    """
+    
+    def __init__(
+        self,
+        max_failures: int,
+        window: float,
+        lockout: float,
+        maxsize: int = 100000,
+    ):
+        self.max_failures = max_failures
+        self.window = window
+        self.lockout = lockout
+        self.maxsize = maxsize
+        # key -> (failures, window_start, locked_until)
+        self._state: Dict[Hashable, Tuple[int, float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def retry_after(self, key: Hashable) -> float:
+        """Seconds until `key` may try again (0 if not locked out)."""
+        state = self._state.get(key)
+        if state is None:
+            return 0.0
+        return max(0.0, state[2] - time.monotonic())
+    
+    def record_failure(self, key: Hashable) -> None:
+        """Count a failure, starting a lockout once the limit is reached."""
+        now = time.monotonic()
+        with self._lock:
+            failures, started, locked_until = self._state.get(key, (0, now, 0.0))
+            if now - started > self.window:
+                failures, started = 0, now
+            failures += 1
+            if failures >= self.max_failures:
+                locked_until = now + self.lockout
+            
+            if key not in self._state and len(self._state) >= self.maxsize:
+                # Dicts keep insertion order - first key is the oldest
+                self._state.pop(next(iter(self._state)))
+            self._state[key] = (failures, started, locked_until)
+    
+    def reset(self, key: Hashable) -> None:
+        """Forget failures for `key`."""
+        with self._lock:
+            self._state.pop(key, None)
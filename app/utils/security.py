@@ -4,12 +4,19 @@ Security Helpers
 Utility functions for security-related operations.
 """
 
+import asyncio
 import secrets
 import hashlib
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
 
 from passlib.context import CryptContext
 
+from app.config import settings
+from app.utils.errors import ServiceUnavailableError
+
+
+T = TypeVar("T")
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
@@ -31,6 +38,71 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    """
+    Runs password hashing off the event loop on a bounded thread pool.
+    
+    pbkdf2 is deliberately slow (and releases the GIL while it runs),
+    so a dedicated pool keeps a login burst from stalling other
+    requests. Beyond `max_queue` queued or running hashes, callers get
+    a 503 instead of waiting in an unbounded queue.
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.workers = workers or settings.password_hash_workers
+        self.max_queue = max_queue or settings.password_hash_max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+    
+    @property
+    def queue_depth(self) -> int:
+        """Hashes queued or running."""
+        return self._in_flight
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password on the pool."""
+        return await self._run(hash_password, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the pool."""
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    def shutdown(self) -> None:
+        """Stop the pool threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._in_flight >= self.max_queue:
+            raise ServiceUnavailableError(
+                message="Authentication is busy, please retry",
+                code="AUTH_BUSY",
+                details={"queue_depth": self._in_flight},
+            )
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash",
+            )
+        
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+
+# Shared hasher - one pool per application process
+password_hasher = PasswordHasher()
+
+
 def generate_token(length: int = 32) -> str:
     """
     Generate a secure random token.
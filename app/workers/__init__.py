@@ -0,0 +1,21 @@
+"""
+Background Workers
+
+Long-running tasks started and stopped with the application.
+"""
+
+from app.workers.sms_worker import SMSOutboxWorker, sms_outbox_worker
+from app.workers.pdf_renderer import PDFRenderer, pdf_renderer
+from app.workers.webhook_worker import WebhookWorker, webhook_worker
+from app.workers.reconciler import Reconciler, reconciler
+
+__all__ = [
+    "SMSOutboxWorker",
+    "sms_outbox_worker",
+    "PDFRenderer",
+    "pdf_renderer",
+    "WebhookWorker",
+    "webhook_worker",
+    "Reconciler",
+    "reconciler",
+]
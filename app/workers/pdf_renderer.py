@@ -0,0 +1,263 @@
+"""
+PDF Receipt Renderer
+
+Renders receipt PDFs in a bounded pool of worker processes.
+ReportLab rendering is CPU-bound, so it must not run on the event loop.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.utils import logger, ServiceUnavailableError
+from app.utils.metrics import metrics
+
+
+# Worker Process State
+#
+# Built once per worker process by _init_worker, then reused for every
+# render so ReportLab imports and stylesheet construction are not
+# repeated per receipt.
+
+_styles: Optional[Dict[str, Any]] = None
+
+
+def _init_worker() -> None:
+    """Load ReportLab and build paragraph styles (runs once per process)."""
+    global _styles
+
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    import reportlab.platypus  # noqa - preload layout engine
+
+    styles = getSampleStyleSheet()
+
+    _styles = {
+        "normal": styles["Normal"],
+        "title": ParagraphStyle(
+            "TitleStyle",
+            parent=styles["Heading1"],
+            fontSize=16,
+            alignment=1,  # Center
+            spaceAfter=12,
+        ),
+        "body": ParagraphStyle(
+            "BodyStyle",
+            parent=styles["Normal"],
+            fontSize=9,
+            alignment=1,
+            spaceAfter=6,
+        ),
+    }
+
+
+def _ping() -> int:
+    """No-op task used to spawn and warm worker processes."""
+    return os.getpid()
+
+
+def render_receipt_pdf(data: Dict[str, Any], filepath: str) -> str:
+    """
+    Build a receipt PDF (runs inside a worker process).
+
+    Args:
+        data: Plain receipt fields (receipt_number, date, description,
+            amount_display, card_brand, card_last4)
+        filepath: Where to write the PDF
+
+    Returns:
+        The path written
+    """
+    if _styles is None:
+        _init_worker()
+
+    from reportlab.lib.pagesizes import A6
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+
+    # Create PDF document (A6 is common for thermal-style receipts)
+    doc = SimpleDocTemplate(
+        filepath,
+        pagesize=A6,
+        rightMargin=10*mm,
+        leftMargin=10*mm,
+        topMargin=10*mm,
+        bottomMargin=10*mm
+    )
+
+    normal_style = _styles["normal"]
+    title_style = _styles["title"]
+    body_style = _styles["body"]
+    elements = []
+
+    # Header - Business Info
+    elements.append(Paragraph("<b>POS SYSTEM</b>", title_style))
+    elements.append(Paragraph("123 Business Street, Tech City", body_style))
+    elements.append(Paragraph("Tel: +254 700 000 000", body_style))
+    elements.append(Spacer(1, 5*mm))
+
+    # Receipt Details
+    elements.append(Paragraph(f"Receipt: {data['receipt_number']}", normal_style))
+    elements.append(Paragraph(f"Date: {data['date']}", normal_style))
+    elements.append(Spacer(1, 5*mm))
+
+    # Line Items (Summary for POS)
+    amount_display = data["amount_display"]
+    table_data = [
+        ['Description', 'Amount'],
+        [data.get("description") or 'Payment', amount_display],
+        ['', ''],
+        ['<b>TOTAL</b>', f"<b>{amount_display}</b>"]
+    ]
+
+    t = Table(table_data, colWidths=[55*mm, 20*mm])
+    t.setStyle(TableStyle([
+        ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    elements.append(t)
+    elements.append(Spacer(1, 10*mm))
+
+    # Payment Info
+    card_brand = data.get("card_brand")
+    card_last4 = data.get("card_last4")
+    pay_info = f"Paid via {card_brand.capitalize() if card_brand else 'Card'} ****{card_last4}" if card_last4 else "Paid via Card"
+    elements.append(Paragraph(pay_info, normal_style))
+    elements.append(Spacer(1, 10*mm))
+
+    # Footer
+    elements.append(Paragraph("<b>Thank you for your business!</b>", body_style))
+
+    # Build PDF
+    doc.build(elements)
+
+    return filepath
+
+
+class PDFRenderer:
+    """
+    Bounded process pool for receipt rendering.
+
+    Callers await render_receipt(); the render runs in a warm worker
+    process. At most `max_queue` renders may be queued or running -
+    beyond that, requests are rejected with a 503 so a print burst
+    cannot pile up unbounded work.
+
+    If a worker process dies (killed by the OOM killer, a crash in
+    ReportLab), the executor is broken for good: it is replaced and the
+    render retried once.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.workers = workers or settings.pdf_render_workers
+        self.max_queue = max_queue or settings.pdf_render_max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Renders queued or running."""
+        return self._in_flight
+
+    async def start(self) -> None:
+        """Create the pool and warm every worker process."""
+        if self._executor is not None:
+            return
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+        )
+
+        # The first submit launches the worker processes and runs
+        # _init_worker in each, so the first real render is not cold
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _ping)
+            for _ in range(self.workers)
+        ])
+
+        logger.info("PDF renderer started", workers=self.workers)
+
+    async def stop(self) -> None:
+        """Shut down the pool, cancelling queued renders."""
+        if self._executor is None:
+            return
+
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+        logger.info("PDF renderer stopped")
+
+    async def render_receipt(self, data: Dict[str, Any], filepath: str) -> str:
+        """
+        Render a receipt PDF in the pool.
+
+        Raises:
+            ServiceUnavailableError: If the render queue is full, or
+                the pool broke again after being replaced
+        """
+        if self._in_flight >= self.max_queue:
+            logger.warning("PDF render queue full", queue_depth=self._in_flight)
+            raise ServiceUnavailableError(
+                message="Receipt printing is busy, please retry",
+                code="RENDER_QUEUE_FULL",
+                details={"queue_depth": self._in_flight},
+            )
+
+        self._in_flight += 1
+        try:
+            for attempt in range(2):
+                try:
+                    return await self._render(data, filepath)
+                except BrokenProcessPool:
+                    logger.warning("PDF render pool broken, restarting", attempt=attempt + 1)
+            raise ServiceUnavailableError(
+                message="Receipt printing failed, please retry",
+                code="RENDER_POOL_BROKEN",
+            )
+        finally:
+            self._in_flight -= 1
+
+    async def _render(self, data: Dict[str, Any], filepath: str) -> str:
+        """Run one render, discarding the pool if it turns out broken."""
+        if self._executor is None:
+            await self.start()
+
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor,
+                render_receipt_pdf,
+                data,
+                filepath,
+            )
+        except BrokenProcessPool:
+            # Concurrent renders fail together; only the first replaces it
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+# Shared renderer - one pool per application process
+pdf_renderer = PDFRenderer()
+
+metrics.register_gauge(
+    "pdf_render_queue_depth",
+    lambda: pdf_renderer.queue_depth,
+    "Receipt renders queued or running",
+)
@@ -0,0 +1,71 @@
+"""
+Reconciler
+
+Scheduled re-sync of stale pending transactions with Stripe.
+"""
+
+import asyncio
+from typing import Optional
+
+from app.config import settings
+from app.database import WorkerSessionLocal
+from app.services.reconciliation_service import ReconciliationService
+from app.utils import logger
+
+
+class Reconciler:
+    """
+    Runs ReconciliationService every `interval` seconds.
+
+    Every API process runs a reconciler, but each tick first claims the
+    run through the database, so only one process reconciles per
+    interval. The run's session comes from WorkerSessionLocal, since its
+    database work runs in threads.
+    """
+
+    def __init__(self, interval: Optional[int] = None):
+        self.interval = interval or settings.reconcile_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start the schedule."""
+        if self.running:
+            return
+        if WorkerSessionLocal is None:
+            logger.warning("Reconciler not started: in-memory database")
+            return
+
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Reconciler started", interval=self.interval)
+
+    async def stop(self) -> None:
+        """Stop the schedule, cancelling a run in progress."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        logger.info("Reconciler stopped")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            db = WorkerSessionLocal()
+            try:
+                service = ReconciliationService(db)
+                if await asyncio.to_thread(service.claim_run, self.interval):
+                    await service.reconcile()
+            except Exception as e:
+                logger.error("Reconciliation run failed", error=str(e))
+            finally:
+                db.close()
+
+
+# Shared reconciler - one per application process
+reconciler = Reconciler()
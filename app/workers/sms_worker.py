@@ -0,0 +1,181 @@
+"""
+SMS Outbox Worker
+
+Background worker pool that drains the SMS outbox.
+"""
+
+import asyncio
+import os
+import socket
+from typing import List, Optional
+
+from app.config import settings
+from app.database import WorkerSessionLocal
+from app.services.payment_link_service import payment_links_changed
+from app.services.sms_outbox_service import SMSOutboxService
+from app.services.sms_service import SMSService
+from app.utils import logger
+from app.utils.metrics import metrics
+
+
+class SMSOutboxWorker:
+    """
+    Drains the SMS outbox in the background.
+
+    One dispatcher task claims due messages in batches and hands them
+    to a pool of sender tasks. The dispatcher sleeps until the poll
+    interval elapses or notify() is called by a fresh enqueue.
+
+    The tasks share the API's event loop, so their (synchronous)
+    database work runs in threads via asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.concurrency = concurrency or settings.sms_outbox_workers
+        self.batch_size = batch_size or settings.sms_outbox_batch_size
+        self.poll_interval = poll_interval or settings.sms_outbox_poll_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.sms_service: Optional[SMSService] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages claimed by this process but not yet sent."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Start the dispatcher and sender tasks."""
+        if self.running:
+            return
+        if WorkerSessionLocal is None:
+            logger.warning("SMS outbox worker not started: in-memory database")
+            return
+
+        self.sms_service = SMSService()
+        self._queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._dispatch_loop())]
+        self._tasks += [
+            asyncio.create_task(self._send_loop())
+            for _ in range(self.concurrency)
+        ]
+
+        logger.info(
+            "SMS outbox worker started",
+            worker_id=self.worker_id,
+            concurrency=self.concurrency,
+        )
+
+    async def stop(self) -> None:
+        """Stop all tasks. Claimed but unsent messages are retried after their lease."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._wakeup = None
+
+        logger.info("SMS outbox worker stopped", worker_id=self.worker_id)
+
+    def notify(self) -> None:
+        """Wake the dispatcher (called after a message is queued)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _dispatch_loop(self) -> None:
+        """Claim due messages and feed them to the senders."""
+        while True:
+            self._wakeup.clear()
+
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error("SMS outbox claim failed", error=str(e))
+                claimed = []
+
+            for message in claimed:
+                await self._queue.put(message)
+
+            # A full batch means more may be due - claim again right away
+            if len(claimed) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _claim(self) -> list:
+        """Claim a batch in a short-lived session."""
+        db = WorkerSessionLocal()
+        try:
+            messages = SMSOutboxService(db).claim_due(self.worker_id, self.batch_size)
+            return [
+                (m.id, m.phone, m.message, m.sender_id)
+                for m in messages
+            ]
+        finally:
+            db.close()
+
+    async def _send_loop(self) -> None:
+        """Send claimed messages one at a time."""
+        while True:
+            outbox_id, phone, message, sender_id = await self._queue.get()
+            try:
+                await self._deliver(outbox_id, phone, message, sender_id)
+            except Exception as e:
+                logger.error(
+                    "SMS outbox delivery error",
+                    outbox_id=outbox_id,
+                    error=str(e),
+                )
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(
+        self,
+        outbox_id: int,
+        phone: str,
+        message: str,
+        sender_id: Optional[str],
+    ) -> None:
+        """Send one message and record the result."""
+        result = await self.sms_service.send_sms(
+            phone=phone,
+            message=message,
+            sender_id=sender_id,
+        )
+
+        payment_link_id = await asyncio.to_thread(self._record, outbox_id, result)
+
+        # sms_sent is part of the cached payment link
+        if payment_link_id:
+            await payment_links_changed([payment_link_id])
+
+    def _record(self, outbox_id: int, result: dict) -> Optional[int]:
+        """Record a send result in a short-lived session; returns its payment link id."""
+        db = WorkerSessionLocal()
+        try:
+            outbox = SMSOutboxService(db).record_result(outbox_id, result)
+            return outbox.payment_link_id if outbox else None
+        finally:
+            db.close()
+
+
+# Shared worker - one per application process
+sms_outbox_worker = SMSOutboxWorker()
+
+metrics.register_gauge(
+    "sms_outbox_worker_queue_depth",
+    lambda: sms_outbox_worker.queue_depth,
+    "Claimed SMS messages waiting for a sender",
+)
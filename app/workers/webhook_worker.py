@@ -0,0 +1,176 @@
+"""
+Webhook Worker
+
+Background worker pool that processes the Stripe webhook inbox.
+"""
+
+import asyncio
+import os
+import socket
+from typing import List, Optional
+
+from app.config import settings
+from app.database import WorkerSessionLocal
+from app.services.webhook_service import WebhookService
+from app.utils import logger
+from app.utils.metrics import metrics
+
+
+class WebhookWorker:
+    """
+    Processes inbox events in the background.
+
+    One dispatcher task claims pending events in batches and hands them
+    to a pool of processor tasks. A batch holds at most one event per
+    payment intent (see WebhookService.claim_due), so processors never
+    race on a transaction, and every API process can run a worker.
+
+    The dispatcher sleeps until the poll interval elapses or notify()
+    is called by a fresh delivery. A sweep task periodically deletes
+    dedup records past retention.
+
+    The tasks share the API's event loop, so their (synchronous)
+    database work runs in threads via asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.concurrency = concurrency or settings.webhook_workers
+        self.batch_size = batch_size or settings.webhook_batch_size
+        self.poll_interval = poll_interval or settings.webhook_poll_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        """Events claimed by this process but not yet processed."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Start the dispatcher and processor tasks."""
+        if self.running:
+            return
+        if WorkerSessionLocal is None:
+            logger.warning("Webhook worker not started: in-memory database")
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._dispatch_loop()),
+            asyncio.create_task(self._sweep_loop()),
+        ]
+        self._tasks += [
+            asyncio.create_task(self._process_loop())
+            for _ in range(self.concurrency)
+        ]
+
+        logger.info(
+            "Webhook worker started",
+            worker_id=self.worker_id,
+            concurrency=self.concurrency,
+        )
+
+    async def stop(self) -> None:
+        """Stop all tasks. Claimed but unprocessed events are retried after their lease."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._wakeup = None
+        self._loop = None
+
+        logger.info("Webhook worker stopped", worker_id=self.worker_id)
+
+    def notify(self) -> None:
+        """Wake the dispatcher (called after an event is stored, from any thread)."""
+        wakeup, loop = self._wakeup, self._loop
+        if wakeup is not None and loop is not None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _dispatch_loop(self) -> None:
+        """Claim pending events and feed them to the processors."""
+        while True:
+            self._wakeup.clear()
+
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error("Webhook claim failed", error=str(e))
+                claimed = []
+
+            for inbox_id in claimed:
+                await self._queue.put(inbox_id)
+
+            # A full batch means more may be due - claim again right away
+            if len(claimed) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _claim(self) -> List[int]:
+        """Claim a batch in a short-lived session."""
+        db = WorkerSessionLocal()
+        try:
+            events = WebhookService(db).claim_due(self.worker_id, self.batch_size)
+            return [e.id for e in events]
+        finally:
+            db.close()
+
+    def _sweep(self) -> None:
+        """Sweep in a short-lived session."""
+        db = WorkerSessionLocal()
+        try:
+            WebhookService(db).sweep()
+        finally:
+            db.close()
+
+    async def _sweep_loop(self) -> None:
+        """Delete old dedup records and processed inbox rows."""
+        while True:
+            await asyncio.sleep(settings.webhook_sweep_interval_seconds)
+            try:
+                await asyncio.to_thread(self._sweep)
+            except Exception as e:
+                logger.error("Webhook sweep failed", error=str(e))
+
+    async def _process_loop(self) -> None:
+        """Process claimed events one at a time."""
+        while True:
+            inbox_id = await self._queue.get()
+            db = WorkerSessionLocal()
+            try:
+                await WebhookService(db).process(inbox_id)
+            except Exception as e:
+                logger.error(
+                    "Webhook processing error",
+                    inbox_id=inbox_id,
+                    error=str(e),
+                )
+            finally:
+                db.close()
+                self._queue.task_done()
+
+
+# Shared worker - one per application process
+webhook_worker = WebhookWorker()
+
+metrics.register_gauge(
+    "webhook_worker_queue_depth",
+    lambda: webhook_worker.queue_depth,
+    "Claimed webhook events waiting for a processor",
+)
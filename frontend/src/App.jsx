@@ -39,9 +39,6 @@ function App() {
     try {
       const healthData = await api.checkHealth()
       setHealth(healthData)
-
-      const txData = await api.listTransactions()
-      setTransactions(txData.data || [])
     } catch (err) {
       console.error('Failed to fetch data:', err)
       if (err === 'Unauthorized') setIsAuthenticated(false);
@@ -54,6 +51,21 @@ function App() {
     fetchData()
   }, [isAuthenticated])
 
+  // Transactions arrive over the live feed: one snapshot, then deltas
+  useEffect(() => {
+    if (!isAuthenticated) return;
+    return api.subscribeTransactions({
+      onSnapshot: (txs) => {
+        setTransactions(txs)
+        setLoading(false)
+      },
+      onTransaction: (tx) => {
+        setTransactions(current => [tx, ...current.filter(t => t.id !== tx.id)]
+          .sort((a, b) => new Date(b.created_at) - new Date(a.created_at)))
+      },
+    })
+  }, [isAuthenticated])
+
   const handleLogout = () => {
     localStorage.removeItem('pos_token')
     setIsAuthenticated(false)
@@ -61,6 +61,72 @@ export const api = {
         return handleResponse(res);
     },
 
+    /**
+     * Live transaction feed (server-sent events).
+     *
+     * Calls onSnapshot(transactions) on connect and onTransaction(tx) for
+     * every created or changed transaction. Reconnects with the last event
+     * id, so only the changes missed meanwhile are sent. Uses fetch rather
+     * than EventSource, which cannot send the Authorization header.
+     * Returns a function that closes the feed.
+     */
+    subscribeTransactions({ onSnapshot, onTransaction, limit = 20 }) {
+        const controller = new AbortController();
+        let lastEventId = null;
+        let retryMs = 3000;
+
+        const dispatch = (block) => {
+            let event = 'message';
+            let data = '';
+            for (const line of block.split('\n')) {
+                const [field, ...rest] = line.split(': ');
+                const value = rest.join(': ');
+                if (field === 'id') lastEventId = value;
+                else if (field === 'event') event = value;
+                else if (field === 'data') data += value;
+                else if (field === 'retry') retryMs = Number(value) || retryMs;
+            }
+            if (!data) return;
+            const payload = JSON.parse(data);
+            if (event === 'snapshot') onSnapshot(payload.transactions);
+            else if (event === 'transaction') onTransaction(payload);
+        };
+
+        const connect = async () => {
+            while (!controller.signal.aborted) {
+                try {
+                    const headers = getHeaders();
+                    if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+                    const res = await fetch(`${API_BASE}/api/v1/transactions/feed?limit=${limit}`, {
+                        headers,
+                        signal: controller.signal,
+                    });
+                    if (!res.ok) {
+                        await handleResponse(res);
+                    }
+
+                    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+                    let buffer = '';
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += value;
+                        const blocks = buffer.split('\n\n');
+                        buffer = blocks.pop();
+                        blocks.forEach(dispatch);
+                    }
+                } catch (err) {
+                    if (controller.signal.aborted) return;
+                    console.error('Transaction feed disconnected:', err);
+                }
+                await new Promise(resolve => setTimeout(resolve, retryMs));
+            }
+        };
+
+        connect();
+        return () => controller.abort();
+    },
+
     async createPayment(paymentData) {
         const res = await fetch(`${API_BASE}/api/v1/transactions/pay`, {
             method: 'POST',
@@ -77,6 +143,14 @@ export const api = {
         return handleResponse(res);
     },
 
+    // Resolves when the status leaves `status` or the server-side wait times out
+    async waitForTransaction(id, status = 'pending', timeout = 25) {
+        const res = await fetch(`${API_BASE}/api/v1/transactions/${id}/wait?status=${status}&timeout=${timeout}`, {
+            headers: getHeaders()
+        });
+        return handleResponse(res);
+    },
+
     async refundTransaction(id, amount, reason) {
         const res = await fetch(`${API_BASE}/api/v1/transactions/${id}/refund`, {
             method: 'POST',
@@ -103,6 +177,14 @@ export const api = {
         return handleResponse(res);
     },
 
+    // Resolves when the link is paid or the server-side wait times out
+    async waitForPaymentLink(id, timeout = 25) {
+        const res = await fetch(`${API_BASE}/api/v1/payment-links/${id}/wait?timeout=${timeout}`, {
+            headers: getHeaders()
+        });
+        return handleResponse(res);
+    },
+
     // --- Receipts ---
     async generateReceipt(receiptData) {
         const res = await fetch(`${API_BASE}/api/v1/receipts`, {
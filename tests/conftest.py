@@ -2,6 +2,23 @@
 Test configuration and fixtures.
 """
 
+import atexit
+import os
+import shutil
+import tempfile
+
+# Caches use their in-process fallback during tests
+os.environ.setdefault("REDIS_ENABLED", "false")
+
+# The app's own engine (used when TestClient runs the lifespan) points
+# at a throwaway database, never ./pos.db; background workers stay off
+_database_dir = tempfile.mkdtemp(prefix="pos-tests-")
+atexit.register(shutil.rmtree, _database_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'pos.db')}"
+os.environ["SMS_OUTBOX_WORKERS"] = "0"
+os.environ["WEBHOOK_WORKERS"] = "0"
+os.environ["RECONCILE_INTERVAL_SECONDS"] = "0"
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -10,6 +27,7 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base, get_db
+from app.services.lookup_cache import payment_link_cache, transaction_cache
 
 
 # Create test database (in-memory SQLite)
@@ -39,6 +57,8 @@ def db():
         db.close()
         # Drop all tables after test
         Base.metadata.drop_all(bind=engine)
+        transaction_cache.local.clear()
+        payment_link_cache.local.clear()
 
 
 @pytest.fixture(scope="function")
@@ -58,3 +78,23 @@ def client(db):
         yield test_client
     
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def auth_headers(db):
+    """
+    Create an admin user and return Bearer auth headers for it.
+    """
+    from app.models.user import User
+    from app.services.auth_service import AuthService
+    
+    user = User(
+        username="admin",
+        email="admin@example.com",
+        hashed_password="not-used",
+    )
+    db.add(user)
+    db.commit()
+    
+    token = AuthService(db).create_access_token(data={"sub": user.username})
+    return {"Authorization": f"Bearer {token}"}
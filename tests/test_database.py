@@ -0,0 +1,179 @@
+"""
+Tests for request session handling.
+"""
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app import database
+from app.database import Base, ReplicaSet, RoutingSession, run_db, run_db_read
+from app.models.transaction import Transaction
+from app.services.transaction_service import TransactionService
+from app.utils.metrics import metrics
+from app.utils.pool_monitor import MonitoredQueuePool, PoolMonitor
+
+
+@pytest.mark.asyncio
+async def test_run_db_with_async_session():
+    """Service code runs unchanged on an AsyncSession through run_db."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            items, total, _ = await run_db(
+                db, lambda s: TransactionService(s).list_transactions()
+            )
+            missing = await run_db(db, lambda s: TransactionService(s).get_transaction(1))
+    finally:
+        await engine.dispose()
+
+    assert items == []
+    assert total == 0
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_run_db_releases_connection(db):
+    """The session holds no transaction (or connection) between calls."""
+    await run_db(db, lambda s: TransactionService(s).get_transaction(1))
+    assert not db.in_transaction()
+
+    with pytest.raises(ZeroDivisionError):
+        await run_db(db, lambda s: s.query(Transaction).count() / 0)
+    assert not db.in_transaction()
+
+
+def test_pool_monitor_counts_checkouts_and_timeouts(tmp_path):
+    """Exhausting the pool is reported as a timeout."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MonitoredQueuePool,
+        pool_logging_name="test",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    monitor = PoolMonitor("test").attach(engine)
+
+    held = engine.connect()
+    assert monitor.checked_out == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+    engine.dispose()
+
+    assert monitor.checked_out == 0
+    assert monitor.timeouts == 1
+
+    collected = metrics.collect()
+    assert collected["db_pool_wait_seconds"]["test"]["count"] == 1
+    assert collected["db_pool_timeouts_total"]["test"] == 1
+
+    families = {family.name: family for family in metrics.families()}
+    assert families["db_pool_checkouts_total"].kind == "counter"
+    assert ("", (("pool", "test"),), 0.0) in families["db_pool_checked_out"].samples
+
+
+@pytest.mark.asyncio
+async def test_replica_routing_and_failover(tmp_path, monkeypatch):
+    """Reads use the replica until the session writes or the replica fails."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for bound in (primary, replica):
+        Base.metadata.create_all(bind=bound)
+    replica_set = ReplicaSet([replica], retry_seconds=60)
+    monkeypatch.setattr(database, "replicas", replica_set)
+
+    def count(s):
+        return s.query(Transaction).count()
+
+    def add_transaction(s):
+        s.add(Transaction(amount=10, currency="USD", status="pending"))
+        s.commit()
+
+    db = RoutingSession(bind=primary, expire_on_commit=False)
+    await run_db(db, add_transaction)
+    assert await run_db_read(RoutingSession(bind=primary), count) == 0  # replica
+    assert await run_db_read(db, count) == 1  # reads its own write
+
+    unreachable = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replica_set.engines = [unreachable]
+    assert await run_db_read(RoutingSession(bind=primary), count) == 1
+    assert replica_set.healthy == []
+
+
+@pytest.mark.asyncio
+async def test_async_sqlite_sessions_do_not_share_a_transaction(tmp_path):
+    """Each AsyncSession on a SQLite file gets its own connection."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    engine = database.create_async_engine_for(url, "test_async")
+    sessions = async_sessionmaker(bind=engine)
+
+    def add_transaction(s):
+        s.add(Transaction(amount=10, currency="USD", status="pending"))
+        s.flush()
+
+    def count(s):
+        return s.query(Transaction).count()
+
+    try:
+        async with sessions() as writer, sessions() as reader:
+            await writer.run_sync(add_transaction)
+            assert await reader.run_sync(count) == 0
+            await writer.rollback()
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_sessions_route_reads_to_replicas(tmp_path, monkeypatch):
+    """run_db_read on an AsyncSession uses the async replica engines."""
+    urls = [f"sqlite:///{tmp_path / name}" for name in ("primary.db", "replica.db")]
+    for url in urls:
+        Base.metadata.create_all(bind=create_engine(url))
+    primary, replica = [database.create_async_engine_for(url, "test_async") for url in urls]
+    monkeypatch.setattr(database, "async_replicas", ReplicaSet([replica.sync_engine], 60))
+    sessions = async_sessionmaker(
+        bind=primary,
+        sync_session_class=database.AsyncRoutingSession,
+        expire_on_commit=False,
+    )
+
+    def add_transaction(s):
+        s.add(Transaction(amount=10, currency="USD", status="pending"))
+
+    def count(s):
+        return s.query(Transaction).count()
+
+    try:
+        async with sessions() as db:
+            await run_db(db, add_transaction)
+        async with sessions() as db:
+            assert await run_db_read(db, count) == 0  # replica
+            assert await run_db(db, count) == 1  # primary
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+def test_sqlite_engine_sets_wal_pragmas(tmp_path, monkeypatch):
+    """Every connection of a SQLite file engine is tuned for WAL mode."""
+    from sqlalchemy import text
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'wal.db'}")
+    engine = database.sqlite_engine(1, "test_wal")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.sqlite_cache_size_mb * 1024
+    finally:
+        engine.dispose()
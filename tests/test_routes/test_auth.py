@@ -0,0 +1,126 @@
+"""
+Tests for authentication.
+"""
+
+from app.services.auth_service import principal_cache
+from app.services.notifier import notifier
+
+
+def test_principal_is_cached_until_user_changes(client, auth_headers):
+    """Test repeat requests skip the user lookup and deactivation is immediate."""
+    principal_cache.clear()
+    
+    assert client.get("/api/v1/transactions", headers=auth_headers).status_code == 200
+    assert principal_cache.get("admin") is not None
+    
+    hits = principal_cache.hits
+    assert client.get("/api/v1/transactions", headers=auth_headers).status_code == 200
+    assert principal_cache.hits > hits
+    
+    metrics = client.get("/api/v1/metrics", headers=auth_headers).json()["data"]
+    assert metrics["auth_principal_cache_hit_rate"] > 0
+    
+    response = client.post("/api/v1/auth/users/admin/deactivate", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+    
+    assert principal_cache.get("admin") is None
+    assert client.get("/api/v1/transactions", headers=auth_headers).status_code == 400
+
+
+def test_user_change_in_another_worker_drops_cached_principal(client, auth_headers):
+    """Test a relayed user topic evicts the principal cached here."""
+    principal_cache.clear()
+    assert client.get("/api/v1/transactions", headers=auth_headers).status_code == 200
+    assert principal_cache.get("admin") is not None
+    
+    # What the Redis listener does with another worker's publish
+    notifier._wake(["user:admin"])
+    
+    assert principal_cache.get("admin") is None
+
+
+def test_update_user_changes_password(client, auth_headers):
+    """Test an admin can reset a user's password."""
+    assert client.post("/api/v1/auth/register", json={
+        "username": "teller",
+        "email": "teller@example.com",
+        "password": "correct-horse",
+    }).status_code == 201
+    
+    response = client.patch(
+        "/api/v1/auth/users/teller",
+        json={"password": "battery-staple"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    
+    login = {"username": "teller", "password": "battery-staple"}
+    assert client.post("/api/v1/auth/login", json=login).status_code == 200
+
+
+def test_repeated_failed_logins_are_throttled(client, monkeypatch):
+    """Test lockout after max failures, rejected before any hash is computed."""
+    from app.config import settings
+    from app.services.auth_service import login_ip_throttle, login_throttle
+    from app.utils.security import password_hasher
+    
+    login_throttle.reset("cashier")
+    response = client.post("/api/v1/auth/register", json={
+        "username": "cashier",
+        "email": "cashier@example.com",
+        "password": "correct-horse",
+    })
+    assert response.status_code == 201
+    
+    login = {"username": "cashier", "password": "correct-horse"}
+    assert client.post("/api/v1/auth/login", json=login).status_code == 200
+    
+    verifies = []
+    original = password_hasher.verify
+    async def counting_verify(*args):
+        verifies.append(args)
+        return await original(*args)
+    monkeypatch.setattr(password_hasher, "verify", counting_verify)
+    
+    wrong = {"username": "cashier", "password": "wrong-password"}
+    for _ in range(settings.login_max_failures):
+        assert client.post("/api/v1/auth/login", json=wrong).status_code == 401
+    
+    response = client.post("/api/v1/auth/login", json=login)
+    assert response.status_code == 429
+    assert response.json()["code"] == "LOGIN_THROTTLED"
+    assert len(verifies) == settings.login_max_failures
+    
+    login_throttle.reset("cashier")
+    login_ip_throttle.reset("testclient")
+
+
+def test_successful_login_clears_address_failures(client):
+    """Test a shared address is not locked out by failures before a good login."""
+    from app.config import settings
+    from app.services.auth_service import login_ip_throttle, login_throttle
+    
+    login_ip_throttle.reset("testclient")
+    for name in ("clerk1", "clerk2"):
+        login_throttle.reset(name)
+        assert client.post("/api/v1/auth/register", json={
+            "username": name,
+            "email": f"{name}@example.com",
+            "password": "correct-horse",
+        }).status_code == 201
+    
+    # Just under the address limit, spread over one account
+    for _ in range(settings.login_max_failures_per_ip - 1):
+        login_throttle.reset("clerk1")
+        wrong = {"username": "clerk1", "password": "wrong-password"}
+        assert client.post("/api/v1/auth/login", json=wrong).status_code == 401
+    
+    good = {"username": "clerk2", "password": "correct-horse"}
+    assert client.post("/api/v1/auth/login", json=good).status_code == 200
+    assert login_ip_throttle.retry_after("testclient") == 0
+    
+    login_throttle.reset("clerk1")
+    wrong = {"username": "clerk1", "password": "wrong-password"}
+    assert client.post("/api/v1/auth/login", json=wrong).status_code == 401
+    assert client.post("/api/v1/auth/login", json=good).status_code == 200
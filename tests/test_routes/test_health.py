@@ -40,3 +40,17 @@ def test_root_endpoint(client):
     
     assert "name" in data
     assert "version" in data
+
+
+def test_requests_are_instrumented(client, auth_headers):
+    """Test request IDs and per-route metrics."""
+    response = client.get("/api/v1/health/live", headers={"X-Request-Id": "abc-123"})
+    assert response.headers["X-Request-Id"] == "abc-123"
+    assert client.get("/api/v1/health/live").headers["X-Request-Id"]
+    client.get("/no-such-path")
+    
+    data = client.get("/api/v1/metrics", headers=auth_headers).json()["data"]
+    
+    assert data["http_request_duration_seconds"]["GET /api/v1/health/live"]["count"] >= 2
+    assert data["http_requests_total"]["GET /api/v1/health/live 200"] >= 2
+    assert data["http_requests_total"]["GET <unmatched> 404"] >= 1
@@ -0,0 +1,64 @@
+"""
+Tests for the metrics endpoints.
+"""
+
+import re
+
+from app.config import settings
+from app.services.metrics_exporter import merge_families
+from app.utils.metrics import MetricFamily
+
+
+def test_prometheus_metrics(client, monkeypatch):
+    """Test the Prometheus endpoint covers HTTP, SQL and backlogs."""
+    client.get("/api/v1/health")
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="GET",route="/api/v1/health",status="200"}' in body
+    assert re.search(r'db_query_duration_seconds_count\{pool="\w+",statement="SELECT"\} [1-9]', body)
+    assert "sms_outbox_pending 0.0" in body
+    assert 'webhook_inbox_events{status="pending"} 0.0' in body
+    
+    # Without a token, only a development server serves metrics
+    monkeypatch.setattr(settings, "app_env", "production")
+    assert client.get("/metrics").status_code == 401
+    
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    
+    # A refused scrape never opens a database session
+    from app.database import get_db
+    from app.main import app
+    sessions = []
+    override = app.dependency_overrides[get_db]
+    def counting_get_db():
+        sessions.append(1)
+        yield from override()
+    monkeypatch.setitem(app.dependency_overrides, get_db, counting_get_db)
+    
+    assert client.get("/metrics").status_code == 401
+    assert sessions == []
+    authorized = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert authorized.status_code == 200
+    assert sessions == [1]
+
+
+def test_merge_families_sums_counters_and_labels_gauges():
+    """Test worker metrics combine without double-counting gauges."""
+    def worker(requests: float, queue: float):
+        return [
+            MetricFamily("requests_total", "counter", "", [("", (("route", "/a"),), requests)]),
+            MetricFamily("queue_depth", "gauge", "", [("", (), queue)]),
+        ]
+    
+    requests, queue = merge_families({"w1": worker(2, 5), "w2": worker(3, 1)})
+    
+    assert requests.samples == [("", (("route", "/a"),), 5)]
+    assert queue.samples == [
+        ("", (("worker", "w1"),), 5),
+        ("", (("worker", "w2"),), 1),
+    ]
@@ -0,0 +1,211 @@
+"""
+Tests for transaction endpoints.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import stripe
+
+from app.models.transaction import Transaction
+from app.services.transaction_service import TransactionService
+
+
+def seed_transactions(db, count: int, status: str = "succeeded") -> None:
+    """Insert transactions; pairs share a created_at to exercise tie-breaks."""
+    base = datetime(2024, 1, 1)
+    for i in range(count):
+        db.add(Transaction(
+            amount=10,
+            currency="USD",
+            status=status,
+            created_at=base + timedelta(minutes=i // 2),
+        ))
+    db.commit()
+
+
+def test_cursor_pagination_walks_every_row_once(client, db, auth_headers):
+    """Test cursor mode returns all rows, newest first, without gaps or repeats."""
+    seed_transactions(db, 7)
+    
+    seen = []
+    response = client.get(
+        "/api/v1/transactions?mode=cursor&per_page=3",
+        headers=auth_headers,
+    )
+    while True:
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(t["id"] for t in body["data"])
+        cursor = body["pagination"]["next_cursor"]
+        if not cursor:
+            break
+        response = client.get(
+            f"/api/v1/transactions?per_page=3&cursor={cursor}",
+            headers=auth_headers,
+        )
+    
+    expected = [
+        t.id for t in db.query(Transaction).order_by(
+            Transaction.created_at.desc(), Transaction.id.desc()
+        )
+    ]
+    assert seen == expected
+
+
+def test_cursor_pagination_with_status_filter(client, db, auth_headers):
+    """Test the status filter is applied in cursor mode."""
+    seed_transactions(db, 3, status="succeeded")
+    seed_transactions(db, 2, status="failed")
+    
+    response = client.get(
+        "/api/v1/transactions?mode=cursor&status=failed",
+        headers=auth_headers,
+    )
+    
+    body = response.json()
+    assert [t["status"] for t in body["data"]] == ["failed", "failed"]
+    assert body["pagination"]["has_more"] is False
+
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    """Test a malformed cursor returns a validation error."""
+    response = client.get(
+        "/api/v1/transactions?cursor=not-a-cursor",
+        headers=auth_headers,
+    )
+    
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_CURSOR"
+
+
+def test_cached_count_until_invalidated(client, db, auth_headers):
+    """Test count=cached reuses the total until a write invalidates it."""
+    from app.services.transaction_service import invalidate_transaction_counts
+    
+    invalidate_transaction_counts()
+    seed_transactions(db, 2)
+    
+    first = client.get("/api/v1/transactions?count=cached", headers=auth_headers)
+    assert first.json()["pagination"]["total"] == 2
+    assert first.json()["pagination"]["count_strategy"] == "cached"
+    
+    seed_transactions(db, 1)
+    cached = client.get("/api/v1/transactions?count=cached", headers=auth_headers)
+    assert cached.json()["pagination"]["total"] == 2
+    
+    invalidate_transaction_counts()
+    fresh = client.get("/api/v1/transactions?count=cached", headers=auth_headers)
+    assert fresh.json()["pagination"]["total"] == 3
+
+
+def test_estimate_falls_back_to_exact_on_sqlite(client, db, auth_headers):
+    """Test the response reports the strategy that produced the total."""
+    seed_transactions(db, 2)
+    
+    response = client.get("/api/v1/transactions?count=estimate", headers=auth_headers)
+    
+    pagination = response.json()["pagination"]
+    assert pagination["total"] == 2
+    assert pagination["count_strategy"] == "exact"
+
+
+def test_stats_follow_status_changes(client, db, auth_headers):
+    """Test rollups move between status buckets and match a rebuild."""
+    from app.services.rollup_service import RollupService
+    from app.services.transaction_service import TransactionService
+    
+    service = TransactionService(db)
+    transactions = []
+    for amount in (10, 20, 30):
+        txn = Transaction(
+            amount=amount,
+            currency="USD",
+            status="pending",
+            created_at=datetime(2024, 1, 1, 9, 30),
+        )
+        db.add(txn)
+        db.flush()
+        RollupService(db).record_status_change(txn, None, "pending")
+        transactions.append(txn)
+    db.commit()
+    
+    service.set_status(transactions[0], "succeeded")
+    service.set_status(transactions[1], "succeeded")
+    service.set_status(transactions[2], "failed")
+    service.set_status(transactions[1], "refunded")
+    db.commit()
+    
+    response = client.get(
+        "/api/v1/transactions/stats?granularity=hour",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_count"] == 3
+    assert body["successful_count"] == 1
+    assert body["failed_count"] == 1
+    assert body["refunded_count"] == 1
+    assert body["pending_count"] == 0
+    assert float(body["total_amount"]) == 10
+    
+    RollupService(db).rebuild()
+    rebuilt = client.get(
+        "/api/v1/transactions/stats?granularity=hour",
+        headers=auth_headers,
+    ).json()
+    assert rebuilt["buckets"] == body["buckets"]
+
+
+def test_export_streams_filtered_rows(client, db, auth_headers):
+    """Test CSV and NDJSON exports honour the date range and status filters."""
+    import csv
+    import io
+    import json
+    
+    seed_transactions(db, 6, status="succeeded")
+    seed_transactions(db, 2, status="failed")
+    
+    response = client.get(
+        "/api/v1/transactions/export?format=csv&status=succeeded"
+        "&start=2024-01-01T00:01:00&end=2024-01-01T00:03:00",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 4
+    assert {r["status"] for r in rows} == {"succeeded"}
+    
+    response = client.get(
+        "/api/v1/transactions/export?format=ndjson",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 8
+    assert lines[0]["amount"] == "10.00"
+
+
+def test_get_transaction_is_cached_until_a_webhook_updates_it(client, db, auth_headers):
+    """Test lookups are served from the cache and invalidated on write."""
+    db.add(Transaction(
+        stripe_payment_intent_id="pi_cached",
+        amount=10,
+        currency="USD",
+        status="pending",
+    ))
+    db.commit()
+    transaction = db.query(Transaction).one()
+    url = f"/api/v1/transactions/{transaction.id}"
+    
+    assert client.get(url, headers=auth_headers).json()["status"] == "pending"
+    
+    # Changed behind the service's back - the cached copy is served
+    db.query(Transaction).update({Transaction.status: "failed"})
+    db.commit()
+    assert client.get(url, headers=auth_headers).json()["status"] == "pending"
+    
+    intent = stripe.util.convert_to_stripe_object({"id": "pi_cached", "object": "payment_intent"})
+    asyncio.run(TransactionService(db).handle_payment_success(intent))
+    assert client.get(url, headers=auth_headers).json()["status"] == "succeeded"
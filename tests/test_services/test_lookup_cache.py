@@ -0,0 +1,40 @@
+"""
+Tests for the lookup cache.
+"""
+
+import pytest
+
+from app.services.lookup_cache import LookupCache
+from app.services.redis_client import RedisClient
+
+
+@pytest.mark.asyncio
+async def test_loaded_value_is_cached():
+    """Test a loaded record is served from the cache afterwards."""
+    cache = LookupCache("test", client=RedisClient(enabled=False))
+    loads = []
+    
+    async def load():
+        loads.append(1)
+        return {"status": "pending"}
+    
+    assert await cache.get_or_load(1, load) == {"status": "pending"}
+    assert await cache.get_or_load(1, load) == {"status": "pending"}
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_cached():
+    """Test a value read before an invalidation is not written back after it."""
+    cache = LookupCache("test", client=RedisClient(enabled=False))
+    
+    async def stale_load():
+        # The row changes (and is invalidated) while this read is in flight
+        await cache.invalidate(1)
+        return {"status": "pending"}
+    
+    async def fresh_load():
+        return {"status": "succeeded"}
+    
+    assert await cache.get_or_load(1, stale_load) == {"status": "pending"}
+    assert await cache.get_or_load(1, fresh_load) == {"status": "succeeded"}
@@ -0,0 +1,87 @@
+"""
+Tests for pending transaction reconciliation.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import stripe
+
+from app.models.transaction import Transaction
+from app.models.transaction_rollup import TransactionRollup
+from app.services.reconciliation_service import ReconciliationService
+from app.services.rollup_service import RollupService
+
+
+class FakeStripe:
+    def __init__(self, intents):
+        self.intents = intents
+    
+    async def retrieve_payment_intent(self, payment_intent_id, **params):
+        intent = self.intents[payment_intent_id]
+        if isinstance(intent, Exception):
+            raise intent
+        return stripe.PaymentIntent.construct_from(intent, None)
+
+
+@pytest.mark.asyncio
+async def test_stale_pending_rows_are_settled_in_bulk(db):
+    """Test status and card details are applied and rollups follow."""
+    old = datetime.utcnow() - timedelta(hours=1)
+    for pi_id, created_at in [
+        ("pi_ok", old),
+        ("pi_declined", old),
+        ("pi_waiting", old),
+        ("pi_error", old),
+        ("pi_fresh", datetime.utcnow()),
+    ]:
+        txn = Transaction(
+            stripe_payment_intent_id=pi_id,
+            amount=10,
+            currency="USD",
+            status="pending",
+            created_at=created_at,
+        )
+        db.add(txn)
+        db.flush()
+        RollupService(db).record_status_change(txn, None, "pending")
+    db.commit()
+    
+    client = FakeStripe({
+        "pi_ok": {
+            "id": "pi_ok",
+            "object": "payment_intent",
+            "status": "succeeded",
+            "latest_charge": {
+                "id": "ch_1",
+                "object": "charge",
+                "payment_method_details": {"card": {"last4": "4242", "brand": "visa"}},
+            },
+        },
+        "pi_declined": {
+            "id": "pi_declined",
+            "object": "payment_intent",
+            "status": "requires_payment_method",
+            "last_payment_error": {"code": "card_declined"},
+        },
+        "pi_waiting": {"id": "pi_waiting", "object": "payment_intent", "status": "processing"},
+        "pi_error": stripe.error.APIConnectionError("timeout"),
+    })
+    
+    report = await ReconciliationService(db, client=client).reconcile()
+    
+    assert report["checked"] == 4
+    assert report["updated"] == {"succeeded": 1, "failed": 1}
+    assert report["unchanged"] == 1
+    assert report["errors"] == 1
+    
+    by_pi = {t.stripe_payment_intent_id: t for t in db.query(Transaction)}
+    assert by_pi["pi_ok"].status == "succeeded"
+    assert by_pi["pi_ok"].card_last4 == "4242"
+    assert by_pi["pi_declined"].status == "failed"
+    assert by_pi["pi_fresh"].status == "pending"
+    
+    pending = db.query(TransactionRollup).filter_by(
+        granularity="day", status="pending"
+    ).one()
+    assert pending.count == 3
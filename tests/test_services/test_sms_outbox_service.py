@@ -0,0 +1,69 @@
+"""
+Tests for the SMS outbox service.
+"""
+
+from datetime import datetime, timedelta
+
+from app.models.payment_link import PaymentLink
+from app.models.sms_outbox import SMSOutbox
+from app.services.sms_outbox_service import SMSOutboxService
+
+
+def make_link(db) -> PaymentLink:
+    link = PaymentLink(
+        url="https://checkout.stripe.com/c/pay/cs_test",
+        amount=10,
+        currency="USD",
+        customer_phone="+254712345678",
+    )
+    db.add(link)
+    db.commit()
+    return link
+
+
+def test_claim_and_successful_delivery_updates_link(db):
+    """Test a sent message marks the payment link as sent."""
+    link = make_link(db)
+    service = SMSOutboxService(db)
+    outbox = service.enqueue("+254712345678", "Pay here", payment_link_id=link.id)
+    
+    claimed = service.claim_due("worker-1", limit=10)
+    assert [m.id for m in claimed] == [outbox.id]
+    assert claimed[0].attempts == 1
+    
+    # Already claimed - a second worker gets nothing
+    assert service.claim_due("worker-2", limit=10) == []
+    
+    service.record_result(outbox.id, {"success": True, "message_id": "ATX-1"})
+    
+    db.refresh(link)
+    assert link.sms_sent is True
+    assert link.sms_message_id == "ATX-1"
+
+
+def test_failed_delivery_backs_off_then_gives_up(db):
+    """Test failures are retried with backoff until max_attempts."""
+    service = SMSOutboxService(db)
+    outbox = service.enqueue("+254712345678", "Hello")
+    outbox.max_attempts = 2
+    db.commit()
+    
+    service.claim_due("worker-1", limit=10)
+    service.record_result(outbox.id, {"success": False, "error": "timeout"})
+    
+    db.refresh(outbox)
+    assert outbox.status == "pending"
+    assert outbox.next_attempt_at > datetime.utcnow()
+    assert outbox.last_error == "timeout"
+    
+    # Not due yet
+    assert service.claim_due("worker-1", limit=10) == []
+    
+    outbox.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    service.claim_due("worker-1", limit=10)
+    service.record_result(outbox.id, {"success": False, "error": "timeout"})
+    
+    db.refresh(outbox)
+    assert outbox.status == "failed"
+    assert db.query(SMSOutbox).count() == 1
@@ -0,0 +1,95 @@
+"""
+Tests for SMS micro-batching.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.sms_service import SMSBatcher
+
+
+def fake_send(calls):
+    """Build a blocking bulk send that records its calls."""
+    def send(message, recipients, sender_id):
+        calls.append(list(recipients))
+        return {
+            "SMSMessageData": {
+                "Recipients": [
+                    {"number": phone, "status": "Success", "messageId": f"id-{phone}"}
+                    for phone in recipients
+                ],
+            },
+        }
+    return send
+
+
+@pytest.mark.asyncio
+async def test_identical_messages_share_one_request():
+    """Test concurrent sends of the same body are coalesced."""
+    calls = []
+    batcher = SMSBatcher(window_seconds=0.01, max_batch_size=100)
+    send = fake_send(calls)
+    
+    results = await asyncio.gather(
+        batcher.submit(send, "+2541", "Hello", "POS"),
+        batcher.submit(send, "+2542", "Hello", "POS"),
+        batcher.submit(send, "+2543", "Other", "POS"),
+    )
+    
+    assert sorted(calls) == [["+2541", "+2542"], ["+2543"]]
+    assert [r["messageId"] for r in results] == ["id-+2541", "id-+2542", "id-+2543"]
+
+
+@pytest.mark.asyncio
+async def test_batch_flushes_at_max_size():
+    """Test a full batch is sent without waiting for the window."""
+    calls = []
+    batcher = SMSBatcher(window_seconds=60, max_batch_size=2)
+    send = fake_send(calls)
+    
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            batcher.submit(send, "+2541", "Hello", "POS"),
+            batcher.submit(send, "+2542", "Hello", "POS"),
+        ),
+        timeout=1,
+    )
+    
+    assert calls == [["+2541", "+2542"]]
+    assert all(r["status"] == "Success" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_send_failure_propagates_to_every_caller():
+    """Test a failed bulk request fails each waiting caller."""
+    def send(message, recipients, sender_id):
+        raise RuntimeError("provider down")
+    
+    batcher = SMSBatcher(window_seconds=0.01, max_batch_size=100)
+    
+    results = await asyncio.gather(
+        batcher.submit(send, "+2541", "Hello", "POS"),
+        batcher.submit(send, "+2542", "Hello", "POS"),
+        return_exceptions=True,
+    )
+    
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_task_is_held_until_sent():
+    """Test a flushed batch's task is referenced while it runs, then released."""
+    batcher = SMSBatcher(window_seconds=0.01, max_batch_size=100)
+    in_flight = []
+    send = fake_send([])
+    
+    def tracking_send(message, recipients, sender_id):
+        in_flight.append(len(batcher._sending))
+        return send(message, recipients, sender_id)
+    
+    await batcher.submit(tracking_send, "+2541", "Hello", "POS")
+    await asyncio.sleep(0)
+    
+    assert in_flight == [1]
+    assert not batcher._sending
@@ -0,0 +1,94 @@
+"""
+Tests for the async Stripe client.
+"""
+
+import httpx
+import pytest
+import stripe
+
+from app.services.stripe_client import StripeClient
+
+
+def make_client(handler) -> StripeClient:
+    """Build a client whose HTTP calls go to a mock transport."""
+    client = StripeClient(api_key="sk_test_123", max_network_retries=0)
+    client._client = httpx.AsyncClient(
+        base_url=stripe.api_base,
+        transport=httpx.MockTransport(handler),
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_create_payment_intent_returns_stripe_object():
+    """Test params are form-encoded and the response is a PaymentIntent."""
+    seen = {}
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = request.content.decode()
+        seen["idempotency_key"] = request.headers.get("Idempotency-Key")
+        return httpx.Response(200, json={
+            "id": "pi_123",
+            "object": "payment_intent",
+            "client_secret": "pi_123_secret",
+        })
+    
+    client = make_client(handler)
+    intent = await client.create_payment_intent(
+        amount=1000,
+        currency="usd",
+        metadata={"order": "42"},
+        idempotency_key="key-1",
+    )
+    
+    assert isinstance(intent, stripe.PaymentIntent)
+    assert intent.client_secret == "pi_123_secret"
+    assert "metadata[order]=42" in seen["body"]
+    assert seen["idempotency_key"] == "key-1"
+
+
+@pytest.mark.asyncio
+async def test_error_response_raises_stripe_error():
+    """Test API errors map to the SDK exception classes."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(402, json={
+            "error": {"type": "card_error", "message": "Declined", "code": "card_declined"},
+        })
+    
+    client = make_client(handler)
+    
+    with pytest.raises(stripe.error.CardError):
+        await client.create_refund(payment_intent="pi_123")
+
+
+@pytest.mark.asyncio
+async def test_transport_error_raises_connection_error():
+    """Test network failures surface as APIConnectionError."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("boom")
+    
+    client = make_client(handler)
+    
+    with pytest.raises(stripe.error.APIConnectionError):
+        await client.retrieve_payment_intent("pi_123")
+
+
+@pytest.mark.asyncio
+async def test_post_retries_reuse_generated_idempotency_key():
+    """Test a POST without a key gets one that stays the same across retries."""
+    keys = []
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        keys.append(request.headers.get("Idempotency-Key"))
+        if len(keys) == 1:
+            raise httpx.ReadTimeout("timed out")
+        return httpx.Response(200, json={"id": "re_123", "object": "refund"})
+    
+    client = make_client(handler)
+    client.max_network_retries = 1
+    
+    refund = await client.create_refund(payment_intent="pi_123")
+    
+    assert refund.id == "re_123"
+    assert len(keys) == 2
+    assert keys[0] and keys[0] == keys[1]
@@ -0,0 +1,143 @@
+"""
+Tests for transaction webhook handlers, status waits and the live feed.
+"""
+
+import asyncio
+import json
+
+import pytest
+import stripe
+
+from app.models.payment_link import PaymentLink
+from app.models.transaction import Transaction
+from app.services.payment_link_service import PaymentLinkService
+from app.services.transaction_feed import TransactionFeed
+from app.services.transaction_service import TransactionService
+from tests.conftest import TestingSessionLocal
+
+
+def stripe_object(data: dict):
+    return stripe.util.convert_to_stripe_object(data)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_status_change_is_woken_by_webhook(db):
+    """Test a waiting request returns as soon as the payment succeeds."""
+    transaction = Transaction(
+        stripe_payment_intent_id="pi_wait",
+        amount=10,
+        currency="USD",
+        status="pending",
+    )
+    db.add(transaction)
+    db.commit()
+    
+    waiter = asyncio.create_task(
+        TransactionService(db).wait_for_status_change(transaction.id, "pending", timeout=10)
+    )
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+    
+    await TransactionService(db).handle_payment_success(
+        stripe_object({"id": "pi_wait", "object": "payment_intent"})
+    )
+    
+    result = await asyncio.wait_for(waiter, 1)
+    assert result["status"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_checkout_complete_marks_payment_link_paid(db):
+    """Test checkout.session.completed pays the link and wakes its waiters."""
+    link = PaymentLink(
+        stripe_session_id="cs_wait",
+        url="https://checkout.stripe.com/c/pay/cs_wait",
+        amount=10,
+        currency="USD",
+        customer_phone="+254712345678",
+    )
+    db.add(link)
+    db.commit()
+    
+    waiter = asyncio.create_task(PaymentLinkService(db).wait_until_paid(link.id, timeout=10))
+    await asyncio.sleep(0.05)
+    
+    await TransactionService(db).handle_checkout_complete(stripe_object({
+        "id": "cs_wait",
+        "object": "checkout.session",
+        "payment_status": "paid",
+        "payment_intent": None,
+    }))
+    
+    result = await asyncio.wait_for(waiter, 1)
+    assert result["paid"] is True
+    db.refresh(link)
+    assert link.paid_at is not None
+
+
+def parse_event(raw: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in raw.strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+@pytest.mark.asyncio
+async def test_transaction_feed_sends_snapshot_deltas_and_resumes(db):
+    """Test the feed pushes changes and resumes from Last-Event-ID."""
+    first = Transaction(stripe_payment_intent_id="pi_feed", amount=10, currency="USD")
+    db.add(first)
+    db.commit()
+    
+    feed = TransactionFeed(db).stream()
+    assert (await feed.__anext__()).startswith("retry:")
+    snapshot = parse_event(await feed.__anext__())
+    assert snapshot["event"] == "snapshot"
+    assert [t["id"] for t in snapshot["data"]["transactions"]] == [first.id]
+    
+    delta = asyncio.create_task(feed.__anext__())
+    await asyncio.sleep(0.05)
+    assert not delta.done()
+    await TransactionService(db).handle_payment_success(
+        stripe_object({"id": "pi_feed", "object": "payment_intent"})
+    )
+    delta = parse_event(await asyncio.wait_for(delta, 1))
+    await feed.aclose()
+    assert delta["event"] == "transaction"
+    assert delta["data"]["status"] == "succeeded"
+    
+    # Reconnect: only rows changed since the last event id, no snapshot
+    second = Transaction(amount=20, currency="USD")
+    db.add(second)
+    db.commit()
+    resumed = TransactionFeed(db).stream(last_event_id=delta["id"])
+    await resumed.__anext__()
+    events = [parse_event(await resumed.__anext__()) for _ in range(2)]
+    await resumed.aclose()
+    assert {e["event"] for e in events} == {"transaction"}
+    assert events[-1]["data"]["id"] == second.id
+
+
+@pytest.mark.asyncio
+async def test_transaction_feed_sees_changes_with_non_expiring_session(db):
+    """Test snapshot rows are re-read, as request sessions do not expire on commit."""
+    transaction = Transaction(stripe_payment_intent_id="pi_stale", amount=10, currency="USD")
+    db.add(transaction)
+    db.commit()
+    
+    feed_db = TestingSessionLocal(expire_on_commit=False)
+    feed = TransactionFeed(feed_db).stream()
+    try:
+        await feed.__anext__()
+        snapshot = parse_event(await feed.__anext__())
+        assert snapshot["data"]["transactions"][0]["status"] == "pending"
+        
+        delta = asyncio.create_task(feed.__anext__())
+        await asyncio.sleep(0.05)
+        await TransactionService(db).handle_payment_success(
+            stripe_object({"id": "pi_stale", "object": "payment_intent"})
+        )
+        delta = parse_event(await asyncio.wait_for(delta, 1))
+        assert delta["data"]["status"] == "succeeded"
+    finally:
+        await feed.aclose()
+        feed_db.close()
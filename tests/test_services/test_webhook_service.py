@@ -0,0 +1,189 @@
+"""
+Tests for the webhook inbox service.
+"""
+
+import json
+
+import pytest
+import stripe
+
+from app.models.processed_event import ProcessedEvent
+from app.models.transaction import Transaction
+from app.services.webhook_service import WebhookService
+
+
+def make_event(event_id: str, event_type: str, obj: dict, created: int = None) -> tuple:
+    payload = json.dumps({
+        "id": event_id,
+        "object": "event",
+        "type": event_type,
+        "created": created,
+        "data": {"object": obj},
+    })
+    return stripe.Event.construct_from(json.loads(payload), None), payload
+
+
+@pytest.mark.asyncio
+async def test_claimed_event_is_processed(db):
+    """Test an inbox event runs its handler and is marked processed."""
+    db.add(Transaction(
+        stripe_payment_intent_id="pi_1",
+        amount=10,
+        currency="USD",
+        status="pending",
+    ))
+    db.commit()
+    
+    service = WebhookService(db)
+    event, payload = make_event(
+        "evt_1",
+        "payment_intent.payment_failed",
+        {"id": "pi_1", "object": "payment_intent"},
+    )
+    inbox = service.enqueue(event, payload)
+    assert service.backlog()["pending"] == 1
+    
+    claimed = service.claim_due("worker-1", limit=10)
+    assert [e.id for e in claimed] == [inbox.id]
+    assert service.claim_due("worker-2", limit=10) == []
+    
+    await service.process(inbox.id)
+    
+    db.refresh(inbox)
+    assert inbox.status == "processed"
+    assert db.query(Transaction).one().status == "failed"
+    assert service.backlog()["lag_seconds"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_handler_error_is_retried(db, monkeypatch):
+    """Test a failing handler leaves the event pending with backoff."""
+    service = WebhookService(db)
+    event, payload = make_event("evt_2", "charge.refunded", {"id": "ch_1"})
+    inbox = service.enqueue(event, payload)
+    service.claim_due("worker-1", limit=10)
+    
+    def broken(self, event):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(WebhookService, "apply", broken)
+    
+    await service.process(inbox.id)
+    
+    db.refresh(inbox)
+    assert inbox.status == "pending"
+    assert inbox.attempts == 1
+    assert inbox.last_error == "database unavailable"
+    assert inbox.next_attempt_at > inbox.received_at
+
+
+@pytest.mark.asyncio
+async def test_redelivered_event_is_applied_once(db):
+    """Test a duplicate delivery is recognized and not dispatched again."""
+    from datetime import datetime, timedelta
+    
+    from app.services.webhook_service import processed_event_ids
+    
+    processed_event_ids.clear()
+    service = WebhookService(db)
+    event, payload = make_event("evt_3", "charge.refunded", {"id": "ch_1"})
+    
+    first = service.enqueue(event, payload)
+    assert service.is_duplicate("evt_3")  # Still pending in the inbox
+    
+    # Stripe redelivered before the first copy was processed
+    second = service.enqueue(event, payload)
+    service.claim_due("worker-1", limit=10)
+    await service.process(first.id)
+    await service.process(second.id)
+    
+    assert db.query(ProcessedEvent).count() == 1
+    db.refresh(second)
+    assert second.status == "processed"
+    
+    processed_event_ids.clear()
+    assert service.is_duplicate("evt_3")  # From processed_events
+    assert "evt_3" in processed_event_ids
+    
+    # Retention sweep removes old records
+    db.query(ProcessedEvent).update(
+        {ProcessedEvent.processed_at: datetime.utcnow() - timedelta(days=60)}
+    )
+    db.commit()
+    assert service.sweep(retention_days=30)["processed_events"] == 1
+
+
+@pytest.mark.asyncio
+async def test_events_for_one_intent_run_in_stripe_order(db):
+    """Test per-intent serialization and the out-of-order guard."""
+    db.add(Transaction(
+        stripe_payment_intent_id="pi_9",
+        amount=10,
+        currency="USD",
+        status="pending",
+    ))
+    db.commit()
+    
+    service = WebhookService(db)
+    # Delivered out of order: the refund arrives before the success
+    refunded = service.enqueue(*make_event(
+        "evt_r", "charge.refunded",
+        {"id": "ch_9", "object": "charge", "payment_intent": "pi_9"},
+        created=1700000100,
+    ))
+    succeeded = service.enqueue(*make_event(
+        "evt_s", "payment_intent.succeeded",
+        {"id": "pi_9", "object": "payment_intent"},
+        created=1700000000,
+    ))
+    other = service.enqueue(*make_event(
+        "evt_o", "payment_intent.payment_failed",
+        {"id": "pi_other", "object": "payment_intent"},
+        created=1700000050,
+    ))
+    
+    # One event per intent at a time, oldest first
+    claimed = service.claim_due("worker-1", limit=10)
+    assert [e.id for e in claimed] == [succeeded.id, other.id]
+    assert service.claim_due("worker-2", limit=10) == []
+    
+    await service.process(succeeded.id)
+    assert [e.id for e in service.claim_due("worker-2", limit=10)] == [refunded.id]
+    await service.process(refunded.id)
+    
+    transaction = db.query(Transaction).filter_by(stripe_payment_intent_id="pi_9").one()
+    assert transaction.status == "refunded"
+    
+    # A stale event replayed later does not undo the refund
+    stale, _ = make_event(
+        "evt_s2", "payment_intent.succeeded",
+        {"id": "pi_9", "object": "payment_intent"},
+        created=1700000000,
+    )
+    await service.dispatch(stale)
+    db.refresh(transaction)
+    assert transaction.status == "refunded"
+
+
+@pytest.mark.asyncio
+async def test_process_runs_database_work_off_the_event_loop(db, monkeypatch):
+    """Test processing does its database work in a thread, not on the loop."""
+    import threading
+    
+    service = WebhookService(db)
+    event, payload = make_event("evt_t", "charge.refunded", {"id": "ch_1"})
+    inbox = service.enqueue(event, payload)
+    service.claim_due("worker-1", limit=10)
+    
+    threads = []
+    apply = WebhookService.apply
+    
+    def recording_apply(self, event):
+        threads.append(threading.get_ident())
+        return apply(self, event)
+    monkeypatch.setattr(WebhookService, "apply", recording_apply)
+    
+    await service.process(inbox.id)
+    
+    assert threads and threads[0] != threading.get_ident()
+    db.refresh(inbox)
+    assert inbox.status == "processed"
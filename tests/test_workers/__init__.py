@@ -0,0 +1 @@
+# Test workers package
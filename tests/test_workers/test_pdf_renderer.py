@@ -0,0 +1,65 @@
+"""
+Tests for the PDF receipt renderer.
+"""
+
+import importlib
+import os
+
+import pytest
+
+from app.workers.pdf_renderer import PDFRenderer
+
+
+# app.workers re-exports the pdf_renderer instance under the module's name
+pdf_renderer_module = importlib.import_module("app.workers.pdf_renderer")
+
+
+def crash_first_render(data, filepath):
+    """Kill the worker process on the first call (marked by a file)."""
+    marker = filepath + ".crashed"
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return filepath
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced_and_render_retried(tmp_path, monkeypatch):
+    """Test a dead worker process does not break every later render."""
+    monkeypatch.setattr(pdf_renderer_module, "render_receipt_pdf", crash_first_render)
+    renderer = PDFRenderer(workers=1, max_queue=4)
+    filepath = str(tmp_path / "receipt.pdf")
+    
+    await renderer.start()
+    broken = renderer._executor
+    try:
+        assert await renderer.render_receipt({}, filepath) == filepath
+        assert renderer._executor is not broken
+        assert await renderer.render_receipt({}, filepath) == filepath
+    finally:
+        await renderer.stop()
+
+
+@pytest.mark.asyncio
+async def test_receipt_is_rendered_in_a_worker_process(tmp_path):
+    """Test the real ReportLab render produces a PDF."""
+    renderer = PDFRenderer(workers=1, max_queue=4)
+    filepath = str(tmp_path / "receipts" / "receipt.pdf")
+    data = {
+        "receipt_number": "RCP-240204-0001",
+        "date": "2024-02-04 10:30",
+        "description": "Coffee",
+        "amount_display": "$4.50",
+        "card_brand": "visa",
+        "card_last4": "4242",
+    }
+    
+    try:
+        assert await renderer.render_receipt(data, filepath) == filepath
+    finally:
+        await renderer.stop()
+    
+    with open(filepath, "rb") as f:
+        content = f.read()
+    assert content.startswith(b"%PDF")
+    assert len(content) > 500
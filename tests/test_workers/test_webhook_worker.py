@@ -0,0 +1,36 @@
+"""
+Tests for the webhook inbox worker.
+"""
+
+import asyncio
+
+import pytest
+
+from app.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.workers.webhook_worker import WebhookWorker
+
+
+@pytest.mark.asyncio
+async def test_worker_session_does_not_share_a_request_transaction():
+    """Test a claim running in a thread leaves an open request transaction alone."""
+    Base.metadata.create_all(bind=engine)
+    request_db = SessionLocal()
+    try:
+        request_db.add(User(
+            username="worker-isolation",
+            email="worker-isolation@example.com",
+            hashed_password="not-used",
+        ))
+        request_db.flush()
+        
+        # Nothing is due: the worker's session rolls back its transaction
+        assert await asyncio.to_thread(WebhookWorker()._claim) == []
+        
+        request_db.commit()
+        assert request_db.query(User).filter_by(username="worker-isolation").count() == 1
+    finally:
+        request_db.rollback()
+        request_db.query(User).filter_by(username="worker-isolation").delete()
+        request_db.commit()
+        request_db.close()